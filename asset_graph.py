@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Asset reference graph and deploy manifest.
+
+Crawls the site from its entry points and records every file each one
+references:
+- HTML: src / href / srcset / poster / data-src / og: meta URLs, inline
+  style url(...) and <style> blocks
+- CSS: url(...) and @import
+- JS / JSON / XML: quoted paths and absolute URLs on the site's own domain
+- Python / shell build scripts: quoted paths (build-only edges)
+
+Everything reachable from the web roots (every page, plus CNAME, robots.txt,
+sitemap.xml…) and from the Apps Script / email sources, whose links point back
+at the site, is the deploy set. Files that only build scripts touch (masters,
+-hires sources) and files nothing touches are left out.
+
+Usage:
+    python3 asset_graph.py                     # summary + deploy-manifest.json
+    python3 asset_graph.py --stage _site       # also copy the deploy set into _site/
+    python3 asset_graph.py --check             # exit 1 on broken local references
+
+As a module:
+    from asset_graph import build_graph, reachable
+"""
+import os, re, sys, json, time, shutil, fnmatch, argparse
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, unquote
+
+MANIFEST_PATH = "deploy-manifest.json"
+SKIP_DIRS = {".git", "__pycache__", "masters", "node_modules", "_site", "templates", ".cache"}
+
+# Served as-is at the site root even though no page links them
+ROOT_FILES = ["CNAME", ".nojekyll", "robots.txt", "sitemap.xml", "site.webmanifest", "favicon.ico"]
+# Not deployed themselves, but the links they send out (emails, Apps Script) must resolve
+EXTERNAL_SOURCES = ["gas-*.js", "google-apps-script.js", "email-template*.html"]
+BUILD_EXTS = (".py", ".sh")
+# Files whose contents are crawled for further references
+CRAWL_EXTS = (".html", ".css", ".js", ".json", ".webmanifest", ".xml", ".svg") + BUILD_EXTS
+
+URL_ATTRS = {"src", "href", "poster", "data-src", "data-bg", "data-video", "action"}
+ASSET_EXTS = ("jpg|jpeg|png|webp|avif|gif|svg|ico|mp4|webm|mov|mp3|wav|pdf|zip|json|js|css|html|xml|txt"
+              "|woff2?|ttf|otf|webmanifest")
+# Quoted strings that look like file paths — the loose pass for JS, JSON and build scripts
+PATH_RE = re.compile(r"""["'`(]\s*([^"'`()\s<>@]+\.(?:%s))(?:[?#][^"'`()\s]*)?\s*["'`)]""" % ASSET_EXTS, re.IGNORECASE)
+CSS_URL_RE = re.compile(r"""url\(\s*["']?([^"')]+)["']?\s*\)|@import\s+["']([^"']+)["']""", re.IGNORECASE)
+
+
+def site_hosts():
+    hosts = set()
+    if os.path.exists("CNAME"):
+        with open("CNAME") as f:
+            host = f.read().strip()
+        if host:
+            hosts.update({host, "www." + host.removeprefix("www.")})
+    return hosts
+
+
+class _HtmlRefs(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.refs = []
+        self.css = []
+        self.scripts = []
+        self._in = None
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in URL_ATTRS:
+                self.refs.append(value)
+            elif name in ("srcset", "data-srcset"):
+                self.refs.extend(part.strip().split(" ")[0] for part in value.split(",") if part.strip())
+            elif name == "style":
+                self.css.append(value)
+            elif name == "content" and tag == "meta" and re.match(r"^(https?:)?//|^/|^assets/", value):
+                self.refs.append(value)
+        self._in = tag if tag in ("style", "script") else None
+
+    def handle_endtag(self, tag):
+        self._in = None
+
+    def handle_data(self, data):
+        if self._in == "style":
+            self.css.append(data)
+        elif self._in == "script":
+            self.scripts.append(data)
+
+
+def extract_refs(path, text):
+    """Returns (strict, loose) reference strings in a file.
+
+    Strict refs come from markup and CSS and must resolve; loose ones are
+    path-like strings found in code and are only followed when they do.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".html":
+        parser = _HtmlRefs()
+        parser.feed(text)
+        strict = parser.refs
+        for css in parser.css:
+            strict += [a or b for a, b in CSS_URL_RE.findall(css)]
+        return strict, [ref for js in parser.scripts for ref in PATH_RE.findall(js)]
+    if ext == ".css":
+        return [a or b for a, b in CSS_URL_RE.findall(text)], []
+    if ext == ".svg":
+        return [], [a or b for a, b in CSS_URL_RE.findall(text)]
+    if ext == ".xml":
+        return re.findall(r"<loc>\s*([^<\s]+)\s*</loc>", text), []
+    return [], PATH_RE.findall(text)
+
+
+def resolve(ref, source, hosts):
+    """Reference string -> repo-relative file path, or None if it isn't local."""
+    ref = ref.strip()
+    if not ref or ref.startswith(("#", "%23", "data:", "mailto:", "tel:", "javascript:", "{", "$")):
+        return None
+    parts = urlsplit(ref)
+    if parts.scheme or ref.startswith("//"):
+        if parts.netloc not in hosts:
+            return None
+        path = parts.path.lstrip("/")
+    elif parts.path.startswith("/"):
+        path = parts.path.lstrip("/")
+    else:
+        base = "" if source.endswith(BUILD_EXTS) else os.path.dirname(source)  # scripts run from the repo root
+        path = os.path.normpath(os.path.join(base, parts.path))
+    path = unquote(path)
+    if path in ("", "."):
+        path = "index.html"
+    elif path.endswith("/") or os.path.isdir(path):
+        path = os.path.join(path, "index.html")
+    if path.startswith(".."):
+        return None
+    return os.path.normpath(path)
+
+
+def repo_files():
+    files = []
+    for dirpath, dirnames, filenames in os.walk("."):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            files.append(os.path.normpath(os.path.join(dirpath, name)))
+    return files
+
+
+def build_graph(files=None):
+    """Returns (edges {file: set(targets)}, broken {file: set(refs)})."""
+    files = files or repo_files()
+    existing = set(files)
+    hosts = site_hosts()
+    edges, broken = {}, {}
+    for path in files:
+        if not path.endswith(CRAWL_EXTS) or path.startswith("assets/renditions/"):
+            continue
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+        strict, loose = extract_refs(path, text)
+        targets = set()
+        for ref in strict:
+            target = resolve(ref, path, hosts)
+            if target in existing:
+                targets.add(target)
+            elif target is not None:
+                broken.setdefault(path, set()).add(ref)
+        for ref in loose:
+            target = resolve(ref, path, hosts)
+            if target is not None and target not in existing:
+                # JS strings resolve against the page that loads the script — usually the root
+                target = os.path.normpath(urlsplit(ref).path.lstrip("/"))
+            if target in existing:
+                targets.add(target)
+        targets.discard(path)
+        edges[path] = targets
+    return edges, broken
+
+
+def entry_points(files):
+    web = [f for f in files if f.endswith(".html") and not any(fnmatch.fnmatch(f, p) for p in EXTERNAL_SOURCES)]
+    web += [f for f in ROOT_FILES if f in files]
+    external = [f for f in files if any(fnmatch.fnmatch(f, p) for p in EXTERNAL_SOURCES)]
+    build = [f for f in files if f.endswith(BUILD_EXTS)]
+    return web, external, build
+
+
+def reachable(edges, roots, through=lambda path: not path.endswith(BUILD_EXTS)):
+    """Transitive closure of roots over edges, following only `through` files."""
+    seen = set(roots)
+    queue = list(roots)
+    while queue:
+        node = queue.pop()
+        if not through(node):
+            continue
+        for target in edges.get(node, ()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def deploy_set(files=None):
+    """Returns (deploy set, build-only set, edges, broken)."""
+    files = files or repo_files()
+    edges, broken = build_graph(files)
+    web, external, build = entry_points(files)
+    deploy = reachable(edges, web)
+    # Apps Script / email sources stay out of the deploy set, their targets don't
+    for source in external:
+        deploy |= reachable(edges, edges.get(source, ()))
+    build_only = reachable(edges, build, through=lambda p: p in build) - deploy - set(build)
+    return deploy, build_only, edges, broken
+
+
+def write_manifest(deploy, files):
+    entries = [{"path": p, "bytes": os.path.getsize(p)} for p in sorted(deploy) if os.path.isfile(p)]
+    manifest = {
+        "files": entries,
+        "total_bytes": sum(e["bytes"] for e in entries),
+        "excluded": sorted(set(files) - deploy),
+    }
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+def stage(deploy, out_dir):
+    """Copy the deploy set into out_dir (hard links where the filesystem allows)."""
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    for path in sorted(deploy):
+        dst = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.link(path, dst)
+        except OSError:
+            shutil.copy2(path, dst)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the asset reference graph and deploy manifest")
+    parser.add_argument("--stage", metavar="DIR", help="Copy the deploy set into DIR")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any page or stylesheet has a broken reference")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List excluded files")
+    args = parser.parse_args()
+
+    start = time.time()
+    files = [f for f in repo_files() if f != MANIFEST_PATH]
+    deploy, build_only, edges, broken = deploy_set(files)
+    manifest = write_manifest(deploy, files)
+    elapsed = time.time() - start
+
+    total = sum(os.path.getsize(f) for f in files)
+    excluded_bytes = total - manifest["total_bytes"]
+    print(f"🕸  {len(files)} files, {sum(len(t) for t in edges.values())} references ({elapsed:.2f}s)")
+    print(f"📦 Deploy set: {len(deploy)} files, {manifest['total_bytes'] / 1e6:.1f}MB → {MANIFEST_PATH}")
+    print(f"🗑  Excluded: {len(manifest['excluded'])} files, {excluded_bytes / 1e6:.1f}MB "
+          f"({len(build_only)} build-only inputs)")
+    if args.verbose:
+        for path in manifest["excluded"]:
+            print(f"   {'build' if path in build_only else '     '} {path}")
+
+    if broken:
+        print(f"\n⚠️ Broken references in {len(broken)} files:")
+        for path, refs in sorted(broken.items()):
+            for ref in sorted(refs):
+                print(f"   {path}: {ref}")
+
+    if args.stage:
+        stage(deploy, args.stage)
+        print(f"✅ Staged into {args.stage}/")
+
+    if args.check and broken:
+        sys.exit(1)
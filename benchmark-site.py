@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Offline page-weight benchmark for the static site.
+
+Serves the tree on a local port and, for every page, fetches exactly what a
+browser would: the HTML, the stylesheets, scripts, icons and images it
+references, and whatever those stylesheets and scripts reference in turn
+(fonts, background images — followed through the asset_graph edges). Each
+page reports:
+- requests and transfer bytes, split by type (html/css/js/image/font/other)
+- lazy images and video/audio listed separately — neither holds up the load
+  event, so they aren't in the page total
+- the largest image, broken local references, and third-party scripts
+  (counted as requests; their bytes can't be measured offline)
+- a load timeline per network profile: TTFB, HTML done, first render
+  (after render-blocking CSS and head scripts) and load
+
+The timeline is a model, not a browser: the connection takes CONNECT_RTTS
+round trips, every discovery level (HTML → CSS/JS → what they reference)
+costs one more, and all requests share the downlink. It moves when bytes or
+the blocking chain move, which is what a before/after comparison needs.
+
+<img srcset> counts the candidate a VIEWPORT-wide, 1x screen would pick,
+and <picture> the first <source>. When a .br or .gz sibling exists (the
+fingerprint-assets.py output), the server sends it like the CDN would, so
+running against _site measures compressed transfer.
+
+Results go to .cache/benchmark-<tree>.json. Every run diffs against the
+previous results (or --baseline) and prints what changed, down to the
+individual assets.
+
+Usage:
+    python3 benchmark-site.py                        # repo tree, diff vs last run
+    python3 benchmark-site.py --root _site           # staged + fingerprinted tree
+    python3 benchmark-site.py --baseline old.json    # diff against a saved run
+    python3 benchmark-site.py --profile slow-3g -v   # one profile, per-asset detail
+"""
+import os, json, time, argparse, threading
+from html.parser import HTMLParser
+from functools import partial
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from asset_graph import repo_files, build_graph, resolve, site_hosts, CSS_URL_RE
+from html_images import SITE_PAGES, expand_pages
+
+PAGES = SITE_PAGES + ["partners.html", "ai-training.html"]
+# name -> (downlink bits/s, round trip ms): DevTools / WebPageTest presets
+PROFILES = {
+    "slow-3g": (400e3, 2000),
+    "fast-3g": (1.6e6, 562.5),
+    "4g": (9e6, 170),
+    "cable": (5e6, 28),
+}
+CONNECT_RTTS = 3   # DNS, TCP, TLS
+VIEWPORT = 1440
+FETCH_WORKERS = 8
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".avif", ".gif", ".svg", ".ico")
+FONT_EXTS = (".woff", ".woff2", ".ttf", ".otf")
+MEDIA_EXTS = (".mp4", ".webm", ".mov", ".mp3", ".wav")
+TYPES = ("html", "css", "js", "image", "font", "other")
+
+
+def asset_type(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".html":
+        return "html"
+    if ext in (".css", ".js"):
+        return ext[1:]
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in FONT_EXTS:
+        return "font"
+    return "media" if ext in MEDIA_EXTS else "other"
+
+
+def pick_candidate(srcset):
+    """The srcset URL a VIEWPORT-wide 1x screen would load."""
+    candidates = []
+    for part in srcset.split(","):
+        bits = part.split()
+        if bits:
+            desc = bits[1] if len(bits) > 1 else "1x"
+            candidates.append((float(desc[:-1]) if desc[-1] in "wx" else 0, desc[-1], bits[0]))
+    if not candidates:
+        return None
+    wide = sorted(c for c in candidates if c[1] == "w")
+    if wide:
+        return next((c for c in wide if c[0] >= VIEWPORT), wide[-1])[2]
+    return min(candidates, key=lambda c: abs(c[0] - 1))[2]
+
+
+# ── Page scan ──
+
+class PageRefs(HTMLParser):
+    """Collects (ref, kind) pairs: kind is blocking, eager, lazy or media."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.refs = []
+        self.in_head = True
+        self.in_media = False
+        self.picture = None   # None outside <picture>, else whether a <source> was already picked
+        self._style = False
+
+    def add(self, ref, kind):
+        if ref:
+            self.refs.append((ref, kind))
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        rel = (a.get("rel") or "").lower().split()
+        if tag == "body":
+            self.in_head = False
+        elif tag == "link" and "stylesheet" in rel:
+            self.add(a.get("href"), "eager" if a.get("media") == "print" else "blocking")
+        elif tag == "link" and (rel and set(rel) & {"icon", "apple-touch-icon", "manifest", "preload"}):
+            self.add(a.get("href"), "eager")
+        elif tag == "script" and a.get("src"):
+            sync = not ({"async", "defer"} & a.keys()) and a.get("type") != "module"
+            self.add(a["src"], "blocking" if sync and self.in_head else "eager")
+        elif tag in ("video", "audio"):
+            self.in_media = True
+            self.add(a.get("src"), "media")
+            self.add(a.get("poster"), "eager")
+        elif tag == "picture":
+            self.picture = False
+        elif tag == "source" and self.in_media:
+            self.add(a.get("src"), "media")
+        elif tag == "source" and self.picture is False and a.get("srcset"):
+            self.picture = True
+            self.add(pick_candidate(a["srcset"]), "eager")
+        elif tag == "img":
+            src = a.get("src")
+            if self.picture:
+                src = None
+            elif a.get("srcset"):
+                src = pick_candidate(a["srcset"])
+            self.add(src, "lazy" if a.get("loading") == "lazy" else "eager")
+        elif tag == "style":
+            self._style = True
+        if a.get("style"):
+            for url, _ in CSS_URL_RE.findall(a["style"]):
+                self.add(url, "eager")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_head = False
+        elif tag in ("video", "audio"):
+            self.in_media = False
+        elif tag == "picture":
+            self.picture = None
+        elif tag == "style":
+            self._style = False
+
+    def handle_data(self, data):
+        if self._style:
+            for url, _ in CSS_URL_RE.findall(data):
+                self.add(url, "eager")
+
+
+KIND_RANK = {"blocking": 0, "eager": 1, "lazy": 2, "media": 3}
+
+
+def page_assets(page, edges, existing, hosts):
+    """path -> (kind, depth) for everything the page loads, plus (third-party URLs, broken refs)."""
+    parser = PageRefs()
+    with open(page, encoding="utf-8", errors="ignore") as f:
+        parser.feed(f.read())
+    assets = {page: ("blocking", 0)}
+    third_party, broken = set(), set()
+    for ref, kind in parser.refs:
+        target = resolve(ref, page, hosts)
+        if target is None:
+            if urlsplit(ref).scheme in ("http", "https") or ref.startswith("//"):
+                third_party.add(ref)
+            continue
+        if target not in existing:
+            broken.add(ref)
+            continue
+        if asset_type(target) == "media":
+            kind = "media"
+        if target not in assets or KIND_RANK[kind] < KIND_RANK[assets[target][0]]:
+            assets[target] = (kind, 1)
+    # whatever stylesheets and scripts pull in is discovered one level later
+    queue = [p for p, (kind, _) in assets.items() if p.endswith((".css", ".js")) and kind != "media"]
+    while queue:
+        source = queue.pop()
+        depth = assets[source][1] + 1
+        for target in edges.get(source, ()):
+            if target.endswith(".html") or target in assets:
+                continue
+            assets[target] = ("media" if asset_type(target) == "media" else "eager", depth)
+            if target.endswith((".css", ".js")):
+                queue.append(target)
+    return assets, sorted(third_party), sorted(broken)
+
+
+# ── Local server ──
+
+class PrecompressedHandler(SimpleHTTPRequestHandler):
+    """Serves foo.br / foo.gz in place of foo when the client accepts it, as the CDN would."""
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        accept = self.headers.get("Accept-Encoding", "")
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accept and os.path.isfile(path + suffix):
+                f = open(path + suffix, "rb")
+                self.send_response(200)
+                self.send_header("Content-Type", self.guess_type(path))
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.end_headers()
+                return f
+        return super().send_head()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(root):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(PrecompressedHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(base, path):
+    """Transfer bytes for path as served (compressed if the server has a sibling), or None on error."""
+    request = Request(base + quote(path), headers={"Accept-Encoding": "br, gzip"})
+    try:
+        with urlopen(request) as response:
+            return len(response.read())
+    except HTTPError:
+        return None
+
+
+# ── Metrics ──
+
+def timeline(page, bps, rtt_ms):
+    rtt = rtt_ms / 1000
+    xfer = lambda n: n * 8 / bps
+    ttfb = (CONNECT_RTTS + 1) * rtt
+    html = ttfb + xfer(page["html_bytes"])
+    render = html + (rtt + xfer(page["blocking_bytes"]) if page["blocking_bytes"] else 0)
+    load = html + page["depth"] * rtt + xfer(page["bytes"] - page["html_bytes"])
+    return {k: round(v * 1000) for k, v in
+            (("ttfb", ttfb), ("html", html), ("render", render), ("load", max(load, render)))}
+
+
+def measure(page, assets, third_party, broken, sizes, profiles):
+    result = {
+        "requests": len(third_party), "bytes": 0, "html_bytes": 0, "blocking_bytes": 0, "depth": 0,
+        **{t: 0 for t in TYPES}, "lazy_bytes": 0, "media_bytes": 0,
+        "largest_image": None, "third_party": third_party, "broken": list(broken), "assets": {},
+    }
+    largest = (0, None)
+    for path, (kind, depth) in sorted(assets.items()):
+        size = sizes.get(path)
+        if size is None:
+            result["broken"].append(path)
+            continue
+        result["assets"][path] = size
+        kind_type = asset_type(path)
+        if kind_type == "image" and size > largest[0]:
+            largest = (size, path)
+        if kind == "media" or kind_type == "media":
+            result["media_bytes"] += size
+            continue
+        if kind == "lazy":
+            result["lazy_bytes"] += size
+            continue
+        result["requests"] += 1
+        result["bytes"] += size
+        result[kind_type] += size
+        result["depth"] = max(result["depth"], depth)
+        if kind == "blocking" and path != page:
+            result["blocking_bytes"] += size
+    result["html_bytes"] = result["html"]
+    if largest[1]:
+        result["largest_image"] = {"path": largest[1], "bytes": largest[0]}
+    result["timeline"] = {name: timeline(result, *PROFILES[name]) for name in profiles}
+    return result
+
+
+def kb(n):
+    return f"{n / 1e3:,.1f}KB"
+
+
+def signed(n, fmt=kb):
+    return ("+" if n > 0 else "−") + fmt(abs(n))
+
+
+def print_diff(old, new, verbose):
+    changed = 0
+    for page in sorted(set(old) | set(new)):
+        if page not in new or page not in old:
+            print(f"   {'➕' if page in new else '➖'} {page}")
+            changed += 1
+            continue
+        a, b = old[page], new[page]
+        parts = []
+        for key, label in (("bytes", "page"), ("lazy_bytes", "lazy"), ("media_bytes", "media")):
+            if a[key] != b[key]:
+                parts.append(f"{label} {kb(a[key])} → {kb(b[key])} ({signed(b[key] - a[key])})")
+        if a["requests"] != b["requests"]:
+            parts.append(f"requests {a['requests']} → {b['requests']}")
+        for name in b["timeline"]:
+            la, lb = a.get("timeline", {}).get(name, {}).get("load"), b["timeline"][name]["load"]
+            if la is not None and la != lb:
+                parts.append(f"{name} load {signed(lb - la, lambda n: f'{n}ms')}")
+        if not parts:
+            continue
+        changed += 1
+        print(f"   ✏️  {page}: " + ", ".join(parts))
+        if verbose:
+            for path in sorted(set(a["assets"]) | set(b["assets"])):
+                sa, sb = a["assets"].get(path), b["assets"].get(path)
+                if sa != sb:
+                    print(f"        {path}: {kb(sa) if sa is not None else '—'} → {kb(sb) if sb is not None else '—'}")
+    if not changed:
+        print("   no changes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline page-weight and load-timeline benchmark")
+    parser.add_argument("pages", nargs="*", help=f"Pages or globs (default: {' '.join(PAGES)})")
+    parser.add_argument("--root", default=".", help="Tree to serve (default: the repo; _site for the staged build)")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES), help="Network profile(s) (default: all)")
+    parser.add_argument("--out", help="Results JSON (default: .cache/benchmark-<tree>.json)")
+    parser.add_argument("--baseline", help="Results JSON to diff against (default: the previous --out)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Per-page breakdown and per-asset diffs")
+    args = parser.parse_args()
+
+    tree = "repo" if os.path.samefile(args.root, ".") else os.path.basename(os.path.normpath(args.root))
+    out_path = os.path.abspath(args.out or f".cache/benchmark-{tree}.json")
+    baseline_path = os.path.abspath(args.baseline or out_path)
+    profiles = args.profile or list(PROFILES)
+
+    start = time.time()
+    cwd = os.getcwd()
+    os.chdir(args.root)
+    files = repo_files()
+    existing = set(files)
+    hosts = site_hosts()
+    edges, _ = build_graph(files)
+    pages = expand_pages(args.pages or PAGES)
+    scanned = {page: page_assets(page, edges, existing, hosts) for page in pages}
+
+    server = serve(".")
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    needed = sorted({path for assets, _, _ in scanned.values() for path in assets})
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        sizes = dict(zip(needed, pool.map(partial(fetch, base), needed)))
+    server.shutdown()
+
+    results = {page: measure(page, *scanned[page], sizes, profiles) for page in pages}
+    print(f"⏱  {len(pages)} pages, {len(needed)} assets served from {args.root} ({time.time() - start:.2f}s)")
+    slowest = profiles[0]
+    for page, r in results.items():
+        img = r["largest_image"]
+        print(f"   {page}: {r['requests']} requests, {kb(r['bytes'])} (+{kb(r['lazy_bytes'])} lazy), "
+              f"{slowest} render {r['timeline'][slowest]['render']}ms / load {r['timeline'][slowest]['load']}ms"
+              + (f", largest image {img['path']} {kb(img['bytes'])}" if img else ""))
+        if args.verbose:
+            print("      " + ", ".join(f"{t} {kb(r[t])}" for t in TYPES if r[t])
+                  + (f", media {kb(r['media_bytes'])}" if r["media_bytes"] else ""))
+            for name, t in r["timeline"].items():
+                print(f"      {name:>8}: ttfb {t['ttfb']}ms, html {t['html']}ms, render {t['render']}ms, load {t['load']}ms")
+            for ref in r["third_party"]:
+                print(f"      3rd party: {ref}")
+        for ref in r["broken"]:
+            print(f"   ⚠️ {page}: broken reference {ref}")
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        old = baseline["pages"]
+        if args.pages:   # a partial run only compares the pages it measured
+            old = {page: r for page, r in old.items() if page in results}
+        print(f"\n📊 Compared with {os.path.relpath(baseline_path, cwd)} ({baseline.get('date', '?')}):")
+        print_diff(old, results, args.verbose)
+
+    if args.pages and os.path.exists(out_path):
+        with open(out_path) as f:
+            results = {**json.load(f)["pages"], **results}
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump({"date": time.strftime("%Y-%m-%d %H:%M"), "root": args.root, "profiles":
+                   {name: PROFILES[name] for name in profiles}, "pages": results}, f, indent=2)
+        f.write("\n")
+    print(f"✅ Results → {os.path.relpath(out_path, cwd)}")
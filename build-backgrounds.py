@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Build the deployed section backgrounds from their masters.
+
+Masters (lossless PNGs, full-size JPEGs, art-directed mobile crops, old
+backups) live in masters/backgrounds/, which is not part of the deploy set.
+Every master is turned into size-budgeted derivatives under assets/backgrounds/
+at the same relative path:
+
+    <name>.jpg              desktop, max 1920px wide
+    <name>-mobile.jpg       mobile, max 828px wide — from <name>-mobile.* if that
+                            master exists (the portrait crops), else from <name>
+    <name>-placeholder.jpg  tiny blurred placeholder shown while the real one loads
+
+Each derivative gets the highest JPEG quality that fits its byte budget. The
+build fails (exit 1) when a derivative can't meet its budget even at the
+quality floor, or when anything in assets/backgrounds/ is over budget or isn't
+a derivative (a stray PNG master or backup copied back into the deploy tree).
+--check also fails on derivatives that are stale against their master or
+settings in derivatives.json (a master replaced without rebuilding).
+
+Usage:
+    python3 build-backgrounds.py            # build changed masters, then check budgets
+    python3 build-backgrounds.py --check    # budget + staleness check only (CI / pre-deploy)
+    python3 build-backgrounds.py --force
+"""
+import os, io, sys, glob, json, time, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import ImageFilter
+from image_tiles import open_frame, draft_size, fit
+from provenance import file_sha256, write_image
+
+MASTERS_DIR = "masters/backgrounds"
+DEPLOY_DIR = "assets/backgrounds"
+STATE_PATH = f"{MASTERS_DIR}/derivatives.json"
+MASTER_EXTS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".webp")
+ARCHIVE_SUFFIXES = ("-original-backup",)  # kept as masters, never published
+
+# kind -> (max width, byte budget, quality range)
+# Backgrounds sit behind text at 15-18% opacity, so compression artefacts never show.
+DERIVATIVES = {
+    "desktop": {"suffix": "", "width": 1920, "budget": 300_000, "quality": (45, 82)},
+    # mobile: the portrait crops (810x1440) carry ~2.5x the pixels of an 828px landscape
+    "mobile": {"suffix": "-mobile", "width": 828, "budget": 160_000, "quality": (45, 82)},
+    "placeholder": {"suffix": "-placeholder", "width": 32, "budget": 2_000, "quality": (30, 60), "blur": 2},
+}
+# Per-file budget overrides, keyed by deployed path
+BUDGET_OVERRIDES = {}
+SETTINGS_KEY = json.dumps(DERIVATIVES, sort_keys=True)
+
+
+def budget_for(path, kind):
+    return BUDGET_OVERRIDES.get(path, DERIVATIVES[kind]["budget"])
+
+
+def plan():
+    """Deployed derivative path -> (kind, master path)."""
+    masters = sorted(p for p in glob.glob(f"{MASTERS_DIR}/**/*", recursive=True)
+                     if p.lower().endswith(MASTER_EXTS))
+    by_stem = {os.path.splitext(p)[0]: p for p in masters}
+    jobs = {}
+    for stem, master in by_stem.items():
+        if stem.endswith(ARCHIVE_SUFFIXES) or stem.endswith("-mobile"):
+            continue
+        out_stem = DEPLOY_DIR + stem[len(MASTERS_DIR):]
+        mobile_master = by_stem.get(stem + "-mobile", master)
+        for kind, spec in DERIVATIVES.items():
+            jobs[f"{out_stem}{spec['suffix']}.jpg"] = (kind, mobile_master if kind == "mobile" else master)
+    return jobs
+
+
+def encode_within_budget(im, budget, q_min, q_max):
+    """Binary-search the highest JPEG quality under budget. Returns (bytes, quality, fits)."""
+    def encode(q):
+        buf = io.BytesIO()
+        im.save(buf, "JPEG", quality=q, optimize=True, progressive=im.width > 64)
+        return buf.getvalue()
+
+    best = None
+    lo, hi = q_min, q_max
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        data = encode(mid)
+        if len(data) <= budget:
+            best = (data, mid)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    if best:
+        return best[0], best[1], True
+    return encode(q_min), q_min, False
+
+
+def render(out_path, kind, master_path, budget):
+    """Worker: write one derivative. Returns its state entry."""
+    spec = DERIVATIVES[kind]
+    # decoded into a mapped spill file and shrunk in strips, so 4K / PNG masters stay cheap
+    with open_frame(master_path, draft_size(master_path, spec["width"])) as frame, \
+            fit(frame, spec["width"]) as small:
+        im = small.image().convert("RGB")
+    if spec.get("blur"):
+        im = im.filter(ImageFilter.GaussianBlur(spec["blur"]))
+    data, quality, fits = encode_within_budget(im, budget, *spec["quality"])
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    master_sha = file_sha256(master_path)
+    # indexed against the master, but not embedded — derivatives are served and every byte counts
+    write_image(out_path, data, parent=master_sha, mirror=False)
+    return {
+        "kind": kind,
+        "master": master_path,
+        "sha256": master_sha,
+        "settings": SETTINGS_KEY,
+        "width": im.width,
+        "height": im.height,
+        "quality": quality,
+        "bytes": len(data),
+        "budget": budget,
+        "fits": fits,
+    }
+
+
+def is_current(entry, out_path, master_path):
+    if not entry or entry.get("master") != master_path or entry.get("settings") != SETTINGS_KEY:
+        return False
+    if not os.path.exists(out_path) or os.path.getsize(out_path) != entry.get("bytes"):
+        return False
+    return entry.get("sha256") == file_sha256(master_path)
+
+
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def check_stale(jobs, state):
+    """Derivatives whose master, settings or bytes no longer match derivatives.json."""
+    return [f"{p}: stale against {master} — run build-backgrounds.py"
+            for p, (kind, master) in jobs.items()
+            if os.path.exists(p) and not is_current(state.get(p), p, master)]
+
+
+def check_budgets(jobs):
+    """Everything under DEPLOY_DIR must be a planned derivative within its budget."""
+    failures = []
+    total = 0
+    for path in sorted(glob.glob(f"{DEPLOY_DIR}/**/*", recursive=True)):
+        if os.path.isdir(path):
+            continue
+        size = os.path.getsize(path)
+        total += size
+        if path not in jobs:
+            failures.append(f"{path}: not a derivative of anything in {MASTERS_DIR}/ ({size // 1024}KB)")
+            continue
+        budget = budget_for(path, jobs[path][0])
+        if size > budget:
+            failures.append(f"{path}: {size // 1024}KB > {budget // 1024}KB budget")
+    missing = [p for p in jobs if not os.path.exists(p)]
+    failures.extend(f"{p}: missing — run build-backgrounds.py" for p in missing)
+    return failures, total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build size-budgeted background derivatives")
+    parser.add_argument("--check", action="store_true",
+                        help="Only check deployed backgrounds against budgets and their masters")
+    parser.add_argument("--force", action="store_true", help="Rebuild every derivative")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.time()
+    jobs = plan()
+
+    if not args.check:
+        state = {} if args.force else load_state()
+        todo = {p: j for p, j in jobs.items() if not is_current(state.get(p), p, j[1])}
+        print(f"🖼  {len(jobs)} derivatives from {MASTERS_DIR}/, {len(todo)} to build on {args.workers} workers")
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(render, p, kind, master, budget_for(p, kind)): p
+                       for p, (kind, master) in todo.items()}
+            for fut in as_completed(futures):
+                path = futures[fut]
+                try:
+                    state[path] = entry = fut.result()
+                except Exception as e:
+                    print(f"   ❌ {path}: {e}")
+                    continue
+                flag = "✅" if entry["fits"] else "❌"
+                print(f"   {flag} {path} ({entry['width']}px, q{entry['quality']}, {entry['bytes'] // 1024}KB)")
+
+        state = {p: state[p] for p in jobs if p in state}
+        with open(STATE_PATH, "w") as f:
+            json.dump(state, f, indent=2)
+            f.write("\n")
+
+    failures, total = check_budgets(jobs)
+    if args.check:
+        failures.extend(check_stale(jobs, load_state()))
+    print(f"\n📦 {DEPLOY_DIR}: {total / 1e6:.1f}MB deployed ({time.time() - start:.1f}s)")
+    if failures:
+        print(f"❌ {len(failures)} background check failures:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("✅ All backgrounds within budget")
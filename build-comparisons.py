@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Render before/after comparison composites from the generated pairs.
+
+Pairs are found the way rank-before-after.py finds them: before-<name>.<ext>
+next to after-<name>.<ext>, so both the lead-magnet pairs and a sweep
+directory work. Each pair is centre-cropped to the after image's aspect
+(matched size), and rendered in every layout × width:
+
+    side      the two images side by side with a thin gutter
+    labeled   side by side with BEFORE / AFTER tags
+    wipe      one frame, before on the left of a split line, after on the right
+
+Output goes to OUT_DIR/<name>-<layout>-<width>w.jpg. A width is skipped
+(with a warning) when it would upscale the smaller source. Each source is
+decoded once per run; the crops, splits and tags are NumPy array
+operations on the decoded pixels.
+
+Outputs are cached by pair hash (both source hashes plus the render
+settings) in OUT_DIR/manifest.json. A pair whose requested composites are
+all current is skipped without being decoded, so re-running after adding a
+pair only renders the new one.
+
+Usage:
+    python3 build-comparisons.py                                  # assets/images/lead-magnet pairs
+    python3 build-comparisons.py --dir sweeps/before-after-v2-20261012-1030 --layouts wipe --widths 1200
+    python3 build-comparisons.py --force
+"""
+import os, io, re, sys, json, time, hashlib, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from provenance import file_sha256, write_image
+
+IMG_DIR = "assets/images/lead-magnet"
+OUT_DIR = "assets/images/comparisons"
+MANIFEST = "manifest.json"
+LAYOUTS = ("side", "labeled", "wipe")
+WIDTHS = (1920, 1200, 640)
+QUALITY = 85
+GUTTER = 0.008          # of the output width
+SPLIT = 0.5             # wipe split position, fraction of the width
+DARK = (10, 10, 10)
+RED = (232, 0, 13)      # brand red, as in the lead-magnet PDF
+WHITE = (255, 255, 255)
+SETTINGS_KEY = json.dumps({"quality": QUALITY, "gutter": GUTTER, "split": SPLIT, "version": 1})
+
+
+def discover_pairs(img_dir):
+    """Match before-<name>.<ext> with after-<name>.<ext> in img_dir."""
+    befores, afters = {}, {}
+    for fn in os.listdir(img_dir):
+        m = re.match(r"^(before|after)-(.+)\.(jpe?g|png|webp)$", fn, re.I)
+        if m:
+            (befores if m.group(1).lower() == "before" else afters)[m.group(2)] = os.path.join(img_dir, fn)
+    return [{"name": n, "before": befores[n], "after": afters[n]} for n in sorted(set(befores) & set(afters))]
+
+
+def pair_key(pair):
+    return hashlib.sha256(f"{file_sha256(pair['before'])}:{file_sha256(pair['after'])}:{SETTINGS_KEY}"
+                          .encode()).hexdigest()
+
+
+def outputs_for(name, layouts, widths, out_dir):
+    return {(layout, w): os.path.join(out_dir, f"{name}-{layout}-{w}w.jpg") for layout in layouts for w in widths}
+
+
+# ── Compositing ──
+
+def crop_to_aspect(im, aspect):
+    w, h = im.size
+    if w / h > aspect:
+        cw = round(h * aspect)
+        return im.crop(((w - cw) // 2, 0, (w - cw) // 2 + cw, h))
+    ch = round(w / aspect)
+    return im.crop((0, (h - ch) // 2, w, (h - ch) // 2 + ch))
+
+
+def panel(im, width, height):
+    return np.asarray(im.resize((width, height), Image.LANCZOS, reducing_gap=2.0))
+
+
+def side_by_side(before, after, width, aspect):
+    gutter = max(4, round(width * GUTTER))
+    pw = (width - gutter) // 2
+    ph = round(pw / aspect)
+    out = np.empty((ph, width, 3), np.uint8)
+    out[:] = DARK
+    out[:, :pw] = panel(before, pw, ph)
+    out[:, width - pw:] = panel(after, pw, ph)
+    return out, pw
+
+
+def wipe(before, after, width, aspect):
+    height = round(width / aspect)
+    split = round(width * SPLIT)
+    left = np.arange(width) < split
+    out = np.where(left[None, :, None], panel(before, width, height), panel(after, width, height))
+    line = max(2, width // 640)
+    out[:, split - line // 2:split - line // 2 + line] = WHITE
+    # round handle on the split line
+    r = max(10, width // 48)
+    yy, xx = np.ogrid[:height, :width]
+    d2 = (xx - split) ** 2 + (yy - height // 2) ** 2
+    out[d2 <= r * r] = DARK
+    out[(d2 <= r * r) & (d2 >= (r - max(line, r // 5)) ** 2)] = WHITE
+    return out
+
+
+def tag(out, text, x, y, fill, font):
+    """Pill label: background blended into the array, text drawn on top."""
+    im = Image.fromarray(out)
+    draw = ImageDraw.Draw(im)
+    l, t, r, b = draw.textbbox((0, 0), text, font=font)
+    pad = max(4, (b - t) // 2)
+    w, h = r - l + 2 * pad, b - t + 2 * pad
+    region = out[y:y + h, x:x + w].astype(np.float32)
+    out[y:y + h, x:x + w] = (region * 0.15 + np.array(fill, np.float32) * 0.85).astype(np.uint8)
+    im = Image.fromarray(out)
+    ImageDraw.Draw(im).text((x + pad - l, y + pad - t), text, fill=WHITE, font=font)
+    return np.asarray(im).copy()
+
+
+def render(layout, before, after, width, aspect):
+    if layout == "wipe":
+        return wipe(before, after, width, aspect)
+    out, pw = side_by_side(before, after, width, aspect)
+    if layout == "labeled":
+        font = ImageFont.load_default(size=max(12, width // 64))
+        margin = max(8, width // 96)
+        out = tag(out, "BEFORE", margin, margin, DARK, font)
+        out = tag(out, "AFTER", width - pw + margin, margin, RED, font)
+    return out
+
+
+def build_pair(pair, layouts, widths, out_dir):
+    """Worker: decode a pair once, render every layout × width. Returns ({path: entry}, [skipped paths])."""
+    with Image.open(pair["before"]) as b, Image.open(pair["after"]) as a:
+        before = ImageOps.exif_transpose(b).convert("RGB")
+        after = ImageOps.exif_transpose(a).convert("RGB")
+    aspect = after.width / after.height
+    before, after = crop_to_aspect(before, aspect), crop_to_aspect(after, aspect)
+    source_width = min(before.width, after.width)
+    composites, skipped = {}, []
+    for (layout, width), path in outputs_for(pair["name"], layouts, widths, out_dir).items():
+        if (width if layout == "wipe" else width // 2) > source_width:
+            skipped.append(path)
+            continue
+        buf = io.BytesIO()
+        Image.fromarray(render(layout, before, after, width, aspect)).save(
+            buf, "JPEG", quality=QUALITY, optimize=True, progressive=True)
+        data = write_image(path, buf.getvalue(), payload={"layout": layout, "width": width,
+                           "before": pair["before"], "after": pair["after"]}, mirror=False)
+        composites[path] = {"layout": layout, "width": width, "bytes": len(data)}
+    return composites, skipped
+
+
+def is_current(entry, key, paths):
+    """Every requested composite rendered (and still on disk) or skipped under this pair key."""
+    if not entry or entry.get("key") != key:
+        return False
+    return all(p in entry["skipped"] or (p in entry["composites"] and os.path.exists(p)) for p in paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render before/after comparison composites")
+    parser.add_argument("--dir", default=IMG_DIR, help="Directory with before-*/after-* pairs")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help=f"Comma-separated: {', '.join(LAYOUTS)}")
+    parser.add_argument("--widths", default=",".join(map(str, WIDTHS)))
+    parser.add_argument("--force", action="store_true", help="Re-render cached composites")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    layouts = args.layouts.split(",")
+    unknown = [l for l in layouts if l not in LAYOUTS]
+    if unknown:
+        parser.error(f"unknown layout(s): {', '.join(unknown)} — choose from {', '.join(LAYOUTS)}")
+    widths = [int(w) for w in args.widths.split(",")]
+
+    start = time.time()
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    pairs = discover_pairs(args.dir)
+    todo = []
+    for pair in pairs:
+        key = pair_key(pair)
+        paths = outputs_for(pair["name"], layouts, widths, args.out).values()
+        if args.force or not is_current(manifest.get(pair["name"]), key, paths):
+            todo.append((pair, key))
+    print(f"🔀 {len(pairs)} pairs in {args.dir}/, {len(todo)} to render on {args.workers} workers")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(build_pair, pair, layouts, widths, args.out): (pair, key) for pair, key in todo}
+        for future in as_completed(futures):
+            pair, key = futures[future]
+            try:
+                composites, skipped = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ {pair['name']}: {e}")
+                continue
+            entry = manifest.get(pair["name"])
+            if not entry or entry["key"] != key:
+                entry = {"key": key, "composites": {}, "skipped": []}
+            entry.update(before=pair["before"], after=pair["after"])
+            entry["composites"].update(composites)
+            entry["skipped"] = sorted(set(entry["skipped"]) - set(composites) | set(skipped))
+            manifest[pair["name"]] = entry
+            print(f"   ✅ {pair['name']}: {len(composites)} composites")
+            for path in skipped:
+                print(f"   ⚠️ skipped {os.path.basename(path)} — wider than the smaller source")
+
+    with open(manifest_path, "w") as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+        f.write("\n")
+    print(f"\n✅ Done in {time.time() - start:.1f}s → {args.out}/")
+    sys.exit(1 if failed else 0)
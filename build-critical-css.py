@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Critical-CSS inlining and per-page stylesheet pruning.
+
+For each page this works out which rules of its local stylesheets (style.css,
+partners.css, ai-training.css, projects/projects.css) can match anything on the
+page, and which of those match something above the fold — the nav/header and
+everything up to the end of the first <section>, as in inject-srcset.py.
+
+- critical rules are inlined in a <style> block in <head>
+- all matching rules go to css/<page>.css, loaded without blocking render
+  (preload + onload swap, <noscript> fallback)
+- rules nothing on the page can match are dropped, and so are @keyframes no
+  kept rule animates
+
+Matching is static and errs towards keeping rules: pseudo-classes, :not(),
+:is()/:has() and sibling combinators are treated as matching; classes, ids and
+attributes the page's scripts add (classList.add('open'), setAttribute,
+SplitText class options, markup built in strings) count as present on any
+element.
+
+The original <link> tags are recorded in the `<!-- critical-css: … -->` marker,
+so re-runs start from the same input and --restore puts them back. Results are
+cached in .cache/critical-css.json by page hash + stylesheet hashes.
+
+Usage:
+    python3 build-critical-css.py                    # landing, work, project, partners, ai-training pages
+    python3 build-critical-css.py index.html --dry-run
+    python3 build-critical-css.py --restore          # back to plain <link rel="stylesheet"> tags
+"""
+import os, re, json, time, hashlib, argparse
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from html_images import SITE_PAGES, VOID_TAGS, expand_pages, write_if_changed
+
+PAGES = SITE_PAGES + ["partners.html", "ai-training.html"]
+OUT_DIR = "css"
+CACHE_PATH = ".cache/critical-css.json"
+CRITICAL_BUDGET = 14_000   # bytes of inline CSS — roughly what fits in the first TCP round trip
+CACHE_VERSION = 2
+
+MARKER_RE = re.compile(r"([ \t]*)<!-- critical-css: ([^>]*?) -->.*?<!-- /critical-css -->\n?", re.DOTALL)
+LINK_RE = re.compile(r"""([ \t]*)<link\b[^>]*\brel=["']stylesheet["'][^>]*>\n?""", re.IGNORECASE)
+HREF_RE = re.compile(r"""\bhref=["']([^"']+)["']""")
+JS_STRING_RE = re.compile(r"""(["'`])((?:\\.|(?!\1).)*?)\1""", re.DOTALL)
+# Places where scripts put classes, ids and attributes on elements at runtime
+RUNTIME_RES = [
+    re.compile(r"classList\.(?:add|toggle|replace)\(([^)]*)\)"),
+    re.compile(r"className\s*\+?=\s*([^;\n]+)"),
+    re.compile(r"\w*class(?:name)?\s*:\s*([^,}\n]+)", re.IGNORECASE),   # SplitText linesClass, toggleClass
+    re.compile(r"setAttribute\(([^)]*)\)"),
+    re.compile(r"\.id\s*=\s*([^;\n]+)"),
+]
+JS_MARKUP_CLASS_RE = re.compile(r"""class=\\?["']([^"'\\]*)""")      # markup built in script strings
+GROUP_AT_RULES = ("@media", "@supports", "@layer", "@container", "@document")
+KEYFRAMES_RE = re.compile(r"^@(?:-\w+-)?keyframes\s+([\w-]+)", re.IGNORECASE)
+ANIMATION_RE = re.compile(r"animation(?:-name)?\s*:\s*([^;]+)", re.IGNORECASE)
+
+
+# ── CSS parsing ──
+
+def strip_comments(css):
+    out, i, quote = [], 0, None
+    while i < len(css):
+        c = css[i]
+        if quote:
+            out.append(c)
+            if c == "\\":
+                out.append(css[i + 1:i + 2])
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+            out.append(c)
+        elif css.startswith("/*", i):
+            end = css.find("*/", i + 2)
+            i = len(css) if end < 0 else end + 2
+            continue
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _block_end(css, start):
+    """Index of the '}' closing the '{' at start."""
+    depth, quote, i = 0, None, start
+    while i < len(css):
+        c = css[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def parse_css(css):
+    """CSS text (comments stripped) -> list of rules:
+    ("style", selector, body) | ("group", prelude, [rules]) | ("keyframes", name, text) | ("other", text)
+    """
+    rules, i = [], 0
+    while i < len(css):
+        brace, semi = css.find("{", i), css.find(";", i)
+        if brace < 0:
+            break
+        prelude = css[i:brace].strip()
+        if prelude.startswith("@") and 0 <= semi < brace:   # @import / @charset
+            rules.append(("other", css[i:semi + 1].strip()))
+            i = semi + 1
+            continue
+        end = _block_end(css, brace)
+        body = css[brace + 1:end]
+        keyframes = KEYFRAMES_RE.match(prelude)
+        if prelude.lower().startswith(GROUP_AT_RULES):
+            rules.append(("group", prelude, parse_css(body)))
+        elif keyframes:
+            rules.append(("keyframes", keyframes.group(1), css[i:end + 1].strip()))
+        elif prelude.startswith("@"):
+            rules.append(("other", css[i:end + 1].strip()))
+        elif prelude:
+            rules.append(("style", prelude, body))
+        i = end + 1
+    return rules
+
+
+def split_top(text, seps):
+    """Split on any of seps outside (), [] and quotes."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif depth == 0 and c in seps:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+COMPOUND_RE = re.compile(r"""
+    (?P<id>\#[\w-]+) | (?P<cls>\.[\w-]+) | (?P<attr>\[[^\]]*\])
+  | (?P<pseudo>::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?) | (?P<tag>[\w-]+|\*)
+""", re.VERBOSE)
+
+
+def parse_compound(text):
+    """'a.btn#x[href]:hover' -> (tag, id, classes, attribute names, is_root)."""
+    tag, id_, classes, attrs, root = None, None, [], [], False
+    for m in COMPOUND_RE.finditer(text):
+        if m.group("id"):
+            id_ = m.group("id")[1:]
+        elif m.group("cls"):
+            classes.append(m.group("cls")[1:])
+        elif m.group("attr"):
+            attrs.append(re.split(r"[~|^$*]?=", m.group("attr")[1:-1])[0].strip().lower())
+        elif m.group("pseudo"):
+            root = root or m.group("pseudo") == ":root"
+        elif m.group("tag") != "*":
+            tag = m.group("tag").lower()
+    return tag, id_, classes, attrs, root
+
+
+def parse_selector(selector):
+    """Complex selector -> [compound, combinator, compound, …] (combinators: ' ', '>', '+', '~')."""
+    tokens, buf, depth = [], "", 0
+    for c in selector.strip() + " ":
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        if depth == 0 and (c.isspace() or c in ">+~"):
+            if buf:
+                tokens.append(parse_compound(buf))
+                buf = ""
+            comb = c if c in ">+~" else " "
+            if tokens and isinstance(tokens[-1], str):
+                if comb != " ":
+                    tokens[-1] = comb
+            elif tokens:
+                tokens.append(comb)
+        else:
+            buf += c
+    if tokens and isinstance(tokens[-1], str):
+        tokens.pop()
+    return tokens
+
+
+# ── Page model ──
+
+class PageScanner(HTMLParser):
+    """Flat element list with parent links, fold position, and the page's script text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.elements = []       # {tag, id, classes, attrs, parent, above}
+        self.stack = []          # element indexes
+        self.in_nav = 0
+        self.sections_closed = 0
+        self.scripts = []        # inline script text
+        self.script_srcs = []
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        parent = self.stack[-1] if self.stack else None
+        el = {
+            "tag": tag,
+            "id": a.get("id"),
+            "classes": set((a.get("class") or "").split()),
+            "attrs": {k.lower() for k, _ in attrs},
+            "parent": parent,
+            "above": bool(self.in_nav) or tag in ("nav", "header") or self.sections_closed == 0,
+        }
+        self.elements.append(el)
+        if tag == "script":
+            self._in_script = True
+            if a.get("src"):
+                self.script_srcs.append(a["src"])
+        if tag not in VOID_TAGS:
+            self.stack.append(len(self.elements) - 1)
+            if tag in ("nav", "header"):
+                self.in_nav += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._in_script = False
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.elements[self.stack[depth]]["tag"] == tag:
+                for idx in self.stack[depth:]:
+                    t = self.elements[idx]["tag"]
+                    if t in ("nav", "header"):
+                        self.in_nav -= 1
+                    if t == "section" and not any(self.elements[j]["tag"] == "section" for j in self.stack[:depth]):
+                        self.sections_closed += 1
+                del self.stack[depth:]
+                break
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.scripts.append(data)
+
+
+class Page:
+    def __init__(self, path, html):
+        scanner = PageScanner()
+        scanner.feed(html)
+        scanner.close()
+        self.elements = scanner.elements
+        self.by_class, self.by_id, self.by_tag = {}, {}, {}
+        for i, el in enumerate(self.elements):
+            self.by_tag.setdefault(el["tag"], []).append(i)
+            if el["id"]:
+                self.by_id.setdefault(el["id"], []).append(i)
+            for c in el["classes"]:
+                self.by_class.setdefault(c, []).append(i)
+        self.children = {}
+        for i, el in enumerate(self.elements):
+            self.children.setdefault(el["parent"], []).append(i)
+
+        # Classes, ids and attributes the page's scripts add at runtime
+        js = list(scanner.scripts)
+        for src in scanner.script_srcs:
+            local = os.path.normpath(os.path.join(os.path.dirname(path), src.split("?")[0]))
+            if not re.match(r"^(https?:)?//", src) and os.path.exists(local):
+                with open(local, encoding="utf-8", errors="ignore") as f:
+                    js.append(f.read())
+        self.dynamic = set()
+        for text in js:
+            for pattern in RUNTIME_RES:
+                for args in pattern.findall(text):
+                    self.dynamic.update(tok for _, s in JS_STRING_RE.findall(args) for tok in re.findall(r"[\w-]+", s))
+            for classes in JS_MARKUP_CLASS_RE.findall(text):
+                self.dynamic.update(classes.split())
+
+    def matches(self, i, compound):
+        tag, id_, classes, attrs, root = compound
+        el = self.elements[i]
+        if root and el["tag"] != "html":
+            return False
+        if tag and el["tag"] != tag:
+            return False
+        if id_ and el["id"] != id_ and id_ not in self.dynamic:
+            return False
+        if any(c not in el["classes"] and c not in self.dynamic for c in classes):
+            return False
+        return all(a in el["attrs"] or a in self.dynamic for a in attrs)
+
+    def candidates(self, compound):
+        tag, id_, classes, _, root = compound
+        if root:
+            return self.by_tag.get("html", [])
+        if id_ and id_ not in self.dynamic:
+            return self.by_id.get(id_, [])
+        static = [c for c in classes if c not in self.dynamic]
+        if static:
+            return min((self.by_class.get(c, []) for c in static), key=len)
+        if tag:
+            return self.by_tag.get(tag, [])
+        return range(len(self.elements))
+
+    def _match_left(self, i, parts):
+        """Does element i satisfy parts[:-1] (its ancestors/siblings)?"""
+        if len(parts) == 1:
+            return True
+        comb, compound = parts[-2], parts[-3]
+        if comb in "+~":
+            parent = self.elements[i]["parent"]
+            siblings = [j for j in self.children.get(parent, []) if j < i]
+            return any(self.matches(j, compound) and self._match_left(j, parts[:-2]) for j in siblings)
+        j = self.elements[i]["parent"]
+        while j is not None:
+            if self.matches(j, compound) and self._match_left(j, parts[:-2]):
+                return True
+            if comb == ">":
+                return False
+            j = self.elements[j]["parent"]
+        return False
+
+    def selector_hits(self, selector):
+        """(matches anything, matches something above the fold) for a selector list."""
+        used = False
+        for complex_ in split_top(selector, ","):
+            parts = parse_selector(complex_)
+            if not parts:
+                continue
+            for i in self.candidates(parts[-1]):
+                if self.matches(i, parts[-1]) and self._match_left(i, parts):
+                    used = True
+                    if self.elements[i]["above"]:
+                        return True, True
+        return used, False
+
+
+# ── Pruning ──
+
+def minify_body(body):
+    body = re.sub(r"\s+", " ", body).strip()
+    return re.sub(r"\s*;\s*", ";", body).rstrip(";")
+
+
+def animation_names(body):
+    return {name for decl in ANIMATION_RE.findall(body) for name in re.findall(r"[\w-]+", decl)}
+
+
+def prune(rules, page):
+    """-> (all matching rules, above-the-fold rules) as CSS text lists, plus the animations each uses."""
+    full, critical, anim_full, anim_critical = [], [], set(), set()
+    for rule in rules:
+        kind = rule[0]
+        if kind == "style":
+            _, selector, body = rule
+            used, above = page.selector_hits(selector)
+            if not used:
+                continue
+            text = re.sub(r"\s+", " ", selector).strip() + "{" + minify_body(body) + "}"
+            full.append(text)
+            anim_full |= animation_names(body)
+            if above:
+                critical.append(text)
+                anim_critical |= animation_names(body)
+        elif kind == "group":
+            f, c, af, ac = prune(rule[2], page)
+            prelude = re.sub(r"\s+", " ", rule[1])
+            if f:
+                full.append(prelude + "{" + "".join(f) + "}")
+                anim_full |= af
+            if c:
+                critical.append(prelude + "{" + "".join(c) + "}")
+                anim_critical |= ac
+        elif kind == "other":
+            full.append(re.sub(r"\s+", " ", rule[1]))
+            critical.append(re.sub(r"\s+", " ", rule[1]))
+    return full, critical, anim_full, anim_critical
+
+
+def keyframes(rules, names):
+    out = []
+    for rule in rules:
+        if rule[0] == "keyframes" and rule[1] in names:
+            out.append(re.sub(r"\s+", " ", rule[2]))
+        elif rule[0] == "group":
+            inner = keyframes(rule[2], names)
+            if inner:
+                out.append(re.sub(r"\s+", " ", rule[1]) + "{" + "".join(inner) + "}")
+    return out
+
+
+def rebase_urls(css, from_dir, to_dir):
+    """Rewrite relative url(...) references written for from_dir so they work from to_dir."""
+    def fix(m):
+        quote, url = m.group(1), m.group(2)
+        # %23 is an encoded fragment — url(%23n) inside an inline SVG data URI
+        if re.match(r"^(data:|https?:|//|/|#|%23)", url):
+            return m.group(0)
+        target = os.path.normpath(os.path.join(from_dir, url))
+        return f"url({quote}{os.path.relpath(target, to_dir or '.')}{quote})"
+    return re.sub(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""", fix, css)
+
+
+def build(job):
+    """Worker: (page path, original html, [stylesheet paths]) -> (critical css, pruned css)."""
+    path, html, sheets = job
+    page = Page(path, html)
+    page_dir = os.path.dirname(path)
+    critical_parts, full_parts = [], []
+    for sheet in sheets:
+        with open(sheet, encoding="utf-8") as f:
+            rules = parse_css(strip_comments(f.read()))
+        full, critical, anim_full, anim_critical = prune(rules, page)
+        sheet_dir = os.path.dirname(sheet)
+        full_parts.append(rebase_urls("".join(full + keyframes(rules, anim_full)), sheet_dir, OUT_DIR))
+        critical_parts.append(rebase_urls("".join(critical + keyframes(rules, anim_critical)), sheet_dir, page_dir))
+    return "".join(critical_parts), "\n".join(full_parts) + "\n"
+
+
+# ── Page rewriting ──
+
+def original_links(html):
+    """(html with any critical-css block replaced by its original <link> tags, [hrefs])."""
+    m = MARKER_RE.search(html)
+    if m:
+        indent, hrefs = m.group(1), m.group(2).split()
+        links = "".join(f'{indent}<link rel="stylesheet" href="{h}">\n' for h in hrefs)
+        html = html[:m.start()] + links + html[m.end():]
+    hrefs = []
+    for link in LINK_RE.finditer(html):
+        m = HREF_RE.search(link.group(0))
+        if m and not re.match(r"^(https?:)?//", m.group(1)):
+            hrefs.append(m.group(1))
+    return html, hrefs
+
+
+def out_path(page):
+    return os.path.join(OUT_DIR, page.removesuffix(".html").replace("/", "-") + ".css")
+
+
+def inject(html, page, hrefs, critical):
+    """Replace the page's local stylesheet links with inline critical CSS + a deferred pruned sheet."""
+    local = [l for l in LINK_RE.finditer(html) if HREF_RE.search(l.group(0)).group(1) in hrefs]
+    indent = local[0].group(1)
+    href = os.path.relpath(out_path(page), os.path.dirname(page) or ".")
+    block = (
+        f"{indent}<!-- critical-css: {' '.join(hrefs)} -->\n"
+        f"{indent}<style>{critical}</style>\n"
+        f"{indent}<link rel=\"preload\" href=\"{href}\" as=\"style\" onload=\"this.onload=null;this.rel='stylesheet'\">\n"
+        f"{indent}<noscript><link rel=\"stylesheet\" href=\"{href}\"></noscript>\n"
+        f"{indent}<!-- /critical-css -->\n"
+    )
+    for link in reversed(local):
+        html = html[:link.start()] + (block if link is local[0] else "") + html[link.end():]
+    return html
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def cache_key(html, sheets):
+    h = hashlib.sha256(f"{CACHE_VERSION}:{sha256_text(html)}".encode())
+    for sheet in sheets:
+        with open(sheet, "rb") as f:
+            h.update(sheet.encode() + hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inline critical CSS and emit per-page pruned stylesheets")
+    parser.add_argument("pages", nargs="*", help="HTML files or globs (default: site pages, partners, ai-training)")
+    parser.add_argument("--restore", action="store_true", help="Put the original stylesheet links back")
+    parser.add_argument("--force", action="store_true", help="Ignore the cache")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.time()
+    cache = {}
+    if os.path.exists(CACHE_PATH) and not args.force:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+
+    jobs, current = {}, {}
+    for page in expand_pages(args.pages or PAGES):
+        with open(page, encoding="utf-8") as f:
+            text = f.read()
+        html, hrefs = original_links(text)
+        if args.restore:
+            if write_if_changed(page, text, html, args.dry_run):
+                print(f"   ↩️  {page}")
+            continue
+        sheets = [os.path.normpath(os.path.join(os.path.dirname(page), h)) for h in hrefs]
+        if not sheets:
+            continue
+        key = cache_key(html, sheets)
+        current[page] = (text, html, hrefs, key)
+        if cache.get(page, {}).get("key") != key:
+            jobs[page] = (page, html, sheets)
+
+    if args.restore:
+        raise SystemExit(0)
+
+    print(f"🎯 {len(current)} pages, {len(jobs)} to analyse on {args.workers} workers")
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+            for page, (critical, full) in zip(jobs, pool.map(build, jobs.values())):
+                cache[page] = {"key": current[page][3], "critical": critical, "css": full}
+
+    if not args.dry_run:
+        os.makedirs(OUT_DIR, exist_ok=True)
+    over_budget = []
+    for page, (text, html, hrefs, _) in current.items():
+        entry = cache[page]
+        source_bytes = sum(os.path.getsize(os.path.normpath(os.path.join(os.path.dirname(page), h))) for h in hrefs)
+        css_path = out_path(page)
+        old_css = None
+        if os.path.exists(css_path):
+            with open(css_path, encoding="utf-8") as f:
+                old_css = f.read()
+        write_if_changed(css_path, old_css, entry["css"], args.dry_run)
+        changed = write_if_changed(page, text, inject(html, page, hrefs, entry["critical"]), args.dry_run)
+        flag = "✏️ " if changed else "  "
+        print(f"   {flag} {page}: {len(entry['critical']) / 1024:.1f}KB inline, "
+              f"{len(entry['css']) / 1024:.1f}KB deferred (of {source_bytes / 1024:.0f}KB) → {css_path}")
+        if len(entry["critical"].encode()) > CRITICAL_BUDGET:
+            over_budget.append(page)
+
+    if not args.dry_run:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w") as f:
+            json.dump({p: cache[p] for p in sorted(cache)}, f, indent=2)
+            f.write("\n")
+    if over_budget:
+        print(f"⚠️ Inline CSS over {CRITICAL_BUDGET // 1000}KB on: {', '.join(over_budget)}")
+    print(f"✅ Done ({time.time() - start:.2f}s)")
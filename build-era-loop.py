@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Encode the era loop-frames into one looping stream instead of four stills.
+
+The four era masters in masters/backgrounds/loop-frames (1890s → 1920s →
+1940s → 1970s) become a single loop: each era holds for HOLD seconds, then
+crossfades into the next over FADE seconds, and the 1970s frame fades back
+into the 1890s one so the loop is seamless. The crossfades are rendered
+here (NumPy blends, smoothstep-eased), so the client decodes a single
+stream and has no crossfading left to do.
+
+For every width in WIDTHS this writes to OUT_DIR:
+
+    era-loop-<w>.webm         VP9 \\  ffmpeg; skipped with a warning
+    era-loop-<w>.mp4          H.264 /  when ffmpeg isn't on PATH
+    era-loop-<w>.webp         animated WebP (Pillow) — a hold is one long frame
+    era-loop-<w>.avif         animated AVIF (Pillow, when built with AVIF)
+                              both only up to ANIM_MAX_WIDTH
+    era-loop-<w>-poster.jpg   first frame, for <video poster> / reduced motion
+
+Masters are decoded once per width through image_tiles (strip resize). Frames
+are generated one at a time and piped to ffmpeg, so memory stays at a few
+frames. Widths run in parallel. A width is rebuilt only when its masters
+or these settings change (OUT_DIR/manifest.json).
+
+Usage:
+    python3 build-era-loop.py                   # all widths, all formats
+    python3 build-era-loop.py --widths 1280 --formats webm,mp4
+    python3 build-era-loop.py --force
+"""
+import os, sys, json, time, shutil, hashlib, argparse, subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from PIL import Image, features
+from image_tiles import open_frame, draft_size, fit
+from provenance import file_sha256
+
+MASTERS_DIR = "masters/backgrounds/loop-frames"
+FRAMES = ["era1-1890s-v2.jpg", "era2-1920s-v2.jpg", "era3-1940s-v2.jpg", "era4-1970s-v2.jpg"]
+STILLS_DIR = "assets/backgrounds/loop-frames"   # what the loop replaces, for the size report
+OUT_DIR = "assets/loops"
+WIDTHS = (1920, 1280, 828)
+FORMATS = ("webm", "mp4", "webp", "avif")
+HOLD = 4.0          # seconds on each era
+FADE = 1.5          # seconds per crossfade
+FPS = 24            # video frame rate
+ANIM_FADE_FPS = 8   # animated images: crossfade frames per second (holds are single frames)
+ANIM_MAX_WIDTH = 1280  # Pillow holds every animation frame in memory; wider loops are video-only
+POSTER_QUALITY = 80
+FFMPEG_ARGS = {
+    "webm": ["-c:v", "libvpx-vp9", "-b:v", "0", "-crf", "40", "-row-mt", "1", "-deadline", "good",
+             "-pix_fmt", "yuv420p"],
+    "mp4": ["-c:v", "libx264", "-crf", "26", "-preset", "slow", "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+}
+ANIM_PARAMS = {
+    "webp": {"quality": 60, "method": 4},
+    "avif": {"quality": 55, "speed": 6},
+}
+SETTINGS_KEY = json.dumps({"frames": FRAMES, "hold": HOLD, "fade": FADE, "fps": FPS, "anim_fade_fps": ANIM_FADE_FPS,
+                           "ffmpeg": FFMPEG_ARGS, "anim": ANIM_PARAMS, "poster": POSTER_QUALITY}, sort_keys=True)
+
+
+def load_stills(paths, width):
+    """Each master shrunk to width (cropped to the first one's aspect) as uint8 RGB arrays."""
+    stills, aspect = [], None
+    for path in paths:
+        with open_frame(path, draft_size(path, width, aspect)) as frame:
+            aspect = aspect or frame.width / frame.height
+            with fit(frame, width, aspect) as small:
+                stills.append(np.array(small.rgb))
+    # odd sizes break yuv420p
+    h, w = (min(s.shape[0] for s in stills) // 2) * 2, (width // 2) * 2
+    return [s[:h, :w] for s in stills]
+
+
+def timeline(stills, fade_fps):
+    """(frame, seconds) pairs for one loop: a hold per era, then eased crossfade frames into the next."""
+    steps = max(1, round(FADE * fade_fps))
+    for i, a in enumerate(stills):
+        b = stills[(i + 1) % len(stills)]
+        yield a, HOLD
+        af, bf = a.astype(np.float32), b.astype(np.float32)
+        for k in range(1, steps):
+            t = k / steps
+            t = t * t * (3 - 2 * t)
+            yield (af + (bf - af) * t + 0.5).astype(np.uint8), FADE / steps
+
+
+def video_frames(stills):
+    """Constant-rate frames for ffmpeg (holds repeated; the codecs make those nearly free)."""
+    for frame, seconds in timeline(stills, FPS):
+        for _ in range(max(1, round(seconds * FPS))):
+            yield frame
+
+
+def encode_video(stills, fmt, path):
+    h, w = stills[0].shape[:2]
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}",
+           "-r", str(FPS), "-i", "-", *FFMPEG_ARGS[fmt], "-an", path]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for frame in video_frames(stills):
+            proc.stdin.write(frame.tobytes())
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    err = proc.stderr.read().decode(errors="replace")
+    if proc.wait() != 0:
+        raise RuntimeError(f"ffmpeg {fmt}: {err.strip()[-300:]}")
+
+
+def encode_animation(stills, fmt, path):
+    frames, durations = [], []
+    for frame, seconds in timeline(stills, ANIM_FADE_FPS):
+        frames.append(Image.fromarray(frame))
+        durations.append(round(seconds * 1000))
+    frames[0].save(path, fmt.upper(), save_all=True, append_images=frames[1:], duration=durations, loop=0,
+                   **ANIM_PARAMS[fmt])
+
+
+def available(fmt):
+    if fmt in FFMPEG_ARGS:
+        return shutil.which("ffmpeg") is not None
+    return features.check(fmt)
+
+
+def formats_for(width, formats):
+    return [f for f in formats if f in FFMPEG_ARGS or width <= ANIM_MAX_WIDTH]
+
+
+def build_width(paths, width, formats, out_dir):
+    """Worker: every format plus the poster at one width. Returns {path: bytes}."""
+    stills = load_stills(paths, width)
+    written = {}
+    poster = os.path.join(out_dir, f"era-loop-{width}-poster.jpg")
+    Image.fromarray(stills[0]).save(poster, "JPEG", quality=POSTER_QUALITY, optimize=True, progressive=True)
+    written[poster] = os.path.getsize(poster)
+    for fmt in formats_for(width, formats):
+        path = os.path.join(out_dir, f"era-loop-{width}.{fmt}")
+        tmp = f"{path}.tmp.{fmt}"
+        (encode_video if fmt in FFMPEG_ARGS else encode_animation)(stills, fmt, tmp)
+        os.replace(tmp, path)
+        written[path] = os.path.getsize(path)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encode the era loop-frames into looping video / animated images")
+    parser.add_argument("--widths", default=",".join(map(str, WIDTHS)))
+    parser.add_argument("--formats", default=",".join(FORMATS), help=f"Comma-separated: {', '.join(FORMATS)}")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    widths = [int(w) for w in args.widths.split(",")]
+    formats = args.formats.split(",")
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)} — choose from {', '.join(FORMATS)}")
+    for fmt in [f for f in formats if not available(f)]:
+        print(f"⚠️ {fmt}: {'ffmpeg not on PATH' if fmt in FFMPEG_ARGS else 'Pillow built without it'} — skipping")
+        formats.remove(fmt)
+
+    start = time.time()
+    paths = [os.path.join(MASTERS_DIR, name) for name in FRAMES]
+    key = hashlib.sha256(":".join([SETTINGS_KEY] + [file_sha256(p) for p in paths]).encode()).hexdigest()
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    def current(width):
+        entry = manifest.get(str(width), {})
+        wanted = [os.path.join(args.out, f"era-loop-{width}.{fmt}") for fmt in formats_for(width, formats)]
+        return entry.get("key") == key and all(p in entry["files"] and os.path.exists(p) for p in wanted)
+
+    todo = [w for w in widths if args.force or not current(w)]
+    print(f"🎞  {len(FRAMES)} eras, {HOLD:g}s hold + {FADE:g}s crossfade → {len(todo)}/{len(widths)} widths "
+          f"× {', '.join(formats) or 'poster only'}")
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(build_width, paths, w, formats, args.out): w for w in todo}
+        for future in as_completed(futures):
+            width = futures[future]
+            try:
+                written = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ {width}px: {e}")
+                continue
+            entry = manifest.get(str(width), {})
+            files = entry.get("files", {}) if entry.get("key") == key else {}
+            manifest[str(width)] = {"key": key, "files": {**files, **written}}
+            for path, size in sorted(written.items()):
+                print(f"   ✅ {path} ({size // 1024}KB)")
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    stills = sum(os.path.getsize(os.path.join(STILLS_DIR, n)) for n in FRAMES if os.path.exists(os.path.join(STILLS_DIR, n)))
+    print(f"\n📦 Stills it replaces: {stills // 1024}KB desktop ({len(FRAMES)} files in {STILLS_DIR}/)")
+    for width in widths:
+        for path, size in sorted(manifest.get(str(width), {}).get("files", {}).items()):
+            if not path.endswith("-poster.jpg"):
+                print(f"   {os.path.basename(path):24} {size // 1024:6}KB")
+    print(f"✅ Done in {time.time() - start:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Build responsive renditions of the portfolio and gallery images.
+
+Sources come from portfolio-data.json (`thumbnail.downloadAs` and any local
+`contentImages`) plus the project gallery folders. When a `-hires` master
+exists next to the published file (e.g. 02-warner-bros-hires.jpg) it is used as
+the source, so the wide renditions come from real pixels.
+
+Each source is decoded once and stepped down through WIDTHS, written as AVIF
+and WebP with a progressive JPEG fallback. Work is spread over a process pool
+and unchanged sources are skipped. assets/renditions/manifest.json lists every
+variant — inject-srcset.py reads it to write `srcset` attributes.
+
+Usage:
+    python3 build-image-renditions.py
+    python3 build-image-renditions.py --force --workers 8
+"""
+import os, re, glob, json, time, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image, ImageOps, features
+from provenance import file_sha256
+
+PORTFOLIO_JSON = "portfolio-data.json"
+PORTFOLIO_DIR = "assets/portfolio"
+EXTRA_GLOBS = [
+    "assets/portfolio/*.jpg",            # thumbnails not in the JSON (AI showcase, showreel…)
+    "assets/portfolio/gallery/*/*.jpg",  # project page galleries
+]
+OUT_DIR = "assets/renditions"
+MANIFEST_PATH = f"{OUT_DIR}/manifest.json"
+
+WIDTHS = [320, 480, 640, 800, 1200, 1600]
+QUALITY = {"avif": 55, "webp": 78, "jpg": 82}
+FORMATS = [fmt for fmt in ("avif", "webp", "jpg") if fmt == "jpg" or features.check(fmt)]
+SETTINGS_KEY = json.dumps([WIDTHS, QUALITY, FORMATS])
+
+
+def resolve_master(public_path):
+    """Prefer a -hires sibling as the rendition source."""
+    stem, ext = os.path.splitext(public_path)
+    hires = f"{stem}-hires{ext}"
+    return hires if os.path.exists(hires) else public_path
+
+
+def collect_sources():
+    """Published image path -> master path, in portfolio order."""
+    sources = {}
+    with open(PORTFOLIO_JSON) as f:
+        data = json.load(f)
+    for project in data.get("projects", []):
+        thumb = (project.get("thumbnail") or {}).get("downloadAs")
+        if thumb:
+            # downloadAs still carries the Wix extension (.png) — the repo ships .jpg
+            stem = os.path.splitext(thumb)[0]
+            for ext in (".jpg", ".jpeg", ".png", ".webp"):
+                path = f"{PORTFOLIO_DIR}/{stem}{ext}"
+                if os.path.exists(path):
+                    sources[path] = resolve_master(path)
+                    break
+        for img in project.get("contentImages", []):
+            if not re.match(r"^https?://", img) and os.path.exists(img):
+                sources[img] = resolve_master(img)
+
+    for pattern in EXTRA_GLOBS:
+        for path in sorted(glob.glob(pattern)):
+            if "-hires." not in path:
+                sources.setdefault(path, resolve_master(path))
+    return sources
+
+
+def rendition_path(public_path, width, fmt):
+    rel = os.path.splitext(os.path.relpath(public_path, "assets"))[0]
+    return f"{OUT_DIR}/{rel}-{width}w.{fmt}"
+
+
+def target_widths(src_width):
+    widths = [w for w in WIDTHS if w < src_width]
+    # Always offer the native width so the largest screens get the full master
+    widths.append(src_width)
+    return widths
+
+
+def render(public_path, master_path):
+    """Worker: decode once, step down through the widths, write every format."""
+    with Image.open(master_path) as im:
+        im = ImageOps.exif_transpose(im).convert("RGB")
+        src_w, src_h = im.size
+        variants = {fmt: [] for fmt in FORMATS}
+        current = im
+        # Largest first, each step resized from the previous one (cheaper, same quality at these ratios)
+        for width in sorted(target_widths(src_w), reverse=True):
+            height = round(src_h * width / src_w)
+            if current.width != width:
+                current = current.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+            for fmt in FORMATS:
+                out = rendition_path(public_path, width, fmt)
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                if fmt == "jpg":
+                    current.save(out, "JPEG", quality=QUALITY[fmt], optimize=True, progressive=True)
+                elif fmt == "webp":
+                    current.save(out, "WEBP", quality=QUALITY[fmt], method=6)
+                else:
+                    current.save(out, "AVIF", quality=QUALITY[fmt], speed=6)
+                variants[fmt].append({"width": width, "height": height, "path": out, "bytes": os.path.getsize(out)})
+        for fmt in variants:
+            variants[fmt].sort(key=lambda v: v["width"])
+    return {
+        "master": master_path,
+        "sha256": file_sha256(master_path),
+        "settings": SETTINGS_KEY,
+        "width": src_w,
+        "height": src_h,
+        "variants": variants,
+    }
+
+
+def is_current(entry, master_path):
+    if not entry or entry.get("master") != master_path or entry.get("settings") != SETTINGS_KEY:
+        return False
+    if not all(os.path.exists(v["path"]) for vs in entry["variants"].values() for v in vs):
+        return False
+    return entry.get("sha256") == file_sha256(master_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build responsive image renditions")
+    parser.add_argument("--force", action="store_true", help="Rebuild every rendition")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.time()
+    manifest = {}
+    if os.path.exists(MANIFEST_PATH) and not args.force:
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+
+    sources = collect_sources()
+    todo = {p: m for p, m in sources.items() if not is_current(manifest.get(p), m)}
+    print(f"🖼  {len(sources)} images, {len(todo)} to render ({', '.join(FORMATS)}) on {args.workers} workers")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(render, p, m): p for p, m in todo.items()}
+        for fut in as_completed(futures):
+            path = futures[fut]
+            try:
+                manifest[path] = fut.result()
+            except Exception as e:
+                print(f"   ❌ {path}: {e}")
+                continue
+            src_kb = os.path.getsize(path) // 1024
+            smallest = min(v["bytes"] for vs in manifest[path]["variants"].values() for v in vs) // 1024
+            print(f"   ✅ {path} ({src_kb}KB → {smallest}KB smallest)")
+
+    # Drop entries whose source disappeared, keep portfolio order
+    manifest = {p: manifest[p] for p in sources if p in manifest}
+    os.makedirs(OUT_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"\n✅ {MANIFEST_PATH} ({time.time() - start:.1f}s)")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Render the project pages and sitemap.xml from portfolio-data.json.
+
+`projectPages` in portfolio-data.json has one entry per page under projects/,
+in portfolio order — the same order sets the previous/next links, which run
+out to All Projects at both ends. Entries with a "series" (the AI case studies)
+form their own chain instead of continuing the portfolio one. Standard entries
+are rendered from templates/project.html. Entries with "layout": "custom"
+(Yousician, the AI case studies) keep their hand-built markup, but still get a
+sitemap entry and a place in the previous/next chain.
+
+Templates are string.Template files. templates/blocks.html holds the shared
+head/nav/footer and the repeated pieces (tags, meta blocks, gallery items,
+videos, result cards), split on `<!-- block: name -->` markers. Parsed templates are
+cached per process and re-read only when their mtime changes.
+
+Builds are incremental: the inputs of each output (its page context, the
+templates and GENERATOR_VERSION) are hashed into templates/build-state.json,
+and only outputs whose hash changed are rendered, on a process pool. Rendered
+pages come out without srcset, placeholders or critical CSS; the deploy
+workflow (.github/workflows/pages.yml) runs inject-srcset.py,
+build-placeholders.py and build-critical-css.py after this script.
+
+A sitemap <lastmod> moves to today only when that page's file changes.
+
+Usage:
+    python3 build-pages.py              # render what changed
+    python3 build-pages.py --force      # render everything
+    python3 build-pages.py --dry-run    # list what would change
+"""
+import os, re, json, time, hashlib, datetime, argparse
+from html import escape
+from string import Template
+from concurrent.futures import ProcessPoolExecutor
+from html_images import write_if_changed
+from provenance import file_sha256
+
+PORTFOLIO_JSON = "portfolio-data.json"
+TEMPLATES_DIR = "templates"
+STATE_PATH = f"{TEMPLATES_DIR}/build-state.json"
+SITEMAP_PATH = "sitemap.xml"
+SITE_URL = "https://inspiredcreativegroupinc.com/"
+GENERATOR_VERSION = 2
+
+# Hand-maintained pages listed in the sitemap ahead of the generated ones: (path, changefreq, priority)
+STATIC_URLS = [("index.html", "weekly", 1.0), ("partners.html", "monthly", 0.9)]
+DEFAULT_PRIORITY = 0.6
+DEFAULT_ALLOW = "autoplay; fullscreen; picture-in-picture"
+ALL_PROJECTS = ("../index.html#work", "All Projects")
+BLOCK_RE = re.compile(r"^<!-- block: (\w+) -->\n", re.MULTILINE)
+
+
+# ── Templates ──
+
+_cache = {}
+
+
+def _cached(path, parse):
+    mtime = os.stat(path).st_mtime_ns
+    hit = _cache.get(path)
+    if hit is None or hit[0] != mtime:
+        with open(path, encoding="utf-8") as f:
+            hit = _cache[path] = (mtime, parse(f.read()))
+    return hit[1]
+
+
+def template(name):
+    return _cached(os.path.join(TEMPLATES_DIR, name), Template)
+
+
+def blocks():
+    """name -> Template for every `<!-- block: name -->` section of blocks.html."""
+    def parse(text):
+        parts = BLOCK_RE.split(text)[1:]
+        return {name: Template(body.removesuffix("\n")) for name, body in zip(parts[::2], parts[1::2])}
+    return _cached(os.path.join(TEMPLATES_DIR, "blocks.html"), parse)
+
+
+def templates_digest():
+    h = hashlib.sha256(str(GENERATOR_VERSION).encode())
+    for name in sorted(os.listdir(TEMPLATES_DIR)):
+        if name != os.path.basename(STATE_PATH):
+            with open(os.path.join(TEMPLATES_DIR, name), "rb") as f:
+                h.update(name.encode() + f.read())
+    return h.hexdigest()
+
+
+# ── Rendering ──
+
+def text(value):
+    return escape(value, quote=False)
+
+
+def attr(value):
+    return escape(value, quote=False).replace('"', "&quot;")
+
+
+def block(name, /, **values):
+    return blocks()[name].substitute(**values)
+
+
+def join(name, items, /, **common):
+    return "\n".join(block(name, **common, **item) for item in items)
+
+
+def chrome(page_title, description, root, stylesheet):
+    return {
+        "head": block("head", page_title=text(page_title), description=attr(description), root=root,
+                      stylesheet=stylesheet),
+        "footer": block("footer", root=root),
+        "nav_script": block("nav_script"),
+    }
+
+
+def render_media(page):
+    out = []
+    for item in page["media"]:
+        if item["type"] == "video":
+            out.append(block("video", src=attr(item["src"]), allow=attr(item.get("allow", DEFAULT_ALLOW)),
+                             title=attr(item.get("title") or page["title"])))
+        else:
+            images = [img if isinstance(img, dict) else {"src": img} for img in item["images"]]
+            items = [{"src": attr(img["src"]), "alt": attr(img.get("alt") or page["title"])} for img in images]
+            classes = " ".join(["project-gallery"] + ([item["variant"]] if item.get("variant") else []))
+            out.append(block("gallery", classes=classes, items=join("gallery_item", items, root="..")))
+    return "\n".join(out)
+
+
+def render_meta(page):
+    out = []
+    for entry in page["meta"]:
+        if "list" in entry:
+            items = join("meta_item", [{"item": text(i)} for i in entry["list"]])
+            out.append(block("meta_list", label=text(entry["label"]), items=items))
+        else:
+            out.append(block("meta_text", label=text(entry["label"]), html=entry["html"]))
+    return "\n".join(out)
+
+
+def render_project(ctx):
+    """Worker: one standard project page -> HTML."""
+    page, prev, next_ = ctx["page"], ctx["prev"], ctx["next"]
+    testimonial = results = ""
+    if page.get("testimonial"):
+        testimonial = block("testimonial", **{k: text(v) for k, v in page["testimonial"].items()})
+    if page.get("results"):
+        cards = join("result_card", [{k: text(v) for k, v in r.items()} for r in page["results"]])
+        results = block("results", cards=cards)
+    return template("project.html").substitute(
+        **chrome(page.get("metaTitle") or f"{page['title']} — {page['client']}", page["description"], "..",
+                 "projects.css"),
+        hero_image=attr(page["heroImage"]),
+        hero_alt=attr(page.get("heroAlt") or page["title"]),
+        category=text(page["category"]),
+        client=text(page["client"]),
+        title=text(page["title"]),
+        tags=join("tag", [{"tag": text(t)} for t in page["tags"]]),
+        paragraphs=join("paragraph", [{"html": p} for p in page["paragraphs"]]),
+        meta=render_meta(page),
+        media=render_media(page),
+        testimonial=testimonial,
+        results=results,
+        prev=block("nav_link", href=attr(prev[0]), direction="prev", label="← Previous", title=text(prev[1])),
+        next=block("nav_link", href=attr(next_[0]), direction="next", label="Next →", title=text(next_[1])),
+    )
+
+
+def render(job):
+    kind, ctx = job
+    return render_project(ctx)
+
+
+# ── Build ──
+
+def jobs_for(pages):
+    """Output path -> (kind, context). The context is everything the output depends on besides templates."""
+    link = lambda p: (f"{p['slug']}.html", p["title"])
+    jobs = {}
+    for page in pages:
+        if page.get("layout", "standard") != "standard":
+            continue
+        chain = [p for p in pages if p.get("series") == page.get("series")]
+        j = chain.index(page)
+        jobs[f"projects/{page['slug']}.html"] = ("project", {
+            "page": page,
+            "prev": link(chain[j - 1]) if j > 0 else ALL_PROJECTS,
+            "next": link(chain[j + 1]) if j + 1 < len(chain) else ALL_PROJECTS,
+        })
+    return jobs
+
+
+def input_hash(job, digest):
+    return hashlib.sha256((digest + json.dumps(job, sort_keys=True)).encode()).hexdigest()
+
+
+def read_text(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def seed_lastmod():
+    """loc -> lastmod from the current sitemap, for pages the state file hasn't seen yet."""
+    return dict(re.findall(r"<loc>([^<]+)</loc>\s*<lastmod>([^<]+)</lastmod>", read_text(SITEMAP_PATH) or ""))
+
+
+def render_sitemap(pages, state, changed, today):
+    urls = list(STATIC_URLS)
+    urls += [(f"projects/{p['slug']}.html", "monthly", p.get("priority", DEFAULT_PRIORITY)) for p in pages]
+    seeded = seed_lastmod()
+    entries = []
+    for path, freq, prio in urls:
+        loc = SITE_URL + ("" if path == "index.html" else path.removesuffix("index.html"))
+        digest = file_sha256(path)
+        seen = state.get(path, {})
+        if seen.get("file") != digest:
+            # first sighting of an unchanged page keeps the date the sitemap already had
+            first = "file" not in seen and path not in changed
+            state[path] = seen = {**seen, "file": digest, "lastmod": seeded.get(loc, today) if first else today}
+        entries.append({"loc": loc, "lastmod": seen["lastmod"], "changefreq": freq, "priority": f"{prio:.1f}"})
+    return template("sitemap.xml").substitute(urls=join("sitemap_url", entries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render project pages and sitemap from portfolio-data.json")
+    parser.add_argument("--force", action="store_true", help="Render every page even if its inputs are unchanged")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.time()
+    with open(PORTFOLIO_JSON, encoding="utf-8") as f:
+        pages = json.load(f)["projectPages"]
+    state = {}
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            state = json.load(f)
+
+    digest = templates_digest()
+    jobs = jobs_for(pages)
+    hashes = {path: input_hash(job, digest) for path, job in jobs.items()}
+    todo = [p for p in jobs if args.force or not os.path.exists(p) or state.get(p, {}).get("inputs") != hashes[p]]
+    print(f"🧱 {len(jobs)} generated pages, {len(todo)} to render on {args.workers} workers")
+
+    changed = []
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(todo))) as pool:
+            for path, html in zip(todo, pool.map(render, [jobs[p] for p in todo])):
+                if write_if_changed(path, read_text(path), html, args.dry_run):
+                    changed.append(path)
+                    print(f"   ✏️  {path}")
+                state.setdefault(path, {})["inputs"] = hashes[path]
+
+    today = datetime.date.today().isoformat()
+    sitemap = render_sitemap(pages, state, set(changed), today)
+    if write_if_changed(SITEMAP_PATH, read_text(SITEMAP_PATH), sitemap, args.dry_run):
+        print(f"   ✏️  {SITEMAP_PATH}")
+
+    if not args.dry_run:
+        # pages no longer generated or listed drop out of the state
+        known = set(jobs) | {path for path, *_ in STATIC_URLS} | {f"projects/{p['slug']}.html" for p in pages}
+        with open(STATE_PATH, "w") as f:
+            json.dump({path: state[path] for path in sorted(state) if path in known}, f, indent=2)
+            f.write("\n")
+    print(f"✅ {len(changed)} pages changed ({time.time() - start:.2f}s)")
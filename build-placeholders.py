@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Instant-first-paint placeholders for the section backgrounds and portfolio tiles.
+
+For every targeted <img> (section backgrounds, project heroes, work cards,
+gallery items) this computes:
+- a BlurHash (4x3 components)
+- the dominant colour (mode of a 4-bit-per-channel histogram)
+- a ~32px blurred JPEG as a base64 data URI — the -placeholder.jpg from
+  build-backgrounds.py when there is one
+
+Images are decoded at thumbnail size across a thread pool, then the BlurHash
+DCT and the colour histograms run as one NumPy batch over all of them.
+Results go to assets/placeholders.json, and each <img> gets an inline
+`background` (colour + data URI) that shows until the real image paints.
+
+Usage:
+    python3 build-placeholders.py                    # site pages + partners + ai-training
+    python3 build-placeholders.py --color-only       # no data URIs in the HTML
+    python3 build-placeholders.py --sidecar-only
+"""
+import os, io, re, json, time, base64, argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+from image_metrics import srgb_to_linear
+from html_images import (SITE_PAGES, scan, expand_pages, resolve_src, set_attr, serialize_img,
+                         apply_edits, write_if_changed)
+
+PAGES = SITE_PAGES + ["partners.html", "ai-training.html"]
+SIDECAR_PATH = "assets/placeholders.json"
+TARGET_CLASSES = ("section-bg", "project-hero-bg", "hero-video-thumb", "work-card-image", "gallery-item")
+
+THUMB = 32              # BlurHash / histogram input is THUMB x THUMB
+COMPONENTS = (4, 3)     # BlurHash x, y components
+LQIP_WIDTH = 32
+LQIP_QUALITY = 50
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+# ── Loading ──
+
+def load_thumbs(path):
+    """Returns (THUMB x THUMB uint8 RGB for the batch, LQIP JPEG bytes, (w, h))."""
+    with Image.open(path) as im:
+        size = im.size
+        im.draft("RGB", (THUMB * 4, THUMB * 4))
+        im = ImageOps.exif_transpose(im).convert("RGB")
+        square = np.asarray(im.resize((THUMB, THUMB), Image.BOX), dtype=np.uint8)
+
+        stem, _ = os.path.splitext(path)
+        prebuilt = f"{stem}-placeholder.jpg"
+        if os.path.exists(prebuilt):
+            with open(prebuilt, "rb") as f:
+                lqip = f.read()
+        else:
+            small = im.resize((LQIP_WIDTH, max(1, round(im.height * LQIP_WIDTH / im.width))), Image.BOX)
+            buf = io.BytesIO()
+            small.filter(ImageFilter.GaussianBlur(1)).save(buf, "JPEG", quality=LQIP_QUALITY, optimize=True)
+            lqip = buf.getvalue()
+    return square, lqip, size
+
+
+# ── Batched metrics ──
+
+def _base83(value, length):
+    return "".join(BASE83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _linear_to_srgb8(v):
+    v = np.clip(v, 0.0, 1.0)
+    s = np.where(v <= 0.0031308, v * 12.92, 1.055 * np.power(v, 1 / 2.4) - 0.055)
+    return np.round(s * 255).astype(int)
+
+
+def blurhash_batch(thumbs, components=COMPONENTS):
+    """BlurHash for a (N, H, W, 3) uint8 batch — one einsum for every image's DCT."""
+    cx, cy = components
+    n, h, w, _ = thumbs.shape
+    lin = srgb_to_linear(thumbs.astype(np.float32) / 255.0)
+    bx = np.cos(np.pi * np.outer(np.arange(w), np.arange(cx)) / w)     # (W, cx)
+    by = np.cos(np.pi * np.outer(np.arange(h), np.arange(cy)) / h)     # (H, cy)
+    norm = np.full((cy, cx), 2.0)
+    norm[0, 0] = 1.0
+    factors = np.einsum("yj,xi,nyxc->njic", by, bx, lin) * (norm[None, :, :, None] / (w * h))
+    factors = factors.reshape(n, cx * cy, 3)
+
+    dc, ac = factors[:, 0], factors[:, 1:]
+    max_ac = np.abs(ac).max(axis=(1, 2)) if ac.size else np.zeros(n)
+    q_max = np.clip(np.floor(max_ac * 166 - 0.5), 0, 82).astype(int)
+    max_value = (q_max + 1) / 166.0
+    scaled = ac / max_value[:, None, None]
+    q_ac = np.clip(np.floor(np.sign(scaled) * np.sqrt(np.abs(scaled)) * 9 + 9.5), 0, 18).astype(int)
+    ac_codes = q_ac[..., 0] * 361 + q_ac[..., 1] * 19 + q_ac[..., 2]
+    dc_rgb = _linear_to_srgb8(dc)
+    dc_codes = (dc_rgb[:, 0] << 16) + (dc_rgb[:, 1] << 8) + dc_rgb[:, 2]
+
+    size_flag = (cx - 1) + (cy - 1) * 9
+    return [
+        _base83(size_flag, 1) + _base83(int(q_max[k]), 1) + _base83(int(dc_codes[k]), 4)
+        + "".join(_base83(int(c), 2) for c in ac_codes[k])
+        for k in range(n)
+    ]
+
+
+def dominant_colors(thumbs, bits=4):
+    """Mean colour of the most populated bin of a (2^bits)^3 histogram, per image."""
+    n = thumbs.shape[0]
+    px = thumbs.reshape(n, -1, 3).astype(np.int64)
+    q = px >> (8 - bits)
+    codes = (q[..., 0] << (2 * bits)) | (q[..., 1] << bits) | q[..., 2]
+    bins = 1 << (3 * bits)
+    flat = (codes + np.arange(n)[:, None] * bins).ravel()
+    counts = np.bincount(flat, minlength=n * bins).reshape(n, bins)
+    mode = counts.argmax(axis=1)
+    in_mode = codes == mode[:, None]
+    means = (px * in_mode[..., None]).sum(axis=1) / in_mode.sum(axis=1)[:, None]
+    return ["#%02x%02x%02x" % tuple(int(round(c)) for c in rgb) for rgb in means]
+
+
+def compute(paths, workers=None):
+    workers = workers or min(32, (os.cpu_count() or 2) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(load_thumbs, paths))
+    thumbs = np.stack([t for t, _, _ in loaded])
+    hashes = blurhash_batch(thumbs)
+    colors = dominant_colors(thumbs)
+    return {
+        path: {
+            "width": size[0],
+            "height": size[1],
+            "color": color,
+            "blurhash": bh,
+            "lqip": "data:image/jpeg;base64," + base64.b64encode(lqip).decode("ascii"),
+        }
+        for path, (_, lqip, size), color, bh in zip(paths, loaded, colors, hashes)
+    }
+
+
+# ── Injection ──
+
+def set_style_background(style, value):
+    # split on ';' outside url(...) — the data URI itself contains "image/jpeg;base64"
+    decls = [d.strip() for d in re.split(r";(?![^(]*\))", style or "") if d.strip()]
+    decls = [d for d in decls if d.split(":", 1)[0].strip().lower() not in ("background", "background-color")]
+    decls.append(f"background:{value}")
+    return "; ".join(decls)
+
+
+def targets(page, scanner):
+    for img in scanner.images:
+        if not any(c in TARGET_CLASSES for c in img["classes"]):
+            continue
+        path = resolve_src(dict(img["attrs"]).get("src"), page)
+        if path and os.path.exists(path) and not path.endswith(".svg"):
+            yield img, path
+
+
+def inject(page, text, scanner, placeholders, color_only):
+    edits = []
+    for img, path in targets(page, scanner):
+        p = placeholders[path]
+        value = p["color"] if color_only else f"{p['color']} url({p['lqip']}) center/cover no-repeat"
+        attrs = list(img["attrs"])
+        set_attr(attrs, "style", set_style_background(dict(attrs).get("style"), value))
+        new_img = serialize_img(attrs, img["raw"].rstrip().endswith("/>"))
+        if new_img != img["raw"]:
+            edits.append((img["start"], img["end"], new_img))
+    return apply_edits(text, edits), len(edits)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate LQIP/BlurHash/dominant-colour placeholders")
+    parser.add_argument("pages", nargs="*", help="HTML files or globs (default: site pages, partners, ai-training)")
+    parser.add_argument("--color-only", action="store_true", help="Inline only the dominant colour, not the data URI")
+    parser.add_argument("--sidecar-only", action="store_true", help=f"Only write {SIDECAR_PATH}")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    start = time.time()
+    pages = {}
+    for page in expand_pages(args.pages or PAGES):
+        with open(page, encoding="utf-8") as f:
+            text = f.read()
+        pages[page] = (text, scan(text))
+
+    paths = sorted({path for page, (_, scanner) in pages.items() for _, path in targets(page, scanner)})
+    placeholders = compute(paths) if paths else {}
+    print(f"🎨 {len(paths)} images from {len(pages)} pages ({time.time() - start:.2f}s)")
+
+    if not args.dry_run:
+        with open(SIDECAR_PATH, "w") as f:
+            json.dump(placeholders, f, indent=2)
+            f.write("\n")
+        print(f"✅ {SIDECAR_PATH}")
+
+    if not args.sidecar_only:
+        for page, (text, scanner) in pages.items():
+            new, n_edits = inject(page, text, scanner, placeholders, args.color_only)
+            if write_if_changed(page, text, new, args.dry_run):
+                print(f"   ✏️  {page}: {n_edits} <img> tags")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Build assets/downloads/ai-image-toolkit-2026.zip (toolkit PDF + skill folder).
+
+Replaces the unzip → copy → re-zip dance in rebuild-toolkit.sh:
+- members of image-prompt-engineer-skill.zip are streamed straight into the
+  bundle — their compressed bytes are copied as-is, never extracted to disk
+  and never recompressed (BundleWriter writes the ZIP structure itself, so
+  nothing depends on zipfile internals); the PDF is deflated at level 9
+- the rebuild is skipped entirely when the input hashes match the manifest
+- a manifest with per-entry checksums is written next to the bundle
+- --reproducible normalizes entry dates, permissions and order, so the same
+  inputs always give a byte-identical ZIP
+
+Usage:
+    python3 build-toolkit-bundle.py                   # incremental
+    python3 build-toolkit-bundle.py --reproducible    # byte-identical output for identical inputs
+    python3 build-toolkit-bundle.py --force           # rebuild even if inputs are unchanged
+"""
+import os, json, time, zlib, struct, hashlib, zipfile, argparse
+from provenance import file_sha256
+
+DOWNLOADS = "assets/downloads"
+SKILL_ZIP = f"{DOWNLOADS}/image-prompt-engineer-skill.zip"
+PDF_PATH = f"{DOWNLOADS}/prompt-engineering-toolkit-2026.pdf"
+BUNDLE_PATH = f"{DOWNLOADS}/ai-image-toolkit-2026.zip"
+MANIFEST_PATH = f"{DOWNLOADS}/ai-image-toolkit-2026.manifest.json"
+
+SKILL_PREFIX = "image-prompt-engineer-skill/"
+BUNDLE_FORMAT = 2  # bump when the bundle layout changes to force a rebuild
+BUILD_EPOCH = 1767225600  # 2026-01-01T00:00:00Z — entry date in reproducible mode
+CHUNK = 1 << 20
+
+
+def sha256_member(zf, info):
+    h = hashlib.sha256()
+    with zf.open(info) as f:
+        for block in iter(lambda: f.read(CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def input_hashes(reproducible=False):
+    return {
+        "format": BUNDLE_FORMAT,
+        "reproducible": reproducible,
+        SKILL_ZIP: file_sha256(SKILL_ZIP),
+        PDF_PATH: file_sha256(PDF_PATH),
+    }
+
+
+def is_up_to_date(inputs):
+    if not (os.path.exists(BUNDLE_PATH) and os.path.exists(MANIFEST_PATH)):
+        return False
+    with open(MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    return manifest.get("inputs") == inputs and manifest.get("bundle", {}).get("sha256") == file_sha256(BUNDLE_PATH)
+
+
+FILE_ATTR = 0o100644 << 16                  # -rw-r--r--
+DIR_ATTR = (0o40755 << 16) | 0x10            # drwxr-xr-x + MS-DOS directory bit
+UNIX = 3
+ZIP_VERSION = 20                             # 2.0: deflate and directories
+UTF8_FLAG = 0x800
+
+
+def dos_datetime(date_time):
+    y, mo, d, h, mi, sec = date_time
+    return (h << 11) | (mi << 5) | (sec // 2), ((max(y, 1980) - 1980) << 9) | (mo << 5) | d
+
+
+class BundleWriter:
+    """A minimal ZIP writer: deflated files, directories, and raw copies of compressed members.
+
+    zipfile has no public raw-copy API, so the bundle writes its own local
+    headers, central directory and end record — only what this bundle needs
+    (no ZIP64, no encryption). The output file must be seekable.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.entries = []
+
+    def _entry(self, name, date_time, method, external_attr, create_system=UNIX, flags=0):
+        encoded = name.encode("ascii", "ignore")
+        if encoded.decode() != name:
+            encoded, flags = name.encode("utf-8"), flags | UTF8_FLAG
+        entry = {"name": encoded, "flags": flags, "method": method, "dos": dos_datetime(date_time),
+                 "attr": external_attr, "system": create_system, "offset": self.fp.tell(),
+                 "crc": 0, "csize": 0, "size": 0}
+        self.entries.append(entry)
+        return entry
+
+    def _local_header(self, e):
+        dostime, dosdate = e["dos"]
+        return struct.pack("<4s5H3L2H", b"PK\x03\x04", ZIP_VERSION, e["flags"], e["method"], dostime, dosdate,
+                           e["crc"], e["csize"], e["size"], len(e["name"]), 0) + e["name"]
+
+    def add_dir(self, name, date_time, external_attr=DIR_ATTR):
+        self.fp.write(self._local_header(self._entry(name, date_time, zipfile.ZIP_STORED, external_attr)))
+
+    def add_file(self, name, path, date_time, external_attr=FILE_ATTR, level=9):
+        """Deflate path into the bundle at `level`, then patch the sizes and CRC into the local header."""
+        e = self._entry(name, date_time, zipfile.ZIP_DEFLATED, external_attr)
+        header = self._local_header(e)
+        self.fp.write(header)
+        deflate = zlib.compressobj(level, zlib.DEFLATED, -15)
+        with open(path, "rb") as src:
+            for block in iter(lambda: src.read(CHUNK), b""):
+                e["crc"] = zlib.crc32(block, e["crc"])
+                e["size"] += len(block)
+                data = deflate.compress(block)
+                e["csize"] += len(data)
+                self.fp.write(data)
+        data = deflate.flush()
+        e["csize"] += len(data)
+        self.fp.write(data)
+        end = self.fp.tell()
+        self.fp.seek(e["offset"])
+        self.fp.write(self._local_header(e))
+        self.fp.seek(end)
+
+    def add_raw(self, src, info, name, date_time=None, external_attr=None):
+        """Copy member `info` of the ZIP open as binary file src under `name`, compressed bytes as-is."""
+        if info.flag_bits & 0x1:
+            raise ValueError(f"{info.filename}: encrypted members can't be copied")
+        # Skip the source local header (its extra field may differ from the central one)
+        src.seek(info.header_offset)
+        header = src.read(30)
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        src.seek(info.header_offset + 30 + name_len + extra_len)
+
+        e = self._entry(name, date_time or info.date_time, info.compress_type,
+                        info.external_attr if external_attr is None else external_attr,
+                        UNIX if external_attr is not None else info.create_system,
+                        # sizes are known up front — drop the data-descriptor bit, keep UTF-8 names
+                        info.flag_bits & UTF8_FLAG)
+        e.update(crc=info.CRC, csize=info.compress_size, size=info.file_size)
+        self.fp.write(self._local_header(e))
+        remaining = info.compress_size
+        while remaining:
+            block = src.read(min(CHUNK, remaining))
+            if not block:
+                raise EOFError(f"{info.filename}: truncated in {SKILL_ZIP}")
+            self.fp.write(block)
+            remaining -= len(block)
+
+    def close(self):
+        start = self.fp.tell()
+        for e in self.entries:
+            dostime, dosdate = e["dos"]
+            self.fp.write(struct.pack("<4s6H3L5H2L", b"PK\x01\x02", (e["system"] << 8) | ZIP_VERSION, ZIP_VERSION,
+                                      e["flags"], e["method"], dostime, dosdate, e["crc"], e["csize"], e["size"],
+                                      len(e["name"]), 0, 0, 0, 0, e["attr"], e["offset"]) + e["name"])
+        end = self.fp.tell()
+        if end > 0xFFFFFFFF or len(self.entries) > 0xFFFF:
+            raise ValueError("bundle needs ZIP64, which BundleWriter doesn't write")
+        self.fp.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, len(self.entries), len(self.entries),
+                                  end - start, start, 0))
+
+
+def build(inputs):
+    reproducible = inputs["reproducible"]
+    tmp_path = BUNDLE_PATH + ".tmp"
+    if reproducible:
+        fixed_time = time.gmtime(int(os.environ.get("SOURCE_DATE_EPOCH", BUILD_EPOCH)))[:6]
+        pdf_time = fixed_time
+    else:
+        fixed_time = None
+        pdf_time = time.localtime(os.path.getmtime(PDF_PATH))[:6]
+
+    with zipfile.ZipFile(SKILL_ZIP) as zin:
+        members = zin.infolist()
+    if reproducible:
+        members = sorted(members, key=lambda i: i.filename)
+    with open(SKILL_ZIP, "rb") as src, open(tmp_path, "wb") as out:
+        bundle = BundleWriter(out)
+        bundle.add_file(os.path.basename(PDF_PATH), PDF_PATH, pdf_time)
+        bundle.add_dir(SKILL_PREFIX, pdf_time)
+        for info in members:
+            attr = None
+            if reproducible:
+                attr = DIR_ATTR if info.is_dir() else FILE_ATTR
+            bundle.add_raw(src, info, SKILL_PREFIX + info.filename, fixed_time, attr)
+        bundle.close()
+    os.replace(tmp_path, BUNDLE_PATH)
+    return write_manifest(inputs)
+
+
+def write_manifest(inputs):
+    entries = []
+    with zipfile.ZipFile(BUNDLE_PATH) as zf:
+        bad = zf.testzip()
+        if bad:
+            raise zipfile.BadZipFile(f"CRC check failed for {bad}")
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            entries.append({
+                "name": info.filename,
+                "size": info.file_size,
+                "compressed": info.compress_size,
+                "crc32": f"{info.CRC:08x}",
+                "sha256": sha256_member(zf, info),
+            })
+    manifest = {
+        "inputs": inputs,
+        "bundle": {"path": BUNDLE_PATH, "size": os.path.getsize(BUNDLE_PATH), "sha256": file_sha256(BUNDLE_PATH)},
+        "entries": entries,
+    }
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the AI image toolkit bundle ZIP")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if inputs are unchanged")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="Fixed entry dates/permissions/order (also on when SOURCE_DATE_EPOCH is set)")
+    args = parser.parse_args()
+
+    start = time.time()
+    inputs = input_hashes(args.reproducible or bool(os.environ.get("SOURCE_DATE_EPOCH")))
+    if not args.force and is_up_to_date(inputs):
+        print(f"✅ {BUNDLE_PATH} is up to date ({time.time() - start:.2f}s)")
+    else:
+        manifest = build(inputs)
+        size = manifest["bundle"]["size"]
+        print(f"📦 {BUNDLE_PATH}: {len(manifest['entries'])} files, {size // 1024}KB ({time.time() - start:.2f}s)")
+        print(f"✅ Manifest: {MANIFEST_PATH}")
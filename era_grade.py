@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Local era grading: derive period looks from one render instead of paying
+for a new generation per look.
+
+Each preset is a colour transform (saturation, gamma, S-curve, split
+toning, black/white levels) baked into a LUT_SIZE³ 3D LUT, applied with
+vectorized trilinear interpolation, then a film-grain pass (luminance
+noise, strongest in the midtones, clumped to the preset's grain size) and
+a vignette. Grain is seeded from the source file name and preset, so a
+re-run gives the same pixels.
+
+Files are graded strip by strip from a memory-mapped decode
+(image_tiles.py), so memory stays bounded on full-size masters, and
+several images run in parallel on a process pool.
+
+Outputs are written next to each source as <stem>-<preset>.jpg (or into
+--out), and indexed in provenance.sqlite against the source hash.
+
+Presets:
+    1890s-tintype     brown-black collodion, dim highlights, heavy grain, deep vignette
+    1920s             warm gelatin silver, lifted blacks, soft highlights
+    1940s             neutral-cool silver, harder contrast, fine grain
+    1960s-broadcast   near-monochrome with a faint colour cast (the system-bg ffmpeg grade)
+    1970s             faded warm colour, amber highlights, magenta shadows
+
+Usage:
+    python3 era_grade.py masters/backgrounds/loop-frames/era4-1970s-v2.png --era 1970s
+    python3 era_grade.py masters/backgrounds/*.png --era all --out /tmp/eras
+    python3 era_grade.py --list
+    python3 era_grade.py --cube luts/                 # export presets as .cube for ffmpeg lut3d
+
+As a module:
+    from era_grade import grade
+"""
+import os, sys, math, time, zlib, argparse, functools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from PIL import Image, ImageOps
+from image_tiles import open_frame, map_strips
+from provenance import write_image, file_sha256
+
+LUT_SIZE = 33
+BAND_ROWS = 256
+QUALITY = 92
+LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+# saturation 0 = monochrome. shadow/highlight: RGB multipliers blended by luminance
+# (split toning). black/white: output levels per channel. contrast: S-curve blend 0..1.
+# grain: noise std at mid-grey; grain_size: clump size in px at 1920 wide.
+PRESETS = {
+    "1890s-tintype": {
+        "saturation": 0.0, "gamma": 1.15, "contrast": 0.55,
+        "shadow": (1.00, 0.90, 0.74), "highlight": (1.00, 0.94, 0.82),
+        "black": (0.07, 0.05, 0.03), "white": (0.86, 0.82, 0.72),
+        "grain": 0.085, "grain_size": 2.2, "vignette": 0.65,
+    },
+    "1920s": {
+        "saturation": 0.0, "gamma": 1.05, "contrast": 0.35,
+        "shadow": (1.00, 0.95, 0.86), "highlight": (1.00, 0.97, 0.90),
+        "black": (0.09, 0.08, 0.07), "white": (0.93, 0.91, 0.86),
+        "grain": 0.06, "grain_size": 1.8, "vignette": 0.45,
+    },
+    "1940s": {
+        "saturation": 0.0, "gamma": 1.0, "contrast": 0.5,
+        "shadow": (0.96, 0.98, 1.00), "highlight": (1.00, 1.00, 0.99),
+        "black": (0.03, 0.03, 0.04), "white": (0.96, 0.96, 0.96),
+        "grain": 0.04, "grain_size": 1.3, "vignette": 0.35,
+    },
+    "1960s-broadcast": {
+        "saturation": 0.2, "gamma": 1.0, "contrast": 0.15,
+        "shadow": (1.02, 1.01, 0.99), "highlight": (1.02, 1.01, 0.99),
+        "black": (0.04, 0.05, 0.05), "white": (0.95, 0.96, 0.94),
+        "grain": 0.03, "grain_size": 1.0, "vignette": 0.3,
+    },
+    "1970s": {
+        "saturation": 0.75, "gamma": 0.95, "contrast": 0.2,
+        "shadow": (1.04, 0.95, 1.02), "highlight": (1.06, 1.00, 0.84),
+        "black": (0.08, 0.05, 0.06), "white": (0.97, 0.93, 0.82),
+        "grain": 0.035, "grain_size": 1.2, "vignette": 0.3,
+    },
+}
+
+
+def transform(rgb, p):
+    """The preset's colour transform on an (..., 3) float array in 0..1 — what the LUT bakes."""
+    luma = rgb @ LUMA
+    rgb = luma[..., None] + p["saturation"] * (rgb - luma[..., None])
+    rgb = np.clip(rgb, 0, 1) ** p["gamma"]
+    rgb = rgb + p["contrast"] * (rgb * rgb * (3 - 2 * rgb) - rgb)
+    luma = (rgb @ LUMA)[..., None]
+    rgb = rgb * ((1 - luma) * np.array(p["shadow"]) + luma * np.array(p["highlight"]))
+    black, white = np.array(p["black"]), np.array(p["white"])
+    return np.clip(black + rgb * (white - black), 0, 1)
+
+
+@functools.lru_cache(maxsize=None)
+def build_lut(preset, size=LUT_SIZE):
+    """(size, size, size, 3) float32 LUT indexed [r, g, b]."""
+    axis = np.linspace(0, 1, size, dtype=np.float32)
+    grid = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+    return transform(grid, PRESETS[preset]).astype(np.float32)
+
+
+def apply_lut(rgb, lut):
+    """Trilinear lookup of an (..., 3) float32 array in 0..1."""
+    size = lut.shape[0]
+    flat = lut.reshape(-1, 3)
+    x = rgb * (size - 1)
+    i = np.minimum(x.astype(np.int32), size - 2)
+    f = x - i
+    fr, fg, fb = f[..., 0:1], f[..., 1:2], f[..., 2:3]
+    # flat gathers (np.take) are cheaper than 3-axis fancy indexing
+    base = (i[..., 0] * size + i[..., 1]) * size + i[..., 2]
+    corner = lambda dr, dg, db: np.take(flat, base + (dr * size + dg) * size + db, axis=0)
+    c0 = (corner(0, 0, 0) * (1 - fb) + corner(0, 0, 1) * fb) * (1 - fg) \
+        + (corner(0, 1, 0) * (1 - fb) + corner(0, 1, 1) * fb) * fg
+    c1 = (corner(1, 0, 0) * (1 - fb) + corner(1, 0, 1) * fb) * (1 - fg) \
+        + (corner(1, 1, 0) * (1 - fb) + corner(1, 1, 1) * fb) * fg
+    return c0 * (1 - fr) + c1 * fr
+
+
+@functools.lru_cache(maxsize=None)
+def grain_gain(upscale):
+    """1 / std of unit noise after bilinear upscaling by this factor (upscaling smooths it)."""
+    noise = np.random.default_rng(0).standard_normal((64, 64)).astype(np.float32)
+    size = max(64, round(64 * upscale))
+    return 1 / float(np.asarray(Image.fromarray(noise, "F").resize((size, size), Image.BILINEAR)).std())
+
+
+def grain_rows(width, height, top, bottom, p, seed):
+    """Rows top..bottom of the preset's grain: zero-mean noise rendered small and upscaled so it
+    clumps. Each row of the small field has its own seed, so any band can be made on its own."""
+    scale = p["grain_size"] * width / 1920
+    sw, sh = max(1, round(width / scale)), max(1, round(height / scale))
+    y0, y1 = top * sh / height, bottom * sh / height
+    r0, r1 = max(0, math.floor(y0) - 2), min(sh, math.ceil(y1) + 2)
+    small = np.stack([np.random.default_rng((seed, r)).standard_normal(sw, dtype=np.float32) for r in range(r0, r1)])
+    band = Image.fromarray(small, "F").resize((width, bottom - top), Image.BILINEAR, box=(0, y0 - r0, sw, y1 - r0))
+    return np.asarray(band) * (p["grain"] * grain_gain(round(width / sw, 2)))
+
+
+def vignette_rows(width, height, top, bottom, strength):
+    """Multiplier for rows top..bottom: 1 in the middle, 1 - strength in the corners."""
+    y = (np.arange(top, bottom, dtype=np.float32) + 0.5) / height * 2 - 1
+    x = (np.arange(width, dtype=np.float32) + 0.5) / width * 2 - 1
+    r2 = (x[None, :] ** 2 + y[:, None] ** 2) / 2
+    return 1 - strength * r2 ** 1.5
+
+
+def grade_band(rows, preset, top, height, seed=0):
+    """Grade image rows top..top+len(rows) of a height-row image. rows: (n, width, 3 or 4) uint8; returns (n, width, 3)."""
+    p = PRESETS[preset]
+    bottom, width = top + rows.shape[0], rows.shape[1]
+    rgb = apply_lut(rows[..., :3].astype(np.float32) / 255, build_lut(preset))
+    if p["grain"]:
+        luma = rgb @ LUMA
+        rgb += (grain_rows(width, height, top, bottom, p, seed) * 4 * luma * (1 - luma))[..., None]
+    if p["vignette"]:
+        rgb *= vignette_rows(width, height, top, bottom, p["vignette"])[..., None]
+    return np.clip(rgb * 255 + 0.5, 0, 255).astype(np.uint8)
+
+
+def grade(im, preset, seed=0):
+    """Grade a PIL image with a preset. Returns a new RGB image."""
+    src = np.asarray(ImageOps.exif_transpose(im).convert("RGB"))
+    out = np.empty_like(src)
+    for top in range(0, src.shape[0], BAND_ROWS):
+        out[top:top + BAND_ROWS] = grade_band(src[top:top + BAND_ROWS], preset, top, src.shape[0], seed)
+    return Image.fromarray(out, "RGB")
+
+
+def write_cube(preset, path, size=LUT_SIZE):
+    """Export a preset's LUT (colour transform only — no grain or vignette) as a .cube file."""
+    lut = build_lut(preset, size)
+    with open(path, "w") as f:
+        f.write(f'TITLE "{preset}"\nLUT_3D_SIZE {size}\n')
+        # .cube order: red varies fastest
+        for b in range(size):
+            for g in range(size):
+                for r in range(size):
+                    f.write("%.6f %.6f %.6f\n" % tuple(lut[r, g, b]))
+
+
+def output_path(src, preset, out_dir=None):
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(out_dir or os.path.dirname(src), f"{stem}-{preset}.jpg")
+
+
+def grade_file(src, preset, out_path):
+    """Worker: grade one file and save it with provenance. Returns (out_path, seconds)."""
+    start = time.time()
+    seed = zlib.crc32(f"{os.path.basename(src)}:{preset}".encode())
+    with open_frame(src) as frame:
+        with map_strips(frame, lambda rows, top: grade_band(rows, preset, top, frame.height, seed)) as out:
+            data = out.encode("JPEG", quality=QUALITY)
+    write_image(out_path, data, payload={"grade": preset, "lut_size": LUT_SIZE}, parent=file_sha256(src))
+    return out_path, time.time() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply era LUT grades with grain and vignette")
+    parser.add_argument("images", nargs="*", help="Source images")
+    parser.add_argument("--era", default="all", help=f"Comma-separated presets or 'all': {', '.join(PRESETS)}")
+    parser.add_argument("--out", help="Output directory (default: next to each source)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--list", action="store_true", help="List presets")
+    parser.add_argument("--cube", metavar="DIR", help="Export each preset's LUT as DIR/<preset>.cube")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, p in PRESETS.items():
+            print(f"  {name:16} sat {p['saturation']:.2f}  grain {p['grain']:.3f}  vignette {p['vignette']:.2f}")
+        raise SystemExit
+    eras = list(PRESETS) if args.era == "all" else args.era.split(",")
+    unknown = [e for e in eras if e not in PRESETS]
+    if unknown:
+        parser.error(f"unknown preset(s): {', '.join(unknown)} — choose from {', '.join(PRESETS)}")
+    if args.cube:
+        os.makedirs(args.cube, exist_ok=True)
+        for era in eras:
+            write_cube(era, os.path.join(args.cube, f"{era}.cube"))
+            print(f"📦 {args.cube}/{era}.cube")
+        raise SystemExit
+    if not args.images:
+        parser.error("no images given")
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    jobs = [(src, era, output_path(src, era, args.out)) for src in args.images for era in eras]
+    print(f"🎞  {len(jobs)} grades ({len(args.images)} images × {len(eras)} presets), {args.workers} workers")
+    start, failed = time.time(), 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(grade_file, *job): job for job in jobs}
+        for future in as_completed(futures):
+            src, era, _ = futures[future]
+            try:
+                path, seconds = future.result()
+                print(f"  ✅ {path} ({seconds * 1000:.0f}ms)")
+            except Exception as e:
+                failed += 1
+                print(f"  ❌ {src} [{era}]: {e}")
+    print(f"\n✅ {len(jobs) - failed}/{len(jobs)} graded in {time.time() - start:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Shared Fal.ai job runner for the image generators.
+
+Jobs go through the queue API (submit → poll → fetch result → download), so
+long renders don't hold a connection open and a job can be cancelled. With
+hedging on, a job that runs past its endpoint's p90 latency gets one
+duplicate; the first to finish wins and the other is cancelled. On
+top of that, sweep() renders the cross product of prompts × settings ×
+seeds on a thread pool under a spend cap. Every image is written as soon
+as it downloads, with a sweep.json record per job and a contact sheet at
+the end.
+
+Sweep filenames keep the prompt name first (before-food-s7-g3.5.jpg), so a
+before/after sweep directory can go straight into
+rank-before-after.py --dir.
+
+Every job is appended to METRICS_PATH as one JSON line: phase timings
+(submit, queue wait, inference, result fetch, download), endpoint, payload
+hash, image size, bytes each way, estimated price and outcome — hedge
+duplicates and cancelled jobs included. The hedge threshold is seeded from
+the same log, so p90 is known from the first job of a run.
+
+Sweep images are saved through provenance.write_image(), which indexes and
+embeds the prompt, seed and settings each one was made with.
+
+Prices are fal.ai list prices at the time of writing and only feed the
+budget cap and the cost column — check https://fal.ai/pricing before
+trusting a total.
+
+Usage:
+    python3 fal_jobs.py                              # throughput + p50/p95/p99 per endpoint
+    python3 fal_jobs.py --since 2026-10-01 --endpoint fal-ai/flux/dev
+
+As a module:
+    from fal_jobs import generate, sweep, add_sweep_args, sweep_from_args
+"""
+import os, io, re, json, math, time, hashlib, argparse, datetime, threading, itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from PIL import Image, ImageDraw, ImageFont
+from provenance import write_image
+
+QUEUE_URL = "https://queue.fal.run/"
+POLL_INTERVAL = 1.0
+TIMEOUT = 300
+SWEEP_DIR = "sweeps"
+METRICS_PATH = ".cache/fal-metrics.jsonl"
+THUMB = 320
+
+# Hedging: a job slower than the endpoint's HEDGE_PERCENTILE latency gets one duplicate.
+# Until HEDGE_MIN_SAMPLES jobs have finished, "slow" means HEDGE_DEFAULT_AFTER seconds.
+HEDGE_PERCENTILE = 90
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_AFTER = 90
+HEDGE_MAX_FRACTION = 0.2   # share of jobs allowed to hedge — bounds the extra spend
+
+# endpoint -> pricing and which payload keys it takes
+ENDPOINTS = {
+    "fal-ai/flux/dev": {"per_mp": 0.025, "size_key": "image_size", "steps": True},
+    "fal-ai/flux-2-flex": {"per_mp": 0.06, "size_key": "image_size", "steps": True},
+    "fal-ai/nano-banana-pro": {"per_image": 0.15, "size_key": "aspect_ratio", "steps": False},
+}
+# aspect ratio -> image_size preset, and preset -> pixels
+ASPECT_PRESETS = {"16:9": "landscape_16_9", "4:3": "landscape_4_3", "1:1": "square_hd",
+                  "3:4": "portrait_4_3", "9:16": "portrait_16_9"}
+PRESET_SIZES = {"landscape_16_9": (1024, 576), "landscape_4_3": (1024, 768), "square_hd": (1024, 1024),
+                "square": (512, 512), "portrait_4_3": (768, 1024), "portrait_16_9": (576, 1024)}
+# sweep option -> short tag in filenames
+TAGS = {"steps": "n", "guidance": "g", "aspect_ratio": "ar"}
+# sweep file extension per payload output_format (no output_format: JPEG expected)
+OUTPUT_EXTS = {"jpeg": "jpg", "jpg": "jpg", "png": "png", "webp": "webp"}
+
+
+class FalError(Exception):
+    pass
+
+
+def load_fal_key():
+    key = os.environ.get("FAL_KEY", "")
+    env_path = os.path.expanduser("~/.openclaw/.env")
+    if not key and os.path.exists(env_path):
+        with open(env_path) as f:
+            for line in f:
+                if line.startswith("FAL_KEY="):
+                    key = line.strip().split("=", 1)[1].strip('"').strip("'")
+                    break
+    assert key, "FAL_KEY not found"
+    return key
+
+
+_key = None
+
+
+def headers():
+    global _key
+    _key = _key or load_fal_key()
+    return {"Authorization": f"Key {_key}", "Content-Type": "application/json"}
+
+
+# ── Jobs ──
+
+def submit(endpoint, payload):
+    r = requests.post(QUEUE_URL + endpoint, headers=headers(), json=payload, timeout=30)
+    r.raise_for_status()
+    handle = r.json()
+    if "request_id" not in handle:
+        raise FalError(f"no request_id: {json.dumps(handle)[:200]}")
+    return handle
+
+
+def _urls(endpoint, handle):
+    base = f"{QUEUE_URL}{endpoint}/requests/{handle['request_id']}"
+    return handle.get("status_url") or base + "/status", handle.get("response_url") or base
+
+
+def poll(endpoint, handle):
+    """Queue status of a job ({} when the status call itself failed)."""
+    try:
+        return requests.get(_urls(endpoint, handle)[0], headers=headers(), timeout=15).json()
+    except (requests.RequestException, ValueError):
+        return {}
+
+
+def fetch_result(endpoint, handle):
+    r = requests.get(_urls(endpoint, handle)[1], headers=headers(), timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+def cancel(endpoint, handle):
+    try:
+        requests.put(_urls(endpoint, handle)[0].removesuffix("/status") + "/cancel", headers=headers(), timeout=15)
+    except requests.RequestException:
+        pass
+
+
+class Budget:
+    """Thread-safe spend cap: jobs reserve their estimated price before submitting."""
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        with self._lock:
+            if self.cap is not None and self.spent + amount > self.cap + 1e-9:
+                return False
+            self.spent += amount
+            return True
+
+    def refund(self, amount):
+        with self._lock:
+            self.spent -= amount
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else None
+
+
+class LatencyTracker:
+    """Recent job latencies per endpoint (seeded from the metrics log), and how many jobs have hedged."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = None
+        self.jobs = self.hedges = self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        self.samples = {}
+        for rec in read_metrics():
+            if rec["status"] == "ok":
+                self.samples.setdefault(rec["endpoint"], []).append(rec["latency_s"])
+        for samples in self.samples.values():
+            del samples[:-self.window]
+
+    def record(self, endpoint, seconds, hedge_won=False):
+        with self._lock:
+            if self.samples is None:
+                self._load()
+            self.hedge_wins += hedge_won
+            samples = self.samples.setdefault(endpoint, [])
+            samples.append(seconds)
+            del samples[:-self.window]
+
+    def hedge_after(self, endpoint):
+        """Seconds after which a job on endpoint is slow: its p90, or a default until there's history."""
+        with self._lock:
+            if self.samples is None:
+                self._load()
+            samples = sorted(self.samples.get(endpoint, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_AFTER
+        return percentile(samples, HEDGE_PERCENTILE)
+
+    def start_job(self):
+        with self._lock:
+            self.jobs += 1
+
+    def try_hedge(self):
+        with self._lock:
+            if self.hedges >= max(1, HEDGE_MAX_FRACTION * self.jobs):
+                return False
+            self.hedges += 1
+            return True
+
+
+LATENCY = LatencyTracker()
+
+
+# ── Telemetry ──
+
+_metrics_lock = threading.Lock()
+
+
+def payload_hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def log_job(job, payload, status, result=None, image=None, fetch_s=None, download_s=None, error=None):
+    """Append one job's phase timings, sizes and estimated price to METRICS_PATH."""
+    now = time.time()
+    done = job.get("done") or now
+    started = job.get("started")
+    if job.get("inference_s") is not None:   # Fal reports it on completion — better than poll timing
+        started = done - job["inference_s"]
+    width = height = None
+    if image is not None:
+        info = (result.get("images") or [{}])[0]
+        width, height = info.get("width"), info.get("height")
+        if not width:
+            with Image.open(io.BytesIO(image)) as im:
+                width, height = im.size
+    rec = {
+        "ts": datetime.datetime.fromtimestamp(job["t0"]).isoformat(timespec="milliseconds"),
+        "endpoint": job["endpoint"],
+        "request_id": job.get("handle", {}).get("request_id"),
+        "payload": payload_hash(payload),
+        "status": status,
+        "hedge": job.get("hedge", False),
+        "submit_s": job.get("submit_s"),
+        "queue_s": round(max(0.0, (started or done) - job["submitted"]), 3) if "submitted" in job else None,
+        "inference_s": round(done - started, 3) if started else None,
+        "fetch_s": fetch_s,
+        "download_s": download_s,
+        "latency_s": round(done - job["submitted"], 3) if "submitted" in job else None,
+        "total_s": round(now - job["t0"], 3),
+        "bytes_out": len(json.dumps(payload)),
+        "bytes_in": (len(json.dumps(result)) if result else 0) + (len(image) if image else 0),
+        "width": width,
+        "height": height,
+        "price": round(price(job["endpoint"], payload), 4) if status == "ok" or started else 0.0,
+    }
+    if error:
+        rec["error"] = str(error)[:200]
+    with _metrics_lock:
+        os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+        with open(METRICS_PATH, "a") as f:
+            f.write(json.dumps(rec) + "\n")
+
+
+def read_metrics(path=None, since=None):
+    path = path or METRICS_PATH
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if since is None or rec["ts"] >= since:
+                records.append(rec)
+    return records
+
+
+def _submit(endpoint, payload, hedge=False):
+    job = {"endpoint": endpoint, "t0": time.time(), "hedge": hedge}
+    try:
+        job["handle"] = submit(endpoint, payload)
+    except (FalError, requests.RequestException) as e:
+        log_job(job, payload, "submit failed", error=e)
+        raise
+    job["submitted"] = time.time()
+    job["submit_s"] = round(job["submitted"] - job["t0"], 3)
+    return job
+
+
+def _reserve_hedge(cost, budget):
+    if budget is not None and not budget.reserve(cost):
+        return False
+    if LATENCY.try_hedge():
+        return True
+    if budget is not None:
+        budget.refund(cost)
+    return False
+
+
+def generate(endpoint, payload, timeout=TIMEOUT, hedge=False, hedge_to=None, budget=None):
+    """Run one job and download its first image. Returns (image bytes, result JSON).
+
+    With hedge=True, a job still running after the endpoint's p90 latency gets
+    one duplicate on hedge_to (default: the same endpoint — with a fixed seed
+    it renders the same image). Whichever finishes first wins and the other is
+    cancelled. The duplicate's price is reserved from budget when one is given.
+
+    Every job, including cancelled duplicates, is logged to METRICS_PATH.
+    """
+    LATENCY.start_job()
+    primary = _submit(endpoint, payload)
+    start = primary["t0"]
+    running = [primary]
+    hedge_after = LATENCY.hedge_after(endpoint) if hedge else None
+    error = None
+    while time.time() - start < timeout:
+        time.sleep(POLL_INTERVAL)
+        for job in list(running):
+            status = poll(job["endpoint"], job["handle"])
+            state = status.get("status")
+            if state == "IN_PROGRESS" and not job.get("started"):
+                job["started"] = time.time()
+            elif state == "COMPLETED":
+                job["done"] = time.time()
+                job["inference_s"] = (status.get("metrics") or {}).get("inference_time")
+                for other in running:
+                    if other is not job:
+                        cancel(other["endpoint"], other["handle"])
+                        log_job(other, payload, "cancelled")
+                LATENCY.record(job["endpoint"], job["done"] - job["submitted"], hedge_won=job["hedge"])
+                try:
+                    t = time.time()
+                    result = fetch_result(job["endpoint"], job["handle"])
+                    fetch_s = round(time.time() - t, 3)
+                    t = time.time()
+                    image = download(result)
+                except (FalError, requests.RequestException) as e:
+                    log_job(job, payload, "failed", error=e)
+                    raise
+                log_job(job, payload, "ok", result, image, fetch_s, round(time.time() - t, 3))
+                result.setdefault("request_id", job["handle"]["request_id"])
+                return image, result
+            elif state in ("FAILED", "ERROR"):
+                running.remove(job)
+                error = status.get("error", "job failed")
+                log_job(job, payload, "failed", error=error)
+        if not running:
+            raise FalError(error)
+        if hedge_after is not None and time.time() - start > hedge_after:
+            hedge_after = None
+            target = hedge_to or endpoint
+            cost = price(target, payload)
+            if _reserve_hedge(cost, budget):
+                try:
+                    running.append(_submit(target, payload, hedge=True))
+                    print(f"   🔀 {primary['handle']['request_id']} slower than {time.time() - start:.0f}s, "
+                          f"hedging on {target}")
+                except (FalError, requests.RequestException):
+                    if budget is not None:
+                        budget.refund(cost)
+    for job in running:
+        cancel(job["endpoint"], job["handle"])
+        log_job(job, payload, "timeout")
+    raise FalError(f"timed out after {timeout}s")
+
+
+def download(result):
+    images = result.get("images") or []
+    if not images:
+        raise FalError(f"no images in response: {json.dumps(result)[:200]}")
+    r = requests.get(images[0]["url"], timeout=60)
+    r.raise_for_status()
+    return r.content
+
+
+def price(endpoint, payload):
+    """Estimated USD for one job."""
+    info = ENDPOINTS.get(endpoint, {})
+    if "per_image" in info:
+        return info["per_image"] * payload.get("num_images", 1)
+    size = payload.get("image_size", "landscape_4_3")
+    w, h = (size["width"], size["height"]) if isinstance(size, dict) else PRESET_SIZES.get(size, (1024, 768))
+    return info.get("per_mp", 0) * math.ceil(w * h / 1e6) * payload.get("num_images", 1)
+
+
+def apply_setting(endpoint, payload, option, value):
+    """Set a sweep option (steps, guidance, aspect_ratio) in the endpoint's own payload terms."""
+    info = ENDPOINTS.get(endpoint, {"size_key": "aspect_ratio", "steps": True})
+    if option == "aspect_ratio":
+        payload.pop("image_size" if info["size_key"] == "aspect_ratio" else "aspect_ratio", None)
+        payload[info["size_key"]] = value if info["size_key"] == "aspect_ratio" else ASPECT_PRESETS[value]
+    elif not info["steps"]:
+        raise ValueError(f"{endpoint} has no {option} setting")
+    elif option == "steps":
+        payload["num_inference_steps"] = int(value)
+    elif option == "guidance":
+        payload["guidance_scale"] = float(value)
+
+
+# ── Sweeps ──
+
+def plan(endpoint, prompts, base, grid, seeds):
+    """Every job in the sweep, seed-major so a budget cut drops whole seeds rather than half a grid."""
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    jobs = []
+    for seed, combo, (name, prompt) in itertools.product(seeds, combos, prompts.items()):
+        payload = {**base, "prompt": prompt, "seed": seed}
+        for option, value in combo.items():
+            apply_setting(endpoint, payload, option, value)
+        tag = "".join(f"-{TAGS.get(k, k)}{str(v).replace(':', 'x')}" for k, v in combo.items())
+        ext = OUTPUT_EXTS.get(payload.get("output_format"), "jpg")
+        jobs.append({"name": name, "seed": seed, "settings": combo, "payload": payload,
+                     "file": f"{name}-s{seed}{tag}.{ext}", "price": price(endpoint, payload)})
+    return jobs
+
+
+def _run(endpoint, job, out_dir, budget, hedge):
+    path = os.path.join(out_dir, job["file"])
+    if os.path.exists(path):
+        return {**job, "status": "exists"}
+    if not budget.reserve(job["price"]):
+        return {**job, "status": "over budget"}
+    start = time.time()
+    try:
+        data, result = generate(endpoint, job["payload"], hedge=hedge, budget=budget)
+    except (FalError, requests.RequestException) as e:
+        budget.refund(job["price"])
+        return {**job, "status": "failed", "error": str(e)}
+    data = write_image(path, data, endpoint, job["payload"], result)
+    return {**job, "status": "ok", "seconds": round(time.time() - start, 1), "bytes": len(data)}
+
+
+def sweep(endpoint, prompts, base, grid, seeds, out_dir, budget=None, workers=4, hedge=False):
+    """Render prompts × grid × seeds into out_dir. Returns the per-job records."""
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = plan(endpoint, prompts, base, grid, seeds)
+    total = sum(j["price"] for j in jobs)
+    print(f"🎛  {len(jobs)} jobs on {endpoint}, ~${total:.2f}"
+          + (f" (cap ${budget:.2f})" if budget is not None else "") + f", {workers} in parallel → {out_dir}/")
+    cap = Budget(budget)
+    records = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run, endpoint, job, out_dir, cap, hedge) for job in jobs]
+        for done, future in enumerate(as_completed(futures), start=1):
+            rec = future.result()
+            records.append(rec)
+            icon = {"ok": "✅", "exists": "⏭ ", "over budget": "💸"}.get(rec["status"], "❌")
+            detail = f"{rec['seconds']}s, {rec['bytes'] // 1024}KB" if rec["status"] == "ok" else rec.get("error", rec["status"])
+            print(f"   {icon} [{done}/{len(jobs)}] {rec['file']} ({detail})")
+            write_manifest(out_dir, endpoint, records)
+    print(f"💵 ~${cap.spent:.2f} spent")
+    if LATENCY.hedges:
+        print(f"🔀 {LATENCY.hedges} jobs hedged, {LATENCY.hedge_wins} won by the duplicate")
+    return records
+
+
+def write_manifest(out_dir, endpoint, records):
+    with open(os.path.join(out_dir, "sweep.json"), "w") as f:
+        json.dump({"endpoint": endpoint, "jobs": sorted(records, key=lambda r: r["file"])}, f, indent=2)
+        f.write("\n")
+
+
+def contact_sheet(out_dir, records, path=None):
+    """One row per prompt × settings, one column per seed, labelled."""
+    rows, seeds = {}, sorted({r["seed"] for r in records})
+    for r in records:
+        if r["status"] in ("ok", "exists"):
+            label = r["name"] + "".join(f"  {k}={v}" for k, v in r["settings"].items())
+            rows.setdefault(label, {})[r["seed"]] = os.path.join(out_dir, r["file"])
+    if not rows:
+        return None
+    font = ImageFont.load_default(size=14)
+    thumbs = {}
+    for cells in rows.values():
+        for seed, file in cells.items():
+            with Image.open(file) as im:
+                im = im.convert("RGB")
+                im.thumbnail((THUMB, THUMB))
+                thumbs[file] = im
+    cell_h = max(im.height for im in thumbs.values()) + 22
+    sheet = Image.new("RGB", (len(seeds) * (THUMB + 8) + 8, len(rows) * (cell_h + 24) + 8), (24, 24, 24))
+    draw = ImageDraw.Draw(sheet)
+    for row, (label, cells) in enumerate(sorted(rows.items())):
+        y = 8 + row * (cell_h + 24)
+        draw.text((8, y), label, fill=(235, 235, 235), font=font)
+        for col, seed in enumerate(seeds):
+            if seed in cells:
+                x = 8 + col * (THUMB + 8)
+                sheet.paste(thumbs[cells[seed]], (x, y + 20))
+                draw.text((x, y + 22 + thumbs[cells[seed]].height), f"seed {seed}", fill=(160, 160, 160), font=font)
+    path = path or os.path.join(out_dir, "contact-sheet.jpg")
+    sheet.save(path, quality=88)
+    return path
+
+
+# ── CLI glue for the generator scripts ──
+
+def parse_seeds(spec):
+    """'1-8' / '3,7,42' / '1-4,42' -> [ints]"""
+    seeds = []
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        seeds.extend(range(int(lo), int(hi) + 1) if hi else [int(lo)])
+    return seeds
+
+
+def add_sweep_args(parser):
+    parser.add_argument("--hedge", action="store_true",
+                        help="Duplicate jobs that run past their endpoint's p90 latency (a little extra spend)")
+    g = parser.add_argument_group("sweep")
+    g.add_argument("--sweep", action="store_true", help="Render a seeds × prompts × settings grid instead")
+    g.add_argument("--seeds", default="1-8", help="Seeds, e.g. 1-8 or 3,7,42 (default: 1-8)")
+    g.add_argument("--steps", help="Comma-separated num_inference_steps values")
+    g.add_argument("--guidance", help="Comma-separated guidance_scale values")
+    g.add_argument("--aspect-ratio", help="Comma-separated aspect ratios, e.g. 16:9,3:4")
+    g.add_argument("--only", help="Regex on prompt names to include")
+    g.add_argument("--budget", type=float, help="Stop submitting once the estimated spend reaches this (USD)")
+    g.add_argument("--workers", type=int, default=4)
+    g.add_argument("--out", help=f"Output directory (default: {SWEEP_DIR}/<script>-<timestamp>)")
+
+
+def sweep_from_args(args, endpoint, prompts, base, name):
+    grid = {option: getattr(args, option).split(",") for option in ("steps", "guidance", "aspect_ratio")
+            if getattr(args, option)}
+    if args.only:
+        prompts = {k: v for k, v in prompts.items() if re.search(args.only, k)}
+    out_dir = args.out or os.path.join(SWEEP_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    records = sweep(endpoint, prompts, base, grid, parse_seeds(args.seeds), out_dir, args.budget, args.workers,
+                    args.hedge)
+    sheet = contact_sheet(out_dir, records)
+    if sheet:
+        print(f"🖼  Contact sheet: {sheet}")
+    return records
+
+
+# ── Metrics summary ──
+
+def busy_seconds(intervals):
+    """Wall-clock seconds covered by at least one (start, end) interval."""
+    total, span = 0.0, None
+    for start, end in sorted(intervals):
+        if span and start <= span[1]:
+            span[1] = max(span[1], end)
+            continue
+        if span:
+            total += span[1] - span[0]
+        span = [start, end]
+    return total + (span[1] - span[0] if span else 0.0)
+
+
+def print_summary(records):
+    by_endpoint = {}
+    for rec in records:
+        by_endpoint.setdefault(rec["endpoint"], []).append(rec)
+    for endpoint, recs in sorted(by_endpoint.items()):
+        ok = [r for r in recs if r["status"] == "ok"]
+        statuses = {}
+        for r in recs:
+            statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+        starts = [datetime.datetime.fromisoformat(r["ts"]).timestamp() for r in recs]
+        busy = busy_seconds([(s, s + r["total_s"]) for s, r in zip(starts, recs)])
+        print(f"📈 {endpoint}: {len(recs)} jobs ({', '.join(f'{n} {s}' for s, n in sorted(statuses.items()))}), "
+              f"{len(ok) / busy * 60 if busy else 0:.1f} images/min, ~${sum(r['price'] for r in recs):.2f}")
+        for key, label in (("total_s", "end to end"), ("submit_s", "submit"), ("queue_s", "queue wait"),
+                           ("inference_s", "inference"), ("fetch_s", "result"), ("download_s", "download")):
+            values = sorted(r[key] for r in ok if r.get(key) is not None)
+            if values:
+                print(f"   {label:<11}" + "".join(f"  p{p} {percentile(values, p):7.2f}s" for p in (50, 95, 99)))
+        hedged = [r for r in recs if r["hedge"]]
+        print(f"   {sum(r['bytes_out'] for r in recs) / 1e3:.1f}KB sent, {sum(r['bytes_in'] for r in recs) / 1e6:.1f}MB "
+              f"received" + (f", {len(hedged)} hedge duplicates ({sum(r['status'] == 'ok' for r in hedged)} won)"
+                             if hedged else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise the Fal job metrics log")
+    parser.add_argument("--since", help="Only jobs from this date/time on, e.g. 2026-10-01")
+    parser.add_argument("--endpoint", help="Only this endpoint, e.g. fal-ai/flux/dev")
+    parser.add_argument("--metrics", default=METRICS_PATH, help=f"Metrics log (default: {METRICS_PATH})")
+    args = parser.parse_args()
+
+    records = [r for r in read_metrics(args.metrics, args.since)
+               if args.endpoint is None or r["endpoint"] == args.endpoint]
+    if not records:
+        print(f"No jobs in {args.metrics}" + (f" since {args.since}" if args.since else ""))
+    else:
+        print(f"🧾 {len(records)} jobs, {records[0]['ts']} → {records[-1]['ts']}")
+        print_summary(records)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Find exact and near-duplicate images in assets/, and images nothing references.
+
+- exact duplicates: same SHA-256
+- near duplicates: 64-bit pHash (DCT) within --phash-distance, confirmed by a
+  64-bit dHash (gradient) within --dhash-distance. Both hashes are computed as
+  one NumPy batch; candidates come from a BK-tree over the pHashes, so the
+  search is a radius query per image instead of comparing every pair.
+- unreferenced: images asset_graph.py can't reach, by full path, from any
+  page, root file, Apps Script / email source or build script — generated
+  files (deploy-manifest.json, _site/, .cache/, templates/) don't count.
+  One whose file name a build script mentions is flagged: the script may
+  build the path at run time (f"{IMG_DIR}/after-{name}.jpg")
+
+Generated derivatives are left out of the near-duplicate search — they match
+their source by design: assets/renditions/ entirely, and the -mobile /
+-placeholder siblings of each background.
+
+Usage:
+    python3 find-duplicate-assets.py
+    python3 find-duplicate-assets.py --json duplicates.json --phash-distance 6
+"""
+import os, glob, json, time, argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageOps
+from asset_graph import MANIFEST_PATH, BUILD_EXTS, repo_files, deploy_set
+from provenance import file_sha256
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif")
+SKIP_DIRS = ("assets/renditions/",)
+DERIVATIVE_SUFFIXES = ("-mobile", "-placeholder")
+
+HASH_SIZE = 8        # 8x8 = 64-bit hashes
+PHASH_SIDE = 32      # pHash DCT input
+
+
+# ── Hashing ──
+
+def load_gray(path):
+    """(PHASH_SIDE², dHash 9x8) grayscale float arrays, decoded in JPEG draft mode."""
+    with Image.open(path) as im:
+        im.draft("L", (PHASH_SIDE * 2, PHASH_SIDE * 2))
+        im = ImageOps.exif_transpose(im).convert("L")
+        p = np.asarray(im.resize((PHASH_SIDE, PHASH_SIDE), Image.LANCZOS), dtype=np.float32)
+        d = np.asarray(im.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.float32)
+    return p, d
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m.astype(np.float32)
+
+
+def _pack(bits):
+    """(N, 64) bool -> list of Python ints."""
+    packed = np.packbits(bits.astype(np.uint8), axis=1)
+    return [int.from_bytes(row.tobytes(), "big") for row in packed]
+
+
+def phash_batch(grays):
+    """(N, 32, 32) -> 64-bit pHashes: low 8x8 of the 2-D DCT vs its median."""
+    d = _dct_matrix(PHASH_SIDE)
+    coeffs = np.einsum("ij,njk,lk->nil", d, grays, d)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(grays), -1)
+    return _pack(coeffs > np.median(coeffs, axis=1, keepdims=True))
+
+
+def dhash_batch(grays):
+    """(N, 8, 9) -> 64-bit dHashes: is each pixel brighter than its right neighbour."""
+    return _pack((grays[:, :, :-1] > grays[:, :, 1:]).reshape(len(grays), -1))
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance for radius queries."""
+
+    def __init__(self):
+        self.root = None  # (key, [items], {distance: child})
+
+    def add(self, key, item):
+        if self.root is None:
+            self.root = (key, [item], {})
+            return
+        node = self.root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (key, [item], {})
+                return
+            node = child
+
+    def query(self, key, radius):
+        """Yields (distance, item) for every item within radius of key."""
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            node_key, items, children = stack.pop()
+            d = hamming(key, node_key)
+            if d <= radius:
+                for item in items:
+                    yield d, item
+            for dist, child in children.items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+
+
+# ── Scanning ──
+
+def collect_images(root="assets"):
+    paths = []
+    for path in sorted(glob.glob(f"{root}/**/*", recursive=True)):
+        if not path.lower().endswith(IMAGE_EXTS) or path.startswith(SKIP_DIRS):
+            continue
+        paths.append(path)
+    return paths
+
+
+def derivative_base(path):
+    """<name> for <name>-mobile.jpg / <name>-placeholder.jpg, else None."""
+    stem, ext = os.path.splitext(path)
+    for suffix in DERIVATIVE_SUFFIXES:
+        if stem.endswith(suffix):
+            return stem[: -len(suffix)] + ext
+    return None
+
+
+def referenced_paths():
+    """Repo paths the site or its build scripts reference (asset_graph's deploy + build-only sets)."""
+    files = [f for f in repo_files() if f != MANIFEST_PATH]
+    deploy, build_only, _, _ = deploy_set(files)
+    return deploy | build_only
+
+
+def naming_scripts(paths):
+    """{path: [build scripts that mention its file name]} for the paths some script names."""
+    scripts = {}
+    for script in repo_files():
+        if script.endswith(BUILD_EXTS):
+            with open(script, encoding="utf-8", errors="ignore") as f:
+                scripts[script] = f.read()
+    named = {}
+    for path in paths:
+        hits = [script for script, text in scripts.items() if os.path.basename(path) in text]
+        if hits:
+            named[path] = hits
+    return named
+
+
+def scan(paths, phash_radius, dhash_radius, workers=None):
+    workers = workers or min(32, (os.cpu_count() or 2) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = list(pool.map(file_sha256, paths))
+        grays = list(pool.map(load_gray, paths))
+    phashes = phash_batch(np.stack([p for p, _ in grays]))
+    dhashes = dhash_batch(np.stack([d for _, d in grays]))
+
+    exact = {}
+    for path, digest in zip(paths, digests):
+        exact.setdefault(digest, []).append(path)
+    exact_groups = [group for group in exact.values() if len(group) > 1]
+
+    # Only the master-sized member of each background family takes part
+    present = set(paths)
+    tree = BKTree()
+    near = []
+    for i, path in enumerate(paths):
+        if derivative_base(path) in present:
+            continue
+        for dist, j in tree.query(phashes[i], phash_radius):
+            other = paths[j]
+            if digests[i] == digests[j]:
+                continue
+            d_dist = hamming(dhashes[i], dhashes[j])
+            if d_dist <= dhash_radius:
+                near.append({"a": other, "b": path, "phash": dist, "dhash": d_dist})
+        tree.add(phashes[i], i)
+    near.sort(key=lambda n: (n["phash"], n["dhash"]))
+
+    hashes = {p: {"sha256": s, "phash": f"{ph:016x}", "dhash": f"{dh:016x}"}
+              for p, s, ph, dh in zip(paths, digests, phashes, dhashes)}
+    return exact_groups, near, hashes
+
+
+def kb(path):
+    return os.path.getsize(path) // 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find duplicate, near-duplicate and unreferenced images")
+    parser.add_argument("--root", default="assets")
+    parser.add_argument("--phash-distance", type=int, default=8, help="Max pHash Hamming distance (of 64)")
+    parser.add_argument("--dhash-distance", type=int, default=12, help="Max dHash Hamming distance (of 64)")
+    parser.add_argument("--json", help="Write the full report (including per-file hashes) here")
+    args = parser.parse_args()
+
+    start = time.time()
+    paths = collect_images(args.root)
+    exact, near, hashes = scan(paths, args.phash_distance, args.dhash_distance)
+    referenced = referenced_paths()
+    unreferenced = [p for p in paths if os.path.normpath(p) not in referenced]
+    named = naming_scripts(unreferenced)
+    elapsed = time.time() - start
+
+    print(f"🔍 {len(paths)} images in {args.root}/ ({elapsed:.2f}s)")
+
+    print(f"\n🟰 Exact duplicates: {len(exact)} groups")
+    for group in exact:
+        print(f"   {kb(group[0])}KB × {len(group)}: " + ", ".join(group))
+
+    print(f"\n≈  Near duplicates: {len(near)} pairs")
+    for n in near:
+        print(f"   p{n['phash']:>2} d{n['dhash']:>2}  {n['a']} ({kb(n['a'])}KB) ~ {n['b']} ({kb(n['b'])}KB)")
+
+    unref_bytes = sum(os.path.getsize(p) for p in unreferenced)
+    print(f"\n🗑  Unreferenced: {len(unreferenced)} images, {unref_bytes / 1e6:.1f}MB")
+    for path in unreferenced:
+        hint = f" — named in {', '.join(named[path])}, path built at run time?" if path in named else ""
+        print(f"   {path} ({kb(path)}KB){hint}")
+
+    if args.json:
+        report = {"exact": exact, "near": near, "unreferenced": unreferenced, "named_in_scripts": named,
+                  "hashes": hashes}
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Saved to {args.json}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Fingerprint and precompress a staged deploy tree.
+
+Runs on the directory asset_graph.py --stage produces, never on the repo:
+1. Every stylesheet, script, image and font gets its content hash in its
+   name (style.css → style.3f2a9c1b7d.css) and every reference to it in
+   HTML, CSS, JS, JSON and the web manifest is rewritten. Files are handled
+   in dependency order, so a stylesheet's hash covers the renamed image URLs
+   inside it and a page's HTML always points at the final names.
+2. Every text file over MIN_BYTES gets .gz (zlib level 9) and .br (quality
+   11) siblings, in parallel, kept only when they save at least MIN_SAVING.
+3. A _headers file marks the fingerprinted files immutable for hosts that
+   read one (Cloudflare Pages, Netlify).
+
+Names that must stay stable are left alone: ROOT_FILES (favicon.ico,
+robots.txt…), apple-touch-icon*.png, and anything linked from the Apps
+Script / email sources, which reference the live site by URL.
+
+Staged files are hard links into the repo, so rewritten files are written
+to a temp file and swapped in — the repo copy is never touched.
+
+.br output needs the brotli package (pip install brotli); without it only
+.gz is written.
+
+Usage:
+    python3 asset_graph.py --stage _site
+    python3 fingerprint-assets.py _site
+    python3 fingerprint-assets.py _site --workers 4
+"""
+import os, re, sys, glob, gzip, time, fnmatch, hashlib, argparse
+from graphlib import TopologicalSorter, CycleError
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ProcessPoolExecutor
+from asset_graph import (ROOT_FILES, EXTERNAL_SOURCES, repo_files, build_graph, extract_refs, resolve,
+                         site_hosts)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FINGERPRINT_EXTS = (".css", ".js", ".jpg", ".jpeg", ".png", ".webp", ".avif", ".gif", ".svg",
+                    ".woff", ".woff2", ".ttf", ".otf")
+REWRITE_EXTS = (".html", ".css", ".js", ".json", ".webmanifest", ".svg")
+COMPRESS_EXTS = (".html", ".css", ".js", ".json", ".webmanifest", ".svg", ".xml", ".txt", ".ico")
+# Requested by browsers and crawlers at fixed URLs
+KEEP_PATTERNS = ROOT_FILES + ["apple-touch-icon*.png"]
+HASH_LEN = 10
+HASHED_RE = re.compile(r"\.[0-9a-f]{%d}\.\w+$" % HASH_LEN)
+MIN_BYTES = 1024
+MIN_SAVING = 0.05
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def external_targets():
+    """Files the Apps Script / email sources link to on the live site (read from the repo)."""
+    hosts = site_hosts()
+    keep = set()
+    for pattern in EXTERNAL_SOURCES:
+        for path in glob.glob(pattern):
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                strict, loose = extract_refs(path, f.read())
+            keep.update(t for t in (resolve(ref, path, hosts) for ref in strict + loose) if t)
+    return keep
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def replace_file(path, data):
+    """Write via a temp file so a hard link into the repo is replaced, not written through."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def content_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:HASH_LEN]
+
+
+def hashed_ref(ref, digest):
+    """Insert the hash before the extension of the ref's last path segment, keeping query and fragment."""
+    parts = urlsplit(ref)
+    dot = parts.path.rfind(".")
+    return urlunsplit(parts._replace(path=f"{parts.path[:dot]}.{digest}{parts.path[dot:]}"))
+
+
+def rewrite(path, renamed, hosts):
+    """Point references in path at the fingerprinted names. Returns the number of refs rewritten."""
+    text = read_text(path)
+    strict, loose = extract_refs(path, text)
+    subs = {}
+    for ref in {r.strip() for r in strict + loose}:
+        target = resolve(ref, path, hosts)
+        if target not in renamed and ref in loose and not urlsplit(ref).scheme:
+            # same fallback as build_graph: JS strings resolve against the root page
+            target = os.path.normpath(urlsplit(ref).path.lstrip("/"))
+        if target in renamed:
+            subs[ref] = hashed_ref(ref, renamed[target])
+    if not subs:
+        return 0
+    pattern = re.compile(r"(?<![\w./-])(%s)(?![\w.-])" % "|".join(
+        re.escape(ref) for ref in sorted(subs, key=len, reverse=True)))
+    new = pattern.sub(lambda m: subs[m.group(1)], text)
+    if new != text:
+        replace_file(path, new.encode("utf-8"))
+    return len(subs)
+
+
+def compress(path):
+    """Worker: write .gz / .br siblings. Returns (path, size, gz size or None, br size or None)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    out = [path, len(data), None, None]
+    variants = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli:
+        variants.append((".br", lambda d: brotli.compress(d, quality=11)))
+    for i, (suffix, fn) in enumerate(variants, start=2):
+        packed = fn(data)
+        if len(packed) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, "wb") as f:
+                f.write(packed)
+            out[i] = len(packed)
+    return tuple(out)
+
+
+def write_headers(renamed):
+    lines = []
+    for path, digest in sorted(renamed.items()):
+        lines += ["/" + hashed_ref(path, digest), f"  Cache-Control: {IMMUTABLE}", ""]
+    with open("_headers", "w") as f:
+        f.write("\n".join(lines))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint asset filenames and precompress a staged site")
+    parser.add_argument("site", nargs="?", default="_site", help="Staged deploy tree (default: _site)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.site) or os.path.samefile(args.site, "."):
+        sys.exit(f"❌ {args.site} is not a staged tree — run python3 asset_graph.py --stage {args.site} first")
+
+    start = time.time()
+    keep = external_targets()
+    os.chdir(args.site)
+    hosts = site_hosts()
+    files = [f for f in repo_files() if not f.endswith((".gz", ".br")) and f != "_headers"]
+    edges, _ = build_graph(files)
+
+    def fingerprintable(path):
+        return (path.lower().endswith(FINGERPRINT_EXTS) and path not in keep and not HASHED_RE.search(path)
+                and not any(fnmatch.fnmatch(os.path.basename(path), p) for p in KEEP_PATTERNS))
+
+    try:
+        # renamed files first: a file is hashed only after its own references are final
+        graph = {f: [t for t in edges.get(f, ()) if fingerprintable(t)] for f in files}
+        order = list(TopologicalSorter(graph).static_order())
+    except CycleError as e:
+        sys.exit(f"❌ Reference cycle, can't fingerprint consistently: {' → '.join(e.args[1])}")
+
+    renamed, rewritten = {}, 0
+    for path in order:
+        if path.endswith(REWRITE_EXTS):
+            rewritten += rewrite(path, renamed, hosts)
+        if fingerprintable(path):
+            renamed[path] = digest = content_hash(path)
+            os.rename(path, hashed_ref(path, digest))
+    write_headers(renamed)
+    print(f"🔖 {len(renamed)} files fingerprinted, {rewritten} references rewritten")
+
+    if not brotli:
+        print("⚠️ brotli not installed (pip install brotli) — writing .gz only")
+    targets = [hashed_ref(f, renamed[f]) if f in renamed else f for f in files]
+    targets = [f for f in targets if f.lower().endswith(COMPRESS_EXTS) and os.path.getsize(f) >= MIN_BYTES]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(compress, targets, chunksize=8))
+
+    raw = sum(r[1] for r in results)
+    gz = sum(r[2] or r[1] for r in results)
+    summary = f"📦 {len(results)} text files, {raw / 1e3:.0f}KB → gzip {gz / 1e3:.0f}KB"
+    if brotli:
+        summary += f", brotli {sum(r[3] or r[1] for r in results) / 1e3:.0f}KB"
+    print(summary)
+    print(f"✅ Done ({time.time() - start:.2f}s)")
@@ -2,19 +2,17 @@
 """
 Generate 3 before/after pairs using Nano Banana Pro on Fal.ai.
 Generic prompt vs skill-optimized prompt — same model, same settings.
-"""
-import os, json, requests
-
-FAL_KEY = ""
-with open(os.path.expanduser("~/.openclaw/.env")) as f:
-    for line in f:
-        if line.startswith("FAL_KEY="):
-            FAL_KEY = line.strip().split("=", 1)[1].strip('"').strip("'")
 
-assert FAL_KEY, "FAL_KEY not found"
+Usage:
+    python3 generate-before-after-v2.py                                   # seed 42, one image each
+    python3 generate-before-after-v2.py --sweep --seeds 1-6 --only food --budget 3
+    python3 generate-before-after-v2.py --sweep --seeds 1-4 --aspect-ratio 16:9,4:3
+"""
+import os, argparse, requests
+from fal_jobs import FalError, generate as fal_generate, add_sweep_args, sweep_from_args
+from provenance import write_image
 
-API_URL = "https://fal.run/fal-ai/nano-banana-pro"
-HEADERS = {"Authorization": f"Key {FAL_KEY}", "Content-Type": "application/json"}
+ENDPOINT = "fal-ai/nano-banana-pro"
 OUT_DIR = "assets/images/lead-magnet"
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -64,37 +62,44 @@ PAIRS = [
 SETTINGS = {
     "aspect_ratio": "16:9",
     "seed": 42,
+    "output_format": "jpeg",  # nano-banana-pro returns PNG by default; outputs are .jpg
 }
 
 
-def generate(prompt, filename):
+def generate(prompt, filename, hedge=False):
     payload = {**SETTINGS, "prompt": prompt}
     print(f"\n⏳ {filename}")
     print(f"   Prompt: {prompt[:70]}...")
-    r = requests.post(API_URL, headers=HEADERS, json=payload, timeout=180)
-    r.raise_for_status()
-    data = r.json()
-    if "images" in data and data["images"]:
-        img = requests.get(data["images"][0]["url"]).content
-        path = os.path.join(OUT_DIR, filename)
-        with open(path, "wb") as f:
-            f.write(img)
-        print(f"   ✅ {len(img)//1024}KB")
-        return path
-    else:
-        print(f"   ❌ {json.dumps(data)[:200]}")
+    try:
+        img, result = fal_generate(ENDPOINT, payload, hedge=hedge)
+    except (FalError, requests.RequestException) as e:
+        print(f"   ❌ {e}")
         return None
+    path = os.path.join(OUT_DIR, filename)
+    img = write_image(path, img, ENDPOINT, payload, result)
+    print(f"   ✅ {len(img)//1024}KB")
+    return path
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the before/after showcase pairs")
+    add_sweep_args(parser)
+    args = parser.parse_args()
+
+    if args.sweep:
+        prompts = {f"{side}-{pair['name']}": pair[side] for pair in PAIRS for side in ("before", "after")}
+        base = {k: v for k, v in SETTINGS.items() if k != "seed"}
+        sweep_from_args(args, ENDPOINT, prompts, base, "before-after-v2")
+        raise SystemExit
+
     print("=" * 60)
     print("BEFORE/AFTER v2 — Nano Banana Pro × 3 pairs")
     print("=" * 60)
     
     results = []
     for pair in PAIRS:
-        b = generate(pair["before"], f"before-{pair['name']}.jpg")
-        a = generate(pair["after"], f"after-{pair['name']}.jpg")
+        b = generate(pair["before"], f"before-{pair['name']}.jpg", args.hedge)
+        a = generate(pair["after"], f"after-{pair['name']}.jpg", args.hedge)
         results.append((pair["name"], b, a))
     
     print("\n" + "=" * 60)
@@ -2,29 +2,18 @@
 """
 Generate before/after comparison images for lead magnet.
 Both use Flux 2 Flex on Fal.ai with IDENTICAL settings — only prompt differs.
+
+Usage:
+    python3 generate-before-after.py                                  # seed 42, one image each
+    python3 generate-before-after.py --sweep --seeds 1-8 --guidance 3,3.5,4 --budget 2
 """
 import os
-import json
-import time
+import argparse
 import requests
+from fal_jobs import FalError, generate as fal_generate, add_sweep_args, sweep_from_args
+from provenance import write_image
 
-FAL_KEY = os.environ.get("FAL_KEY", "")
-if not FAL_KEY:
-    # Try loading from .env
-    env_path = os.path.expanduser("~/.openclaw/.env")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            for line in f:
-                if line.startswith("FAL_KEY="):
-                    FAL_KEY = line.strip().split("=", 1)[1].strip('"').strip("'")
-
-assert FAL_KEY, "FAL_KEY not found"
-
-API_URL = "https://fal.run/fal-ai/flux/dev"
-HEADERS = {
-    "Authorization": f"Key {FAL_KEY}",
-    "Content-Type": "application/json",
-}
+ENDPOINT = "fal-ai/flux/dev"
 
 OUT_DIR = "assets/images/lead-magnet"
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -55,31 +44,33 @@ SETTINGS = {
 }
 
 
-def generate(prompt, filename):
+def generate(prompt, filename, hedge=False):
     payload = {**SETTINGS, "prompt": prompt}
     print(f"\n⏳ Generating: {filename}")
     print(f"   Prompt: {prompt[:80]}...")
-    
-    # Synchronous call
-    r = requests.post(API_URL, headers=HEADERS, json=payload, timeout=120)
-    r.raise_for_status()
-    data = r.json()
-    
-    # Download image
-    if "images" in data and data["images"]:
-        img_url = data["images"][0]["url"]
-        img_data = requests.get(img_url).content
-        path = os.path.join(OUT_DIR, filename)
-        with open(path, "wb") as f:
-            f.write(img_data)
-        print(f"   ✅ Saved: {path} ({len(img_data) // 1024}KB)")
-        return path
-    else:
-        print(f"   ❌ No images in response: {json.dumps(data)[:200]}")
+
+    try:
+        img_data, result = fal_generate(ENDPOINT, payload, hedge=hedge)
+    except (FalError, requests.RequestException) as e:
+        print(f"   ❌ {e}")
         return None
+    path = os.path.join(OUT_DIR, filename)
+    img_data = write_image(path, img_data, ENDPOINT, payload, result)
+    print(f"   ✅ Saved: {path} ({len(img_data) // 1024}KB)")
+    return path
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the before/after comparison pair")
+    add_sweep_args(parser)
+    args = parser.parse_args()
+
+    if args.sweep:
+        base = {k: v for k, v in SETTINGS.items() if k != "seed"}
+        sweep_from_args(args, ENDPOINT, {"before-city": BEFORE_PROMPT, "after-city": AFTER_PROMPT}, base,
+                        "before-after")
+        raise SystemExit
+
     print("=" * 60)
     print("BEFORE/AFTER COMPARISON — Flux 2 Dev")
     print("=" * 60)
@@ -87,8 +78,8 @@ if __name__ == "__main__":
     print(f"\nAFTER prompt: {AFTER_PROMPT[:100]}...")
     print(f"\nSettings: seed={SETTINGS['seed']}, steps={SETTINGS['num_inference_steps']}, guidance={SETTINGS['guidance_scale']}")
     
-    before = generate(BEFORE_PROMPT, "before-generic-prompt.jpg")
-    after = generate(AFTER_PROMPT, "after-optimized-prompt.jpg")
+    before = generate(BEFORE_PROMPT, "before-generic-prompt.jpg", args.hedge)
+    after = generate(AFTER_PROMPT, "after-optimized-prompt.jpg", args.hedge)
     
     if before and after:
         print(f"\n✅ Both images generated!")
@@ -9,6 +9,12 @@ Design standards: DESIGN_TRUTH.md compliant
 - Generous negative space (40-60% content area)
 - Colored accent elements for visual interest
 - Consistent brand identity throughout
+
+Usage:
+    python3 generate-lead-magnet-pdf.py                  # assets/downloads/prompt-engineering-toolkit-2026.pdf
+    python3 generate-lead-magnet-pdf.py --reproducible   # byte-identical for unchanged inputs
+    python3 generate-lead-magnet-pdf.py --linearize      # fast web view (needs pikepdf or qpdf)
+    python3 generate-lead-magnet-pdf.py --parallel       # sections on all cores, then merged (same)
 """
 
 from reportlab.lib.pagesizes import letter
@@ -25,6 +31,12 @@ from reportlab.platypus.flowables import HRFlowable
 from reportlab.graphics.shapes import Drawing, Rect, Line, Circle
 from reportlab.graphics import renderPDF
 import os
+import sys
+import json
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from image_tiles import page_fit
+from pdf_tools import PdfToolError, backend, merge, linearize, check_linearization, linearization_dict
 
 # ── Brand Colors (from ICG design tokens) ──
 RED = HexColor("#E8000D")
@@ -44,6 +56,27 @@ PAGE_BG = HexColor("#FFFFFF")
 WHITE = HexColor("#FFFFFF")
 
 OUTPUT_PATH = "assets/downloads/prompt-engineering-toolkit-2026.pdf"
+
+# Reproducible mode: fixed creation date and a stable /ID, so unchanged inputs
+# give a byte-identical PDF (and the bundle/CDN caches stay valid).
+# Also switched on by SOURCE_DATE_EPOCH, which reportlab honours directly.
+REPRODUCIBLE = "--reproducible" in sys.argv[1:] or bool(os.environ.get("SOURCE_DATE_EPOCH"))
+BUILD_EPOCH = 1767225600  # 2026-01-01T00:00:00Z — the toolkit's edition date
+if REPRODUCIBLE:
+    os.environ.setdefault("SOURCE_DATE_EPOCH", str(BUILD_EPOCH))
+
+# Linearized ("fast web view") output: page 1 first, with hint tables, so a
+# browser shows the cover after the first range request. Checked after writing.
+LINEARIZE = "--linearize" in sys.argv[1:]
+
+# Parallel mode: each section (begin_section below) is built as its own document
+# on a process pool, and the parts are merged. A part's page numbers start after
+# PAGE_OFFSET — the pages before it, as counted on the last build (PART_PAGES_PATH);
+# a part whose offset turns out wrong is rendered again once the counts are known.
+PARALLEL = "--parallel" in sys.argv[1:]
+PARTS_DIR = ".cache/pdf-parts"
+PART_PAGES_PATH = f"{PARTS_DIR}/pages.json"
+PAGE_OFFSET = 0
 LOGO_PATH = "images/logo.png"
 
 # PDF imagery — macro close-ups, integrated into design
@@ -52,9 +85,20 @@ IMG_MACRO_LENS = "assets/images/pdf/camera-1910s-boxcamera.jpg"
 IMG_MACRO_LIGHT = "assets/images/pdf/techniques-1960s-darkroom-v2.jpg"
 IMG_CTA = "assets/images/pdf/cta-1940s-lighttable-v2.jpg"
 
+# Dark overlay opacity per photo page — tune-overlay-opacity.py --write saves
+# contrast-checked values to OVERLAY_OPACITY_PATH, which override these.
+OVERLAY_OPACITY = {"cover": 0.65, "photo_section": 0.55, "techniques": 0.55, "cta": 0.65}
+OVERLAY_OPACITY_PATH = "assets/images/pdf/overlay-opacity.json"
+if os.path.exists(OVERLAY_OPACITY_PATH):
+    with open(OVERLAY_OPACITY_PATH) as f:
+        OVERLAY_OPACITY.update(json.load(f))
+
 os.makedirs("assets/downloads", exist_ok=True)
 
 PAGE_W, PAGE_H = letter  # 612 x 792
+# Full-page photos are centre-cropped to the page and capped at 300dpi before embedding
+# (image_tiles.page_fit, cached under .cache/tiles/) — reportlab never decodes the full render.
+PAGE_IMAGE_WIDTH = 2550
 MARGIN_L = 0.9 * inch
 MARGIN_R = 0.9 * inch
 MARGIN_T = 0.75 * inch
@@ -129,6 +173,7 @@ def _draw_bg_image(canvas, doc, img_path, overlay_opacity=0.55, gradient=False):
         canvas.saveState()
         from reportlab.lib.utils import ImageReader
         try:
+            img_path = page_fit(img_path, PAGE_W / PAGE_H, PAGE_IMAGE_WIDTH)
             img = ImageReader(img_path)
             iw, ih = img.getSize()
             scale = max(PAGE_W / iw, PAGE_H / ih)
@@ -151,20 +196,20 @@ def _draw_bg_image(canvas, doc, img_path, overlay_opacity=0.55, gradient=False):
         print(f"  ⚠️ Background image not found: {img_path}")
 
 def cover_page_bg(canvas, doc):
-    print(f"  [BG] cover_page_bg called on page {doc.page}")
-    _draw_bg_image(canvas, doc, IMG_COVER_SPIRAL, overlay_opacity=0.65)
+    print(f"  [BG] cover_page_bg called on page {doc.page + PAGE_OFFSET}")
+    _draw_bg_image(canvas, doc, IMG_COVER_SPIRAL, overlay_opacity=OVERLAY_OPACITY["cover"])
 
 def photo_section_bg(canvas, doc):
-    print(f"  [BG] photo_section_bg called on page {doc.page}")
-    _draw_bg_image(canvas, doc, IMG_MACRO_LENS, overlay_opacity=0.55, gradient=True)
+    print(f"  [BG] photo_section_bg called on page {doc.page + PAGE_OFFSET}")
+    _draw_bg_image(canvas, doc, IMG_MACRO_LENS, overlay_opacity=OVERLAY_OPACITY["photo_section"], gradient=True)
 
 def techniques_bg(canvas, doc):
-    print(f"  [BG] techniques_bg called on page {doc.page}")
-    _draw_bg_image(canvas, doc, IMG_MACRO_LIGHT, overlay_opacity=0.55, gradient=True)
+    print(f"  [BG] techniques_bg called on page {doc.page + PAGE_OFFSET}")
+    _draw_bg_image(canvas, doc, IMG_MACRO_LIGHT, overlay_opacity=OVERLAY_OPACITY["techniques"], gradient=True)
 
 def cta_bg(canvas, doc):
-    print(f"  [BG] cta_bg called on page {doc.page}")
-    _draw_bg_image(canvas, doc, IMG_CTA, overlay_opacity=0.65)
+    print(f"  [BG] cta_bg called on page {doc.page + PAGE_OFFSET}")
+    _draw_bg_image(canvas, doc, IMG_CTA, overlay_opacity=OVERLAY_OPACITY["cta"])
 
 def models_intro_bg(canvas, doc):
     """Models section intro — warm tint + red top stripe."""
@@ -194,13 +239,14 @@ def paper_bg(canvas, doc):
         canvas.saveState()
         from reportlab.lib.utils import ImageReader
         try:
-            img = ImageReader(IMG_PAPER)
+            paper = page_fit(IMG_PAPER, PAGE_W / PAGE_H, PAGE_IMAGE_WIDTH)
+            img = ImageReader(paper)
             iw, ih = img.getSize()
             scale = max(PAGE_W / iw, PAGE_H / ih)
             dw, dh = iw * scale, ih * scale
             x = (PAGE_W - dw) / 2
             y = (PAGE_H - dh) / 2
-            canvas.drawImage(IMG_PAPER, x, y, width=dw, height=dh)
+            canvas.drawImage(paper, x, y, width=dw, height=dh)
         except Exception as e:
             print(f"  ⚠️ Paper bg error: {e}")
         canvas.restoreState()
@@ -210,7 +256,7 @@ def _draw_page_number(canvas, doc):
     canvas.saveState()
     canvas.setFont("Helvetica", 7.5)
     canvas.setFillColor(LIGHT_GRAY)
-    canvas.drawCentredString(PAGE_W / 2, 0.4 * inch, str(doc.page))
+    canvas.drawCentredString(PAGE_W / 2, 0.4 * inch, str(doc.page + PAGE_OFFSET))
     canvas.restoreState()
 
 def plain_bg(canvas, doc):
@@ -224,20 +270,27 @@ def plain_bg(canvas, doc):
 # ── Document Setup (BaseDocTemplate for per-page backgrounds) ──
 main_frame = Frame(MARGIN_L, MARGIN_B, CONTENT_W, PAGE_H - MARGIN_T - MARGIN_B, id='main')
 
-doc = BaseDocTemplate(
-    OUTPUT_PATH,
-    pagesize=letter,
-    pageTemplates=[
-        PageTemplate(id='cover', frames=[main_frame], onPage=cover_page_bg),
-        PageTemplate(id='photo_section', frames=[main_frame], onPage=photo_section_bg),
-        PageTemplate(id='techniques', frames=[main_frame], onPage=techniques_bg),
-        PageTemplate(id='cta', frames=[main_frame], onPage=cta_bg),
-        PageTemplate(id='models_intro', frames=[main_frame], onPage=models_intro_bg),
-        PageTemplate(id='models_page', frames=[main_frame], onPage=models_page_bg),
-        PageTemplate(id='paper', frames=[main_frame], onPage=paper_bg),
-        PageTemplate(id='plain', frames=[main_frame], onPage=plain_bg),
-    ],
-)
+page_templates = [
+    PageTemplate(id='cover', frames=[main_frame], onPage=cover_page_bg),
+    PageTemplate(id='photo_section', frames=[main_frame], onPage=photo_section_bg),
+    PageTemplate(id='techniques', frames=[main_frame], onPage=techniques_bg),
+    PageTemplate(id='cta', frames=[main_frame], onPage=cta_bg),
+    PageTemplate(id='models_intro', frames=[main_frame], onPage=models_intro_bg),
+    PageTemplate(id='models_page', frames=[main_frame], onPage=models_page_bg),
+    PageTemplate(id='paper', frames=[main_frame], onPage=paper_bg),
+    PageTemplate(id='plain', frames=[main_frame], onPage=plain_bg),
+]
+
+def make_doc(path, first_template='cover'):
+    """The toolkit document; a section built on its own starts on its own template (the first = default)."""
+    return BaseDocTemplate(
+        path,
+        pagesize=letter,
+        invariant=int(REPRODUCIBLE),
+        pageTemplates=sorted(page_templates, key=lambda t: t.id != first_template),
+    )
+
+doc = make_doc(OUTPUT_PATH)
 
 # ── Typography System ──
 # Following DESIGN_TRUTH: clear hierarchy, max 2 families, size ratio ~1.5x between levels
@@ -405,6 +458,10 @@ def divider():
 def section_label(text):
     return Paragraph(text.upper(), s_label)
 
+def begin_section(name):
+    """Mark where a section starts in the story (always on a fresh page) — the unit of --parallel."""
+    sections.append((name, len(story)))
+
 def table_style_clean(header_bg=RED, header_text=WHITE):
     """Consistent table styling throughout."""
     return TableStyle([
@@ -487,11 +544,13 @@ def model_section(num, name, maker, best_for, strengths, copy_paste, api_provide
 #  BUILD STORY
 # ══════════════════════════════════════════════
 story = []
+sections = []
 
 # ═══════════════════════════════════════
 # PAGE 1: COVER (full-page nautilus spiral background)
 # ═══════════════════════════════════════
 # Template is already 'cover' (first template = default)
+begin_section("cover")
 # Editorial left-aligned cover — matches section opener system
 story.append(spacer(1.8))
 
@@ -522,6 +581,7 @@ story.append(PageBreak())
 # ═══════════════════════════════════════
 # PAGE 2: WHAT'S INSIDE
 # ═══════════════════════════════════════
+begin_section("whats-inside")
 story.append(section_label("WHAT'S INSIDE"))
 story.append(spacer(0.05))
 story.append(Paragraph("This Toolkit", s_h1))
@@ -592,6 +652,7 @@ story.append(PageBreak())
 # ═══════════════════════════════════════
 # PAGE 3: WHY THESE 6 MODELS
 # ═══════════════════════════════════════
+begin_section("model-selection")
 story.append(section_label("MODEL SELECTION"))
 story.append(spacer(0.05))
 story.append(Paragraph("Why These 6 Models", s_h1))
@@ -631,6 +692,7 @@ story.append(Paragraph(
 # Switch to photo background for section opener
 story.append(NextPageTemplate('photo_section'))
 story.append(PageBreak())
+begin_section("photography")
 
 # ── Photo section title page (full-page vintage background, editorial left-align) ──
 story.append(spacer(2.5))
@@ -743,6 +805,7 @@ story.append(PageBreak())
 # ═══════════════════════════════════════
 # ANTI-AI REALISM
 # ═══════════════════════════════════════
+begin_section("anti-ai-realism")
 story.append(section_label("THE DIFFERENTIATOR"))
 story.append(spacer(0.05))
 story.append(Paragraph("Anti-AI Realism System", s_h1))
@@ -795,6 +858,7 @@ story.append(Paragraph(
 # ═══════════════════════════════════════
 story.append(NextPageTemplate('models_intro'))
 story.append(PageBreak())
+begin_section("models")
 
 story.append(section_label("THE MODELS"))
 story.append(spacer(0.05))
@@ -966,6 +1030,7 @@ story.append(PageBreak())
 # ═══════════════════════════════════════
 # COMPARISON MATRIX
 # ═══════════════════════════════════════
+begin_section("comparison-matrix")
 story.append(section_label("AT A GLANCE"))
 story.append(spacer(0.05))
 story.append(Paragraph("Comparison Matrix", s_h1))
@@ -1042,6 +1107,7 @@ for q, a in decisions:
 # Switch to prism background for section opener
 story.append(NextPageTemplate('techniques'))
 story.append(PageBreak())
+begin_section("techniques")
 
 # ── Techniques title page (full-page darkroom background, editorial left-align) ──
 story.append(spacer(2.5))
@@ -1114,6 +1180,7 @@ story.append(PageBreak())
 # ═══════════════════════════════════════
 # HOW TO USE THE SKILL
 # ═══════════════════════════════════════
+begin_section("how-to-use")
 story.append(section_label("GETTING STARTED"))
 story.append(spacer(0.05))
 story.append(Paragraph("How to Use the Skill", s_h1))
@@ -1201,6 +1268,7 @@ story.append(Paragraph(
 # ═══════════════════════════════════════
 story.append(NextPageTemplate('cta'))
 story.append(PageBreak())
+begin_section("cta")
 
 story.append(spacer(2.0))
 story.append(Paragraph(
@@ -1241,7 +1309,88 @@ story.append(Paragraph(
     ParagraphStyle("FooterLight2", parent=s_footer, textColor=Color(1, 1, 1, 0.35)),
 ))
 
+# ═══ PARALLEL SECTIONS ═══
+def section_parts():
+    """(name, first template, flowables) per section. The closing page break of each is dropped."""
+    bounds = sections + [(None, len(story))]
+    parts, template = [], 'cover'
+    for (name, start), (_, end) in zip(bounds, bounds[1:]):
+        flowables = story[start:end]
+        while flowables and isinstance(flowables[-1], (PageBreak, NextPageTemplate)):
+            flowables.pop()
+        parts.append((name, template, flowables))
+        for f in story[start:end]:
+            if isinstance(f, NextPageTemplate):
+                template = f.action[1]
+    return parts
+
+def render_section(index, offset, path):
+    """Worker: section index as its own PDF at path, numbered from offset + 1. Returns its page count."""
+    global PAGE_OFFSET
+    PAGE_OFFSET = offset
+    name, template, flowables = section_parts()[index]
+    part = make_doc(path, template)
+    part.build(flowables)
+    return part.page
+
+def build_parallel(workers=None):
+    """Render every section on a process pool and merge them into OUTPUT_PATH."""
+    names = [name for name, _, _ in section_parts()]
+    paths = [os.path.join(PARTS_DIR, f"{i:02d}-{name}.pdf") for i, name in enumerate(names)]
+    known = {}
+    if os.path.exists(PART_PAGES_PATH):
+        with open(PART_PAGES_PATH) as f:
+            known = json.load(f)
+    os.makedirs(PARTS_DIR, exist_ok=True)
+
+    pages = [known.get(name, 0) for name in names]
+    rendered_at = {}
+    waves = 0
+    while True:
+        offsets = list(accumulate(pages, initial=0))[:-1]
+        todo = [i for i in range(len(names)) if rendered_at.get(i) != offsets[i]]
+        if not todo:
+            break
+        # a fresh pool per wave: reportlab consumes flowables, so no process builds a section twice
+        waves += 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_section, i, offsets[i], paths[i]): i for i in todo}
+            for future in as_completed(futures):
+                i = futures[future]
+                pages[i], rendered_at[i] = future.result(), offsets[i]
+    print(f"\U0001f9e9 {len(names)} sections, {sum(pages)} pages, {waves} wave{'s' * (waves > 1)} "
+          f"on {workers or os.cpu_count()} workers")
+
+    merge(paths, OUTPUT_PATH, deterministic=REPRODUCIBLE)
+    with open(PART_PAGES_PATH, "w") as f:
+        json.dump(dict(zip(names, pages)), f, indent=2)
+        f.write("\n")
+
+
 # ═══ BUILD ═══
-doc.build(story)
-fsize = os.path.getsize(OUTPUT_PATH)
-print(f"\u2705 PDF generated: {OUTPUT_PATH} ({fsize // 1024}KB)")
+if __name__ == "__main__":
+    if PARALLEL and not backend():
+        print("\u26a0\ufe0f --parallel needs pikepdf or qpdf to merge the sections \u2014 building on one core")
+        PARALLEL = False
+    if PARALLEL:
+        build_parallel()
+    else:
+        doc.build(story)
+    fsize = os.path.getsize(OUTPUT_PATH)
+    print(f"\u2705 PDF generated: {OUTPUT_PATH} ({fsize // 1024}KB)")
+
+    if LINEARIZE:
+        try:
+            linearize(OUTPUT_PATH, deterministic=REPRODUCIBLE)
+            problems = check_linearization(OUTPUT_PATH)
+        except PdfToolError as e:
+            print(f"\u274c Linearize: {e}")
+            sys.exit(1)
+        if problems:
+            print("\u274c Linearized PDF failed verification:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        params = linearization_dict(OUTPUT_PATH)
+        print(f"\u26a1 Linearized: page 1 of {params['N']} in the first {params['E'] // 1024}KB "
+              f"of {params['L'] // 1024}KB, hint tables OK")
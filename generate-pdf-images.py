@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 """Generate macro close-up images for the lead magnet PDF."""
-import requests, os, time
+import os, time
+from fal_jobs import generate
+from provenance import write_image
 
-FAL_KEY = os.environ.get("FAL_KEY", "3b076811-c8e4-4975-9348-2e3b4a197bba:71dcf43ca6673ee859b5d6f262a3f163")
-ENDPOINT = "https://fal.run/fal-ai/nano-banana-pro"
-HEADERS = {"Authorization": f"Key {FAL_KEY}", "Content-Type": "application/json"}
+ENDPOINT = "fal-ai/nano-banana-pro"
 OUT_DIR = "assets/images/pdf"
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -55,14 +55,9 @@ for name, config in images.items():
         "aspect_ratio": config["aspect_ratio"],
         "num_images": 1,
     }
-    resp = requests.post(ENDPOINT, json=payload, headers=HEADERS, timeout=120)
-    resp.raise_for_status()
-    data = resp.json()
-    img_url = data["images"][0]["url"]
-    img_data = requests.get(img_url, timeout=60).content
+    img_data, result = generate(ENDPOINT, payload)
     path = os.path.join(OUT_DIR, f"{name}.jpg")
-    with open(path, "wb") as f:
-        f.write(img_data)
+    img_data = write_image(path, img_data, ENDPOINT, payload, result)
     print(f"  ✅ Saved: {path} ({len(img_data)//1024}KB)")
     time.sleep(1)
 
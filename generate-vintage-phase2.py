@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
-"""Generate vintage section backgrounds Phase 2: 1960s + 1980s via Flux 2 Flex."""
-import subprocess, os, json, time, sys, functools
+"""
+Generate vintage section backgrounds Phase 2: 1960s + 1980s via Flux 2 Flex.
+
+Renders are masters (masters/backgrounds/); build-backgrounds.py runs
+afterwards to write the budgeted derivatives under assets/backgrounds/.
+The portrait <name>-mobile.jpg crops are art-directed by hand — re-crop them
+after a new render.
+
+Usage:
+    python3 generate-vintage-phase2.py            # both backgrounds in parallel
+    python3 generate-vintage-phase2.py --hedge    # duplicate a job that runs past p90
+"""
+import os, sys, argparse, functools, subprocess
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from fal_jobs import FalError, generate
+from provenance import write_image
 print = functools.partial(print, flush=True)
 
-FAL_KEY = "3b076811-c8e4-4975-9348-2e3b4a197bba:71dcf43ca6673ee859b5d6f262a3f163"
-QUEUE_ENDPOINT = "https://queue.fal.run/fal-ai/flux-2-flex"
-OUT_DIR = "assets/backgrounds"
+ENDPOINT = "fal-ai/flux-2-flex"
+OUT_DIR = "masters/backgrounds"
 os.makedirs(OUT_DIR, exist_ok=True)
 
 images = {
@@ -56,115 +70,35 @@ images = {
     },
 }
 
-def submit_and_poll(name, config):
-    """Submit to Flux 2 Flex queue API and poll for result."""
+def render(name, config, hedge=False):
+    """Render one background on Flux 2 Flex and save it. Returns the path or None."""
     print(f"\n🎨 Submitting {name}...")
-    payload = json.dumps({
+    payload = {
         "prompt": config["prompt"],
         "image_size": {"width": config["width"], "height": config["height"]},
         "num_images": 1,
         "num_inference_steps": 28,
         "guidance_scale": 3.5,
-    })
-    
-    # Submit to queue
-    result = subprocess.run(
-        ["curl", "-s", "--max-time", "30",
-         "-X", "POST", QUEUE_ENDPOINT,
-         "-H", f"Authorization: Key {FAL_KEY}",
-         "-H", "Content-Type: application/json",
-         "-d", payload],
-        capture_output=True, text=True
-    )
-    
-    if result.returncode != 0:
-        print(f"  ❌ Submit failed: {result.stderr}")
-        return None
-    
+    }
     try:
-        data = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        print(f"  ❌ JSON parse error: {result.stdout[:300]}")
+        img, result = generate(ENDPOINT, payload, hedge=hedge)
+    except (FalError, requests.RequestException) as e:
+        print(f"  ❌ {name}: {e}")
         return None
-    
-    request_id = data.get("request_id")
-    status_url = data.get("status_url")
-    response_url = data.get("response_url")
-    
-    if not request_id:
-        print(f"  ❌ No request_id: {data}")
-        return None
-    
-    print(f"  📋 Request ID: {request_id}")
-    print(f"  ⏳ Polling for result...")
-    
-    # Poll for completion
-    for attempt in range(60):  # up to 5 minutes
-        time.sleep(5)
-        
-        poll = subprocess.run(
-            ["curl", "-s", "--max-time", "15",
-             "-H", f"Authorization: Key {FAL_KEY}",
-             status_url or f"{QUEUE_ENDPOINT}/requests/{request_id}/status"],
-            capture_output=True, text=True
-        )
-        
-        try:
-            status_data = json.loads(poll.stdout)
-        except json.JSONDecodeError:
-            continue
-        
-        status = status_data.get("status", "")
-        print(f"    [{attempt+1}] Status: {status}", end="")
-        
-        if status == "COMPLETED":
-            print(" ✅")
-            # Fetch result
-            res = subprocess.run(
-                ["curl", "-s", "--max-time", "30",
-                 "-H", f"Authorization: Key {FAL_KEY}",
-                 response_url or f"{QUEUE_ENDPOINT}/requests/{request_id}"],
-                capture_output=True, text=True
-            )
-            try:
-                return json.loads(res.stdout)
-            except json.JSONDecodeError:
-                print(f"  ❌ Result parse error: {res.stdout[:300]}")
-                return None
-        elif status == "FAILED":
-            print(f" ❌ Error: {status_data.get('error', 'unknown')}")
-            return None
-        else:
-            queue_pos = status_data.get("queue_position", "?")
-            print(f" (queue: {queue_pos})")
+    outpath = f"{OUT_DIR}/{name}.jpg"
+    img = write_image(outpath, img, ENDPOINT, payload, result)
+    print(f"  ✅ Saved: {outpath} ({len(img) // 1024}KB)")
+    return outpath
 
-    print("  ❌ Timed out after 5 minutes")
-    return None
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the 1960s / 1980s section backgrounds")
+    parser.add_argument("--hedge", action="store_true", help="Duplicate a job that runs past its p90 latency")
+    args = parser.parse_args()
 
-for name, config in images.items():
-    result = submit_and_poll(name, config)
-    if not result:
-        continue
-    
-    img_url = result.get("images", [{}])[0].get("url")
-    if not img_url:
-        print(f"  ❌ No image URL in result: {json.dumps(result)[:300]}")
-        continue
-    
-    print(f"  📥 Downloading...")
-    outpath = f"{OUT_DIR}/{name}.jpg"
-    dl = subprocess.run(
-        ["curl", "-s", "--max-time", "60", "-o", outpath, img_url],
-        capture_output=True, text=True
-    )
-    
-    if os.path.exists(outpath):
-        size = os.path.getsize(outpath) // 1024
-        print(f"  ✅ Saved: {outpath} ({size}KB)")
-    else:
-        print(f"  ❌ Download failed")
-    
-    time.sleep(2)
+    with ThreadPoolExecutor(max_workers=len(images)) as pool:
+        saved = list(pool.map(lambda item: render(*item, hedge=args.hedge), images.items()))
 
-print("\n✅ Phase 2 vintage backgrounds generation complete!")
+    print("\n✅ Phase 2 vintage backgrounds generation complete!")
+    if any(saved):
+        sys.exit(subprocess.run([sys.executable, "build-backgrounds.py"]).returncode)
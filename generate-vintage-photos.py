@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Generate vintage 'behind the scenes' photographer images for PDF backgrounds."""
-import subprocess, os, json, time
+import os, time
+import requests
+from fal_jobs import FalError, generate
+from provenance import write_image
 
-FAL_KEY = "3b076811-c8e4-4975-9348-2e3b4a197bba:71dcf43ca6673ee859b5d6f262a3f163"
-ENDPOINT = "https://fal.run/fal-ai/nano-banana-pro"
+ENDPOINT = "fal-ai/nano-banana-pro"
 OUT_DIR = "assets/images/pdf"
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -56,41 +58,20 @@ images = {
 
 for name, config in images.items():
     print(f"\n🎨 Generating {name}...")
-    payload = json.dumps({
+    payload = {
         "prompt": config["prompt"],
         "aspect_ratio": config["aspect_ratio"],
         "num_images": 1,
-    })
-    
-    result = subprocess.run(
-        ["curl", "-s", "--max-time", "120",
-         "-X", "POST", ENDPOINT,
-         "-H", f"Authorization: Key {FAL_KEY}",
-         "-H", "Content-Type: application/json",
-         "-d", payload],
-        capture_output=True, text=True
-    )
-    
-    if result.returncode != 0:
-        print(f"  ❌ curl failed: {result.stderr}")
-        continue
-    
+    }
+
     try:
-        data = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        print(f"  ❌ JSON parse error: {result.stdout[:200]}")
+        img_data, result = generate(ENDPOINT, payload)
+    except (FalError, requests.RequestException) as e:
+        print(f"  ❌ {e}")
         continue
-    
-    img_url = data["images"][0]["url"]
-    print(f"  📥 Downloading from {img_url[:60]}...")
-    
-    dl = subprocess.run(
-        ["curl", "-s", "--max-time", "60", "-o", f"{OUT_DIR}/{name}.jpg", img_url],
-        capture_output=True, text=True
-    )
-    
-    size = os.path.getsize(f"{OUT_DIR}/{name}.jpg") // 1024
-    print(f"  ✅ Saved: {OUT_DIR}/{name}.jpg ({size}KB)")
+
+    img_data = write_image(f"{OUT_DIR}/{name}.jpg", img_data, ENDPOINT, payload, result)
+    print(f"  ✅ Saved: {OUT_DIR}/{name}.jpg ({len(img_data) // 1024}KB)")
     time.sleep(2)
 
 print("\n✅ All vintage photography images generated!")
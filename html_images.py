@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared <img> scanning and rewriting for the static-page tools
+(inject-srcset.py, build-placeholders.py).
+
+Pages are edited in place by byte range, so everything outside the rewritten
+tags — indentation, comments, inline scripts — is left exactly as it was.
+"""
+import os, re, glob
+from html import escape
+from html.parser import HTMLParser
+
+SITE_PAGES = ["index.html", "work/index.html", "projects/*.html"]
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class ImgScanner(HTMLParser):
+    """Collects every <img> with its byte range, classes and fold position.
+
+    `classes` lists the img's own classes first, then its ancestors' from the
+    innermost outwards.
+    """
+
+    def __init__(self, text):
+        super().__init__(convert_charrefs=True)
+        self.line_starts = [0]
+        for m in re.finditer("\n", text):
+            self.line_starts.append(m.end())
+        self.stack = []          # (tag, classes)
+        self.sections_seen = 0
+        self.images = []
+        self.pictures = []       # (start, end) of existing <picture> blocks
+        self._picture_start = None
+
+    def _offset(self):
+        line, col = self.getpos()
+        return self.line_starts[line - 1] + col
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get("class") or "").split()
+        if tag == "section" and not any(t == "section" for t, _ in self.stack):
+            self.sections_seen += 1
+        if tag == "picture":
+            self._picture_start = self._offset()
+        if tag == "img":
+            raw = self.get_starttag_text()
+            start = self._offset()
+            in_nav = any(t in ("nav", "header") for t, _ in self.stack)
+            self.images.append({
+                "start": start,
+                "end": start + len(raw),
+                "raw": raw,
+                "attrs": attrs,
+                "classes": classes + [c for _, cs in reversed(self.stack) for c in cs],
+                "in_nav": in_nav,
+                "above_fold": in_nav or self.sections_seen <= 1,
+                "in_picture": self._picture_start is not None,
+            })
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, classes))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.stack and self.stack[-1][0] == tag:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        if tag == "picture" and self._picture_start is not None:
+            self.pictures.append((self._picture_start, self._offset() + len("</picture>")))
+            self._picture_start = None
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                break
+
+
+def scan(text):
+    scanner = ImgScanner(text)
+    scanner.feed(text)
+    scanner.close()
+    return scanner
+
+
+def expand_pages(patterns):
+    pages = []
+    for pattern in patterns:
+        pages.extend(sorted(glob.glob(pattern)))
+    return pages
+
+
+def resolve_src(src, page_path):
+    """Page-relative or root-absolute src -> repo path (or None if not under assets/)."""
+    if not src or re.match(r"^(https?:)?//|^data:", src):
+        return None
+    src = src.split("?")[0].split("#")[0]
+    if src.startswith("/"):
+        path = src.lstrip("/")
+    else:
+        path = os.path.normpath(os.path.join(os.path.dirname(page_path), src))
+    return path if path.startswith("assets/") else None
+
+
+def set_attr(attrs, name, value):
+    for i, (k, _) in enumerate(attrs):
+        if k == name:
+            attrs[i] = (name, value)
+            return
+    attrs.append((name, value))
+
+
+def drop_attr(attrs, name):
+    attrs[:] = [(k, v) for k, v in attrs if k != name]
+
+
+def serialize_img(attrs, self_closing):
+    parts = []
+    for name, value in attrs:
+        parts.append(name if value is None else f'{name}="{escape(value, quote=True)}"')
+    return "<img " + " ".join(parts) + (" />" if self_closing else ">")
+
+
+def apply_edits(text, edits):
+    """edits: [(start, end, replacement)] on non-overlapping ranges."""
+    for start, end, repl in sorted(edits, reverse=True):
+        text = text[:start] + repl + text[end:]
+    return text
+
+
+def write_if_changed(path, old, new, dry_run=False):
+    if new == old:
+        return False
+    if not dry_run:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(new)
+    return True
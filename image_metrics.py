@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local perceptual quality metrics — a cheap pre-filter before Gemini audits.
+
+Scores images on sharpness, contrast, exposure, colorfulness and noise with
+vectorized NumPy, and measures WCAG text contrast inside a region of a page
+(e.g. the white text on the dark `_draw_bg_image` overlays). JPEGs are decoded
+with Pillow's DCT draft mode at analysis size and scored across a thread
+pool, so throughput is bounded by JPEG decoding (a few ms per image per core)
+rather than by the metrics themselves.
+
+Usage:
+    python3 image_metrics.py assets/images/lead-magnet/*.jpg
+    python3 image_metrics.py --json metrics.json assets/backgrounds/*.jpg
+    python3 image_metrics.py --text-box 0.15,0.25,0.85,0.6 pdf-page-5.png
+
+As a module:
+    from image_metrics import score_image, prefilter, text_region_contrast
+"""
+import os, json, time, argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+
+ANALYSIS_SIDE = 512  # metrics are computed on images downscaled to this long side
+
+# Obvious rejects — anything outside these bounds never reaches a vision model.
+REJECT_RULES = {
+    "sharpness_min": 0.0008,       # Laplacian variance (0-1 scale); below = blurry / failed render
+    "contrast_min": 0.06,          # RMS luma contrast; below = flat / washed out
+    "clip_shadows_max": 0.35,      # fraction of pixels crushed to black
+    "clip_highlights_max": 0.20,   # fraction of pixels blown to white
+    "noise_max": 0.06,             # estimated noise sigma (0-1 scale)
+}
+
+# WCAG 2.x contrast targets
+WCAG_AA = 4.5
+WCAG_AA_LARGE = 3.0
+
+
+# ── Loading ──
+
+def load_rgb(path, max_side=ANALYSIS_SIDE):
+    """Decode to float32 RGB in [0, 1], downscaled so the long side is <= max_side."""
+    with Image.open(path) as im:
+        # JPEG draft mode decodes straight at 1/2, 1/4 or 1/8 scale — the main speed win
+        im.draft("RGB", (max_side, max_side))
+        im = im.convert("RGB")
+        if max(im.size) > max_side:
+            im.thumbnail((max_side, max_side), Image.BILINEAR)
+        return np.asarray(im, dtype=np.float32) / 255.0
+
+
+def luma(rgb):
+    """Rec. 709 luma on gamma-encoded values."""
+    return rgb @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def srgb_to_linear(c):
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance of gamma-encoded sRGB values in [0, 1]."""
+    return srgb_to_linear(rgb) @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def contrast_ratio(l1, l2):
+    """WCAG contrast ratio between two relative luminances (broadcasts)."""
+    hi = np.maximum(l1, l2)
+    lo = np.minimum(l1, l2)
+    return (hi + 0.05) / (lo + 0.05)
+
+
+# ── Metrics ──
+
+def sharpness(y):
+    """Variance of the 4-neighbour Laplacian."""
+    lap = (y[1:-1, :-2] + y[1:-1, 2:] + y[:-2, 1:-1] + y[2:, 1:-1]) - 4.0 * y[1:-1, 1:-1]
+    return float(lap.var())
+
+
+def rms_contrast(y):
+    return float(y.std())
+
+
+def exposure(y):
+    """Histogram summary: clipping at both ends, mean/median and tonal entropy."""
+    hist = np.bincount(np.clip(y * 255.0, 0, 255).astype(np.uint8).ravel(), minlength=256)
+    n = hist.sum()
+    p = hist / n
+    nz = p[p > 0]
+    cdf = np.cumsum(hist)
+    return {
+        "mean": float(y.mean()),
+        "median": float(np.searchsorted(cdf, n / 2) / 255.0),
+        "clip_shadows": float(hist[:3].sum() / n),
+        "clip_highlights": float(hist[253:].sum() / n),
+        "entropy": float(-(nz * np.log2(nz)).sum()),
+    }
+
+
+def colorfulness(rgb):
+    """Hasler & Süsstrunk (2003) colorfulness, rescaled to the 0-255 convention."""
+    r, g, b = rgb[..., 0] * 255.0, rgb[..., 1] * 255.0, rgb[..., 2] * 255.0
+    rg = r - g
+    yb = 0.5 * (r + g) - b
+    return float(np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean()))
+
+
+def noise_sigma(y):
+    """Immerkær (1996) fast noise estimate — sigma of additive Gaussian noise."""
+    h, w = y.shape
+    if h < 3 or w < 3:
+        return 0.0
+    c = y[1:-1, 1:-1]
+    conv = (
+        y[:-2, :-2] - 2 * y[:-2, 1:-1] + y[:-2, 2:]
+        - 2 * y[1:-1, :-2] + 4 * c - 2 * y[1:-1, 2:]
+        + y[2:, :-2] - 2 * y[2:, 1:-1] + y[2:, 2:]
+    )
+    return float(np.sqrt(np.pi / 2) * np.abs(conv).sum() / (6.0 * (w - 2) * (h - 2)))
+
+
+def score_array(rgb):
+    y = luma(rgb)
+    return {
+        "width": int(rgb.shape[1]),
+        "height": int(rgb.shape[0]),
+        "sharpness": sharpness(y),
+        "contrast": rms_contrast(y),
+        "exposure": exposure(y),
+        "colorfulness": colorfulness(rgb),
+        "noise": noise_sigma(y),
+    }
+
+
+def score_image(path, max_side=ANALYSIS_SIDE):
+    m = score_array(load_rgb(path, max_side))
+    m["path"] = path
+    return m
+
+
+def rejection_reasons(m, rules=REJECT_RULES):
+    reasons = []
+    if m["sharpness"] < rules["sharpness_min"]:
+        reasons.append(f"blurry (sharpness {m['sharpness']:.5f})")
+    if m["contrast"] < rules["contrast_min"]:
+        reasons.append(f"flat (contrast {m['contrast']:.3f})")
+    if m["exposure"]["clip_shadows"] > rules["clip_shadows_max"]:
+        reasons.append(f"crushed shadows ({m['exposure']['clip_shadows']:.0%})")
+    if m["exposure"]["clip_highlights"] > rules["clip_highlights_max"]:
+        reasons.append(f"blown highlights ({m['exposure']['clip_highlights']:.0%})")
+    if m["noise"] > rules["noise_max"]:
+        reasons.append(f"noisy (sigma {m['noise']:.3f})")
+    return reasons
+
+
+def score_images(paths, workers=None):
+    """Score many images in parallel — Pillow decoding and NumPy both release the GIL."""
+    workers = workers or min(32, (os.cpu_count() or 2) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(score_image, paths))
+
+
+def prefilter(paths, rules=REJECT_RULES, workers=None):
+    """Split paths into (passed, rejected). rejected is a list of (path, reasons)."""
+    passed, rejected = [], []
+    for m in score_images(paths, workers):
+        reasons = rejection_reasons(m, rules)
+        if reasons:
+            rejected.append((m["path"], reasons))
+        else:
+            passed.append(m["path"])
+    return passed, rejected
+
+
+# ── Text contrast ──
+
+def text_region_contrast(rgb, box, text_rgb=(1.0, 1.0, 1.0), text_alpha=1.0):
+    """WCAG contrast of a text colour against every background pixel in a region.
+
+    box is (x0, y0, x1, y1) as fractions of the image, origin top-left.
+    Semi-transparent text (the light styles use alpha 0.65-0.85) is composited
+    over each pixel before comparing. Returns min/p5/median ratios — p5 is the
+    useful "worst readable spot" number; min is usually a single hot pixel.
+    """
+    h, w = rgb.shape[:2]
+    x0, y0, x1, y1 = box
+    region = rgb[int(y0 * h):max(int(y1 * h), int(y0 * h) + 1), int(x0 * w):max(int(x1 * w), int(x0 * w) + 1)]
+    bg = region.reshape(-1, 3)
+    fg = text_alpha * np.asarray(text_rgb, dtype=np.float32) + (1.0 - text_alpha) * bg
+    ratios = contrast_ratio(relative_luminance(fg), relative_luminance(bg))
+    return {
+        "min": float(ratios.min()),
+        "p5": float(np.percentile(ratios, 5)),
+        "median": float(np.median(ratios)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local image quality metrics and pre-filter")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--json", help="Write all metrics to this file")
+    parser.add_argument("--text-box", help="x0,y0,x1,y1 fractions — also report white-text WCAG contrast there")
+    parser.add_argument("--text-alpha", type=float, default=0.85)
+    args = parser.parse_args()
+
+    start = time.time()
+    metrics = score_images(args.paths)
+    elapsed = time.time() - start
+
+    print(f"{'file':<44} {'sharp':>8} {'contr':>6} {'mean':>5} {'clipL':>6} {'clipH':>6} {'color':>6} {'noise':>6}")
+    rejects = 0
+    for m in metrics:
+        e = m["exposure"]
+        reasons = rejection_reasons(m)
+        rejects += bool(reasons)
+        flag = "❌ " + "; ".join(reasons) if reasons else "✅"
+        print(f"{os.path.basename(m['path'])[:44]:<44} {m['sharpness']:>8.5f} {m['contrast']:>6.3f} "
+              f"{e['mean']:>5.2f} {e['clip_shadows']:>6.1%} {e['clip_highlights']:>6.1%} "
+              f"{m['colorfulness']:>6.1f} {m['noise']:>6.3f}  {flag}")
+        if args.text_box:
+            box = tuple(float(v) for v in args.text_box.split(","))
+            m["text_contrast"] = text_region_contrast(load_rgb(m["path"]), box, text_alpha=args.text_alpha)
+            tc = m["text_contrast"]
+            status = "✅" if tc["p5"] >= WCAG_AA else "⚠️"
+            print(f"   {status} text contrast p5={tc['p5']:.2f} median={tc['median']:.2f} min={tc['min']:.2f}")
+
+    rate = len(metrics) / elapsed if elapsed else float("inf")
+    print(f"\n📊 {len(metrics)} images in {elapsed:.2f}s ({rate:.0f}/s) — {rejects} rejected")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(metrics, f, indent=2)
+        print(f"✅ Saved to {args.json}")
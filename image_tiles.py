@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Memory-bounded image operations for large sources (4K renders, PNG masters).
+
+A source is decoded once, straight into a memory-mapped RGBX spill file
+under SPILL_DIR — Pillow's decoder writes into the mapping, so the frame
+never lands on the heap. A JPEG that is only going to be shrunk decodes at
+a DCT-reduced size first. Every operation then walks the frame in strips
+of about STRIP_PIXELS, so wider images get shorter strips:
+
+    resize       Lanczos; each output strip from its source rows plus the filter margin
+    fit          centre-crop to an aspect (the PDF page), then resize
+    map_strips   any per-strip function (era_grade.grade_band) into a new frame
+    placeholder  tiny blurred JPEG, as build-backgrounds.py makes
+
+Heap use is a few strips per operation whatever the image size. Mapped
+pages are file-backed, so the kernel can drop them under pressure and
+many workers fit on a small box. Output frames are mapped too and encode
+straight from the mapping. Keep to baseline JPEG for large outputs:
+progressive and optimized encoding buffer every coefficient.
+
+Usage:
+    python3 image_tiles.py assets/images/pdf/*.jpg --aspect 8.5:11 --width 2550 --out /tmp/pdf
+    python3 image_tiles.py masters/backgrounds/system-bg.jpg --width 1920 --grade 1960s-broadcast --out /tmp/bg
+    python3 image_tiles.py render-4k.png --placeholder --out /tmp/bg
+
+As a module:
+    from image_tiles import open_frame, resize, fit, page_fit
+"""
+import os, io, sys, time, math, zlib, hashlib, argparse, tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+SPILL_DIR = ".cache/tiles"
+PAGE_FIT_DIR = f"{SPILL_DIR}/page-fit"
+STRIP_PIXELS = 1 << 18   # ~128 rows of a 2048-wide frame; grading needs ~200 bytes of float scratch a pixel
+LANCZOS_SUPPORT = 3
+ORIENTATION = 0x0112
+# decoded modes stored 4 bytes a pixel, so the decoder can write into an RGBX/RGBA mapping
+MAPPABLE = {"RGB": "RGBX", "RGBA": "RGBA"}
+
+
+class Frame:
+    """An RGBX uint8 image in a memory-mapped spill file. Closing (or leaving the with block) deletes it."""
+
+    def __init__(self, width, height):
+        os.makedirs(SPILL_DIR, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(suffix=".rgbx", dir=SPILL_DIR)
+        os.close(fd)
+        self.width, self.height = width, height
+        self.pixels = np.memmap(self.path, dtype=np.uint8, mode="w+", shape=(height, width, 4))
+        self.rgb = self.pixels[..., :3]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pixels = self.rgb = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def strips(self, pixels=STRIP_PIXELS):
+        rows = max(1, pixels // self.width)
+        for top in range(0, self.height, rows):
+            yield top, min(top + rows, self.height)
+
+    def band(self, top, bottom):
+        """Rows top..bottom as a zero-copy PIL image."""
+        return Image.frombuffer("RGBX", (self.width, bottom - top), self.pixels[top:bottom], "raw", "RGBX", 0, 1)
+
+    def image(self):
+        """The whole frame as a zero-copy PIL image (mode RGBX), valid while the frame is open."""
+        return self.band(0, self.height)
+
+    def encode(self, fmt="JPEG", **params):
+        buf = io.BytesIO()
+        im = self.image()
+        # only JPEG takes RGBX as-is; anything else gets an RGB copy
+        (im if fmt == "JPEG" else im.convert("RGB")).save(buf, fmt, **params)
+        return buf.getvalue()
+
+
+def open_frame(path, max_size=None):
+    """Decode path into a new Frame. With max_size=(w, h), a JPEG decodes at the smallest DCT scale still ≥ that."""
+    with Image.open(path) as im:
+        if max_size:
+            im.draft("RGB", tuple(max_size))
+        # only JPEG keeps EXIF in its header — PNG's getexif() decodes the whole image to look
+        rotated = im.format == "JPEG" and im.getexif().get(ORIENTATION, 1) != 1
+        if im.mode in MAPPABLE and not rotated:
+            frame = Frame(*im.size)
+            im.im = Image.core.map_buffer(frame.pixels, im.size, "raw", 0, (MAPPABLE[im.mode], im.width * 4, 1))
+            im.load()
+            return frame
+        # greyscale, palette, 16-bit or EXIF-rotated: decoded on the heap (at most one frame of the
+        # source's own depth), then converted into the mapping a strip at a time
+        im = ImageOps.exif_transpose(im)
+        frame = Frame(*im.size)
+        for top, bottom in frame.strips():
+            frame.pixels[top:bottom] = np.asarray(im.crop((0, top, im.width, bottom)).convert("RGBX"))
+        return frame
+
+
+def resize(frame, width, height, box=None, resample=Image.LANCZOS):
+    """Resample frame — or its (x0, y0, x1, y1) box — to width × height, one output strip at a time."""
+    x0, y0, x1, y1 = box or (0, 0, frame.width, frame.height)
+    out = Frame(width, height)
+    scale = (y1 - y0) / height
+    margin = math.ceil(LANCZOS_SUPPORT * max(scale, 1)) + 1
+    for top, bottom in out.strips():
+        sy0, sy1 = y0 + top * scale, y0 + bottom * scale
+        r0, r1 = max(0, math.floor(sy0) - margin), min(frame.height, math.ceil(sy1) + margin)
+        strip = frame.band(r0, r1).resize((width, bottom - top), resample, box=(x0, sy0 - r0, x1, sy1 - r0))
+        out.pixels[top:bottom] = np.asarray(strip)
+    return out
+
+
+def aspect_box(width, height, aspect):
+    """The largest centred (x0, y0, x1, y1) box with width / height == aspect."""
+    if width / height > aspect:
+        w = round(height * aspect)
+        return ((width - w) // 2, 0, (width - w) // 2 + w, height)
+    h = round(width / aspect)
+    return (0, (height - h) // 2, width, (height - h) // 2 + h)
+
+
+def fit_size(width, height, max_width=None, aspect=None):
+    """(box, output width, output height) for fit() — never upscales."""
+    box = aspect_box(width, height, aspect) if aspect else (0, 0, width, height)
+    bw, bh = box[2] - box[0], box[3] - box[1]
+    w = min(max_width or bw, bw)
+    return box, w, max(1, round(bh * w / bw))
+
+
+def fit(frame, max_width=None, aspect=None):
+    """Centre-crop frame to aspect (width / height) and shrink to max_width. Returns a new Frame."""
+    box, w, h = fit_size(frame.width, frame.height, max_width, aspect)
+    if (w, h) == (box[2] - box[0], box[3] - box[1]):
+        out = Frame(w, h)
+        for top, bottom in out.strips():
+            out.pixels[top:bottom] = frame.pixels[box[1] + top:box[1] + bottom, box[0]:box[2]]
+        return out
+    return resize(frame, w, h, box)
+
+
+def draft_size(path, max_width=None, aspect=None):
+    """The decode size open_frame() needs for a later fit(max_width, aspect) — lets JPEGs decode small."""
+    with Image.open(path) as im:
+        width, height = im.size
+    box, w, _ = fit_size(width, height, max_width, aspect)
+    scale = w / (box[2] - box[0])
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+def map_strips(frame, fn):
+    """New frame whose rows top..bottom are fn(frame RGBX rows top..bottom, top) — an RGB uint8 array."""
+    out = Frame(frame.width, frame.height)
+    for top, bottom in frame.strips():
+        out.rgb[top:bottom] = fn(frame.pixels[top:bottom], top)
+    return out
+
+
+def placeholder(frame, width=32, blur=2, quality=50):
+    """Tiny blurred JPEG bytes."""
+    with resize(frame, width, max(1, round(frame.height * width / frame.width))) as small:
+        im = small.image().convert("RGB").filter(ImageFilter.GaussianBlur(blur))
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def page_fit(path, aspect, max_width, quality=92):
+    """Cached copy of path cropped to a page aspect and shrunk to max_width. Returns its path."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    key = hashlib.sha256(f"{digest}:{aspect:.6f}:{max_width}:{quality}".encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    out_path = f"{PAGE_FIT_DIR}/{stem}-{key}.jpg"
+    if not os.path.exists(out_path):
+        os.makedirs(PAGE_FIT_DIR, exist_ok=True)
+        with open_frame(path, draft_size(path, max_width, aspect)) as frame, fit(frame, max_width, aspect) as out:
+            data = out.encode("JPEG", quality=quality)
+        tmp = f"{out_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out_path)
+    return out_path
+
+
+def parse_aspect(value):
+    w, _, h = value.partition(":")
+    return float(w) / float(h) if h else float(w)
+
+
+def process(src, out_dir, width=None, aspect=None, grade=None, make_placeholder=False, quality=92):
+    """Worker: one source through fit → grade → encode (and a placeholder). Returns (paths, seconds)."""
+    start = time.time()
+    stem = os.path.splitext(os.path.basename(src))[0]
+    outputs = {os.path.join(out_dir, f"{stem}{'-' + grade if grade else ''}.jpg"):
+               lambda frame: frame.encode("JPEG", quality=quality)}
+    if make_placeholder:
+        outputs[os.path.join(out_dir, f"{stem}-placeholder.jpg")] = placeholder
+    with open_frame(src, draft_size(src, width, aspect)) as frame, fit(frame, width, aspect) as out:
+        if grade:
+            from era_grade import grade_band
+            seed = zlib.crc32(f"{os.path.basename(src)}:{grade}".encode())
+            graded = map_strips(out, lambda rows, top: grade_band(rows, grade, top, out.height, seed))
+            out.close()
+            out = graded
+        try:
+            for path, encode in outputs.items():
+                with open(path, "wb") as f:
+                    f.write(encode(out))
+        finally:
+            out.close()
+    return list(outputs), time.time() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resize / crop / grade large images in memory-bounded strips")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--width", type=int, help="Shrink to at most this width")
+    parser.add_argument("--aspect", type=parse_aspect, help="Centre-crop to W:H first (8.5:11 = PDF page)")
+    parser.add_argument("--grade", help="era_grade preset to apply")
+    parser.add_argument("--placeholder", action="store_true", help="Also write <stem>-placeholder.jpg")
+    parser.add_argument("--quality", type=int, default=92)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    start, failed = time.time(), 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(process, src, args.out, args.width, args.aspect, args.grade, args.placeholder,
+                               args.quality): src for src in args.images}
+        for future in as_completed(futures):
+            try:
+                paths, seconds = future.result()
+                print(f"  ✅ {futures[future]} → {', '.join(paths)} ({seconds:.2f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"  ❌ {futures[future]}: {e}")
+    print(f"\n✅ {len(args.images) - failed}/{len(args.images)} images in {time.time() - start:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Rewrite <img> tags in the static pages to use the responsive renditions.
+
+For every <img> whose src points into assets/:
+- srcset/sizes from assets/renditions/manifest.json (build-image-renditions.py)
+- intrinsic width/height, so the browser reserves space before the image loads
+- loading/decoding/fetchpriority hints: images in the nav or the first
+  <section> are above the fold (eager; the first photo outside the nav gets
+  fetchpriority="high"), everything else is lazy + async
+
+`src` keeps pointing at the original file as the fallback. img srcset can't
+switch on format, so it lists WebP (supported by every current browser);
+--picture wraps managed images in <picture> with AVIF and WebP <source>s
+and a JPEG srcset on the <img> instead; the deploy workflow uses it, so every
+format build-image-renditions.py writes is referenced.
+
+Only files whose content actually changes are written, and running it again
+is a no-op.
+
+Usage:
+    python3 inject-srcset.py                 # index.html, work/index.html, projects/*.html
+    python3 inject-srcset.py --picture --dry-run partners.html
+"""
+import os, re, json, argparse
+from html import escape
+from PIL import Image
+from html_images import (SITE_PAGES, scan, expand_pages, resolve_src, set_attr, drop_attr,
+                         serialize_img, apply_edits, write_if_changed)
+
+MANIFEST_PATH = "assets/renditions/manifest.json"
+
+# (class, sizes) — first rule whose class is on the <img> or one of its ancestors wins
+SIZES_RULES = [
+    ("project-hero-bg", "100vw"),
+    ("section-bg", "100vw"),
+    ("gallery-item", "(max-width: 768px) 100vw, 66vw"),   # first item spans 2 of 3 columns
+    ("work-card--large", "(max-width: 768px) 100vw, 50vw"),
+    ("work-card", "(max-width: 768px) 100vw, 33vw"),
+]
+DEFAULT_SIZES = "100vw"
+MIME = {"avif": "image/avif", "webp": "image/webp", "jpg": "image/jpeg"}
+
+
+_dims_cache = {}
+
+def intrinsic_size(path):
+    if path not in _dims_cache:
+        size = None
+        try:
+            if path.endswith(".svg"):
+                with open(path, encoding="utf-8", errors="ignore") as f:
+                    head = f.read(2048)
+                m = re.search(r'viewBox="[\d.\-]+[ ,]+[\d.\-]+[ ,]+([\d.]+)[ ,]+([\d.]+)"', head)
+                if m:
+                    size = (round(float(m.group(1))), round(float(m.group(2))))
+            else:
+                with Image.open(path) as im:  # header only — no pixel decode
+                    size = im.size
+        except OSError:
+            pass
+        _dims_cache[path] = size
+    return _dims_cache[path]
+
+
+def sizes_for(classes):
+    for cls, sizes in SIZES_RULES:
+        if cls in classes:
+            return sizes
+    return DEFAULT_SIZES
+
+
+def srcset(variants, page_dir):
+    return ", ".join(f"{os.path.relpath(v['path'], page_dir)} {v['width']}w" for v in variants)
+
+
+def rewrite_page(page_path, manifest, use_picture):
+    with open(page_path, encoding="utf-8") as f:
+        text = f.read()
+    scanner = scan(text)
+    page_dir = os.path.dirname(page_path) or "."
+
+    edits = []  # (start, end, replacement)
+    priority_given = False
+    for img in scanner.images:
+        attrs = list(img["attrs"])
+        path = resolve_src(dict(attrs).get("src"), page_path)
+        if not path or not os.path.exists(path):
+            continue
+        entry = manifest.get(path)
+
+        dims = intrinsic_size(path)
+        if dims:
+            set_attr(attrs, "width", str(dims[0]))
+            set_attr(attrs, "height", str(dims[1]))
+
+        if img["above_fold"]:
+            set_attr(attrs, "loading", "eager")
+            # First raster image outside the nav is the LCP candidate (hero still / project hero)
+            if not img["in_nav"] and not path.endswith(".svg") and not priority_given:
+                set_attr(attrs, "fetchpriority", "high")
+                priority_given = True
+            else:
+                drop_attr(attrs, "fetchpriority")
+        else:
+            set_attr(attrs, "loading", "lazy")
+            drop_attr(attrs, "fetchpriority")
+        set_attr(attrs, "decoding", "async")
+
+        sources = ""
+        if entry:
+            variants = entry["variants"]
+            sizes = sizes_for(img["classes"])
+            if use_picture:
+                img_fmt = "jpg"
+                sources = "".join(
+                    f'<source type="{MIME[fmt]}" srcset="{escape(srcset(variants[fmt], page_dir))}" sizes="{sizes}">'
+                    for fmt in ("avif", "webp") if variants.get(fmt)
+                )
+            else:
+                img_fmt = "webp" if variants.get("webp") else "jpg"
+            set_attr(attrs, "srcset", srcset(variants[img_fmt], page_dir))
+            set_attr(attrs, "sizes", sizes)
+
+        new_img = serialize_img(attrs, img["raw"].rstrip().endswith("/>"))
+        if use_picture and sources and not img["in_picture"]:
+            edits.append((img["start"], img["end"], f"<picture>{sources}{new_img}</picture>"))
+        elif use_picture and sources and img["in_picture"]:
+            block = next((p for p in scanner.pictures if p[0] <= img["start"] < p[1]), None)
+            if block:
+                edits.append((block[0], block[1], f"<picture>{sources}{new_img}</picture>"))
+        elif new_img != img["raw"]:
+            edits.append((img["start"], img["end"], new_img))
+
+    return text, apply_edits(text, edits), len(edits)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inject srcset/sizes/dimensions/loading hints into <img> tags")
+    parser.add_argument("pages", nargs="*", help="HTML files or globs (default: index, work, projects)")
+    parser.add_argument("--picture", action="store_true", help="Wrap managed images in <picture> with AVIF/WebP sources")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    args = parser.parse_args()
+
+    manifest = {}
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+    else:
+        print(f"⚠️ {MANIFEST_PATH} not found — run build-image-renditions.py first (only dimensions/hints will be added)")
+
+    pages = expand_pages(args.pages or SITE_PAGES)
+
+    changed = 0
+    for page in pages:
+        old, new, n_edits = rewrite_page(page, manifest, args.picture)
+        if not write_if_changed(page, old, new, args.dry_run):
+            continue
+        changed += 1
+        print(f"   ✏️  {page}: {n_edits} <img> tags")
+
+    verb = "would change" if args.dry_run else "rewritten"
+    print(f"\n✅ {changed}/{len(pages)} pages {verb}")
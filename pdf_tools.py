@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Post-processing for the generated PDFs: merging separately rendered parts,
+and linearization ("fast web view").
+
+A linearized PDF puts page 1 and everything it uses at the front of the
+file, behind a linearization dictionary and hint tables that say where the
+remaining pages start. A browser viewer that sees /Linearized in the first
+bytes can render the cover after one range request and fetch the rest on
+demand, instead of downloading the whole file first.
+
+reportlab can't write linearized files, so the rewrite is done by qpdf —
+through pikepdf when it is installed, otherwise the qpdf command line.
+check_linearization() verifies a result twice: the hint tables with qpdf's
+own checker, and the linearization dictionary by hand (it has to be the
+first object, and its /L has to match the file length — a file touched
+after linearizing is no longer "fast web view").
+
+merge() concatenates parts (generate-lead-magnet-pdf.py --parallel renders
+each section as its own document). Pages are copied as they are; resources
+shared between parts are not deduplicated.
+
+Usage:
+    python3 pdf_tools.py assets/downloads/prompt-engineering-toolkit-2026.pdf            # check
+    python3 pdf_tools.py assets/downloads/prompt-engineering-toolkit-2026.pdf --linearize
+
+As a module:
+    from pdf_tools import merge, linearize, check_linearization
+"""
+import os, io, re, sys, shutil, argparse, subprocess
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+HEADER_BYTES = 1024   # the linearization dictionary must start within the first 1KB
+
+
+class PdfToolError(Exception):
+    pass
+
+
+def backend():
+    """'pikepdf', 'qpdf' or None."""
+    if pikepdf is not None:
+        return "pikepdf"
+    return "qpdf" if shutil.which("qpdf") else None
+
+
+def _require_backend():
+    name = backend()
+    if not name:
+        raise PdfToolError("needs pikepdf (pip install pikepdf) or the qpdf command line")
+    return name
+
+
+def merge(paths, out_path, deterministic=False):
+    """Concatenate the PDFs in paths into out_path. The document info comes from the first."""
+    name = _require_backend()
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        if name == "pikepdf":
+            with pikepdf.open(paths[0]) as pdf:
+                parts = [pikepdf.open(path) for path in paths[1:]]
+                try:
+                    for part in parts:
+                        pdf.pages.extend(part.pages)
+                    pdf.save(tmp, deterministic_id=deterministic)
+                finally:
+                    for part in parts:
+                        part.close()
+        else:
+            cmd = ["qpdf", *(["--deterministic-id"] if deterministic else []), paths[0], "--pages", *paths, "--", tmp]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode not in (0, 3):
+                raise PdfToolError(f"qpdf --pages: {proc.stderr.strip()[-300:]}")
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def linearize(path, deterministic=False):
+    """Rewrite path in place as a linearized PDF. deterministic=True derives the /ID from the content."""
+    name = _require_backend()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        if name == "pikepdf":
+            with pikepdf.open(path) as pdf:
+                pdf.save(tmp, linearize=True, deterministic_id=deterministic)
+        else:
+            cmd = ["qpdf", "--linearize", *(["--deterministic-id"] if deterministic else []), path, tmp]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            # exit status 3 = succeeded with warnings
+            if proc.returncode not in (0, 3):
+                raise PdfToolError(f"qpdf --linearize: {proc.stderr.strip()[-300:]}")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def linearization_dict(path):
+    """The linearization parameters ({'L': ..., 'H': [...], 'O': ..., 'E': ..., 'N': ...}) or None."""
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+    m = re.search(rb"\d+\s+0\s+obj\s*<<(.*?)>>", head, re.S)
+    if not m or not re.search(rb"/Linearized\s+[\d.]+", m.group(1)):
+        return None
+    params = {key.decode(): int(value) for key, value in re.findall(rb"/([LOEN])\s+(\d+)", m.group(1))}
+    hint = re.search(rb"/H\s*\[([\d\s]+)\]", m.group(1))
+    params["H"] = [int(v) for v in hint.group(1).split()] if hint else []
+    return params
+
+
+def check_linearization(path):
+    """Problems with path's linearization, as a list of strings — empty when it is valid fast web view."""
+    params = linearization_dict(path)
+    if params is None:
+        return [f"no linearization dictionary in the first {HEADER_BYTES} bytes"]
+    problems = []
+    size = os.path.getsize(path)
+    if params.get("L") != size:
+        problems.append(f"/L is {params.get('L')} but the file is {size} bytes (modified after linearizing?)")
+    if len(params["H"]) not in (2, 4):
+        problems.append("no hint stream offset (/H)")
+    for key in "OEN":
+        if key not in params:
+            problems.append(f"linearization dictionary has no /{key}")
+    if problems:
+        # the hint tables are located through these — and qpdf's checker can exit the process on a bad /L
+        return problems
+
+    name = _require_backend()
+    if name == "pikepdf":
+        out = io.StringIO()
+        try:
+            with pikepdf.open(path) as pdf:
+                ok = pdf.check_linearization(stream=out)
+        except (pikepdf.PdfError, RuntimeError) as e:
+            ok = False
+            out.write(str(e))
+        report = out.getvalue().strip()
+    else:
+        proc = subprocess.run(["qpdf", "--check-linearization", path], capture_output=True, text=True)
+        ok = proc.returncode == 0
+        report = (proc.stdout + proc.stderr).strip()
+    if not ok:
+        problems.append(f"hint tables: {report[-500:] or 'check failed'}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Linearize a PDF for fast web view and check the result")
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--linearize", action="store_true", help="Rewrite each file linearized before checking")
+    parser.add_argument("--deterministic", action="store_true", help="Content-derived /ID (reproducible builds)")
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.pdfs:
+        try:
+            if args.linearize:
+                linearize(path, args.deterministic)
+            problems = check_linearization(path)
+        except PdfToolError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if problems:
+            failed += 1
+            print(f"❌ {path}: not fast web view")
+            for problem in problems:
+                print(f"   {problem}")
+        else:
+            params = linearization_dict(path)
+            print(f"✅ {path}: linearized, page 1 of {params['N']} in the first {params['E'] // 1024}KB "
+                  f"of {params['L'] // 1024}KB")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Provenance index for generated images.
+
+Every image the generators save goes through write_image(), which records
+how it was made in a local SQLite index (DB_PATH): file hash, path, model
+endpoint, prompt, seed, the rest of the payload, the script that ran and
+the Fal request id. Derived images (grades, crops) record the hash of
+their parent instead of a prompt.
+
+The same record is mirrored into the file itself — a JPEG COM segment or a
+PNG iTXt chunk, spliced in without re-encoding — so an image copied out of
+a sweep into assets/ still carries it, and --scan rebuilds the index from
+the images alone.
+
+Prompts are full-text searchable (FTS5); lookups by file hash are indexed.
+
+Usage:
+    python3 provenance.py                                  # coverage of assets/
+    python3 provenance.py --search "neon AND rain"         # FTS5 query over prompts
+    python3 provenance.py --lookup assets/images/lead-magnet/after-food.jpg
+    python3 provenance.py --lookup 3f2a9c1b                # hash prefix
+    python3 provenance.py --scan assets sweeps             # (re)index embedded records
+    python3 provenance.py --check                          # re-index self-check + FTS integrity (rebuilds)
+
+As a module:
+    from provenance import write_image
+"""
+import os, sys, json, time, zlib, struct, sqlite3, hashlib, argparse
+
+DB_PATH = "provenance.sqlite"
+MARKER = "icg-provenance:"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created TEXT NOT NULL,
+    endpoint TEXT,
+    prompt TEXT,
+    seed INTEGER,
+    settings TEXT,
+    script TEXT,
+    request_id TEXT,
+    parent_sha256 TEXT,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER,
+    UNIQUE (sha256, path)
+);
+CREATE INDEX IF NOT EXISTS assets_sha256 ON assets (sha256);
+CREATE INDEX IF NOT EXISTS assets_path ON assets (path);
+CREATE VIRTUAL TABLE IF NOT EXISTS prompts USING fts5 (prompt, path, content='assets', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS assets_ai AFTER INSERT ON assets BEGIN
+    INSERT INTO prompts (rowid, prompt, path) VALUES (new.id, new.prompt, new.path);
+END;
+CREATE TRIGGER IF NOT EXISTS assets_ad AFTER DELETE ON assets BEGIN
+    INSERT INTO prompts (prompts, rowid, prompt, path) VALUES ('delete', old.id, old.prompt, old.path);
+END;
+"""
+FIELDS = ("endpoint", "prompt", "seed", "settings", "script", "request_id", "parent_sha256", "created")
+
+
+def connect(path=DB_PATH):
+    db = sqlite3.connect(path, timeout=30)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_size(data):
+    """(width, height) from the JPEG/PNG header, without decoding pixels."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", data[16:24])
+    i = 2
+    while i + 9 < len(data) and data[i] == 0xFF:
+        marker, length = data[i + 1], struct.unpack(">H", data[i + 2:i + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        i += 2 + length
+    return None, None
+
+
+# ── Embedded copy ──
+
+def embed(data, record):
+    """Return data with the record spliced in as a JPEG COM segment / PNG iTXt chunk (or unchanged)."""
+    text = (MARKER + json.dumps(record, sort_keys=True, ensure_ascii=False)).encode("utf-8")
+    if data[:2] == b"\xff\xd8" and len(text) <= 65533:
+        return data[:2] + b"\xff\xfe" + struct.pack(">H", len(text) + 2) + text + data[2:]
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        body = b"icg-provenance\x00\x00\x00\x00\x00" + text[len(MARKER):]
+        chunk = struct.pack(">I", len(body)) + b"iTXt" + body + struct.pack(">I", zlib.crc32(b"iTXt" + body))
+        end_of_ihdr = 8 + 8 + struct.unpack(">I", data[8:12])[0] + 4
+        return data[:end_of_ihdr] + chunk + data[end_of_ihdr:]
+    return data
+
+
+def extract(data):
+    """The embedded record, or None."""
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 4 <= len(data) and data[i] == 0xFF and data[i + 1] not in (0xDA, 0xD9):
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            if data[i + 1] == 0xFE and data[i + 4:i + 4 + len(MARKER)] == MARKER.encode():
+                return json.loads(data[i + 4 + len(MARKER):i + 2 + length].decode("utf-8"))
+            i += 2 + length
+    elif data[:8] == b"\x89PNG\r\n\x1a\n":
+        i = 8
+        while i + 8 <= len(data):
+            length, kind = struct.unpack(">I4s", data[i:i + 8])
+            if kind == b"iTXt" and data[i + 8:i + 23] == b"icg-provenance\x00":
+                return json.loads(data[i + 8 + 19:i + 8 + length].decode("utf-8"))
+            if kind == b"IDAT":
+                break
+            i += 12 + length
+    return None
+
+
+# ── Index ──
+
+def record(db, path, data, info):
+    width, height = image_size(data)
+    row = {**{k: info.get(k) for k in FIELDS}, "sha256": sha256_bytes(data), "path": os.path.normpath(path),
+           "width": width, "height": height, "bytes": len(data)}
+    row["created"] = row["created"] or time.strftime("%Y-%m-%dT%H:%M:%S")
+    if isinstance(row["settings"], dict):
+        row["settings"] = json.dumps(row["settings"], sort_keys=True)
+    # a new file (or a re-index) at an existing path replaces what the index knew about that path.
+    # A plain DELETE, not INSERT OR REPLACE: only a DELETE fires assets_ad, which keeps prompts in step
+    db.execute("DELETE FROM assets WHERE path = ?", (row["path"],))
+    db.execute(f"INSERT INTO assets ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+               list(row.values()))
+    db.commit()
+    return row
+
+
+def provenance_for(endpoint, payload, result=None, parent=None):
+    """The record for a generation (endpoint + payload) or a local derivative (parent file hash)."""
+    payload = dict(payload or {})
+    result = result or {}
+    prompt = payload.pop("prompt", None)
+    seed = payload.pop("seed", None)
+    return {
+        "endpoint": endpoint,
+        "prompt": prompt,
+        "seed": result.get("seed", seed),
+        "settings": payload,
+        "script": os.path.basename(sys.argv[0]) or None,
+        "request_id": result.get("request_id"),
+        "parent_sha256": parent,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_image(path, data, endpoint=None, payload=None, result=None, parent=None, mirror=True, db_path=DB_PATH):
+    """Write an image and record its provenance. Returns the bytes as written."""
+    info = provenance_for(endpoint, payload, result, parent)
+    if mirror:
+        data = embed(data, info)
+    with open(path, "wb") as f:
+        f.write(data)
+    db = connect(db_path)
+    try:
+        record(db, path, data, info)
+    finally:
+        db.close()
+    return data
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def lookup(db, target):
+    if os.path.isfile(target):
+        rows = db.execute("SELECT * FROM assets WHERE sha256 = ?", (file_sha256(target),)).fetchall()
+        if not rows:
+            with open(target, "rb") as f:
+                embedded = extract(f.read())
+            return [], embedded
+        return rows, None
+    rows = db.execute("SELECT * FROM assets WHERE sha256 LIKE ? OR path = ? ORDER BY created",
+                      (target.lower() + "%", os.path.normpath(target))).fetchall()
+    return rows, None
+
+
+def search(db, query, limit=20):
+    return db.execute("""
+        SELECT assets.*, snippet(prompts, 0, '[', ']', '…', 12) AS snippet
+        FROM prompts JOIN assets ON assets.id = prompts.rowid
+        WHERE prompts MATCH ? ORDER BY bm25(prompts) LIMIT ?""", (query, limit)).fetchall()
+
+
+def integrity_problems(db):
+    """FTS5 integrity check of prompts against assets — None if consistent, else the error."""
+    try:
+        db.execute("INSERT INTO prompts (prompts, rank) VALUES ('integrity-check', 1)")
+        return None
+    except sqlite3.DatabaseError as e:
+        return str(e)
+
+
+def self_check():
+    """Re-index one file twice, then overwrite it with a new prompt, in a scratch database. Returns problems."""
+    db = connect(":memory:")
+    problems = []
+    try:
+        info = {"endpoint": "test", "prompt": "neon rain at night"}
+        record(db, "x/a.jpg", b"first", info)
+        record(db, "x/a.jpg", b"first", info)
+        record(db, "x/a.jpg", b"second", {"endpoint": "test", "prompt": "sunlit meadow"})
+        rows = db.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        if rows != 1:
+            problems.append(f"{rows} rows for one path after re-indexing")
+        if search(db, "neon"):
+            problems.append("search still finds the overwritten prompt")
+        if len(search(db, "meadow")) != 1:
+            problems.append("search doesn't find the current prompt exactly once")
+        error = integrity_problems(db)
+        if error:
+            problems.append(f"FTS index: {error}")
+    finally:
+        db.close()
+    return problems
+
+
+def walk_images(roots):
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for name in sorted(filenames):
+                if name.lower().endswith(IMAGE_EXTS):
+                    yield os.path.join(dirpath, name)
+
+
+def print_row(row):
+    what = f"from {row['parent_sha256'][:12]}" if row["parent_sha256"] else f"{row['endpoint']} seed={row['seed']}"
+    print(f"   {row['sha256'][:12]}  {row['path']}  {row['width']}×{row['height']}  {what}  "
+          f"({row['script']}, {row['created']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search and maintain the generated-image provenance index")
+    parser.add_argument("--search", metavar="QUERY", help="FTS5 query over prompts, e.g. 'neon AND rain'")
+    parser.add_argument("--lookup", metavar="FILE_OR_HASH", help="Provenance of a file, a path or a hash prefix")
+    parser.add_argument("--scan", nargs="+", metavar="DIR", help="Index records embedded in images under DIR")
+    parser.add_argument("--check", action="store_true", help="Self-check re-indexing, verify (and repair) the FTS index")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    db = connect(args.db)
+    if args.check:
+        problems = self_check()
+        for problem in problems:
+            print(f"❌ self-check: {problem}")
+        error = integrity_problems(db)
+        if error:
+            # rows left stale by older versions of record(); rebuild from assets
+            db.execute("INSERT INTO prompts (prompts) VALUES ('rebuild')")
+            db.commit()
+            print(f"⚠️ {args.db}: prompt index was inconsistent ({error}) — rebuilt")
+            error = integrity_problems(db)
+        if problems or error:
+            db.close()
+            sys.exit(1)
+        print(f"✅ Re-indexing self-check passed; {args.db} prompt index is consistent")
+    elif args.search:
+        rows = search(db, args.search)
+        print(f"🔎 {len(rows)} matches for {args.search!r}")
+        for row in rows:
+            print_row(row)
+            print(f"      {row['snippet']}")
+    elif args.lookup:
+        rows, embedded = lookup(db, args.lookup)
+        if rows:
+            for row in rows:
+                print_row(row)
+                print(f"   prompt:   {row['prompt']}")
+                print(f"   settings: {row['settings']}")
+        elif embedded:
+            print(f"⚠️ Not indexed, but the file carries a record (run --scan to index it):")
+            print(json.dumps(embedded, indent=2, ensure_ascii=False))
+        else:
+            print(f"❌ No provenance for {args.lookup}")
+    elif args.scan:
+        added = missing = 0
+        for path in walk_images(args.scan):
+            with open(path, "rb") as f:
+                data = f.read()
+            info = extract(data)
+            if info:
+                record(db, path, data, info)
+                added += 1
+            else:
+                missing += 1
+        print(f"✅ {added} images indexed from embedded records, {missing} without one")
+    else:
+        total = db.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        known = {r[0] for r in db.execute("SELECT sha256 FROM assets")}
+        images = list(walk_images(["assets"]))
+        covered = sum(file_sha256(p) in known for p in images)
+        print(f"🧾 {total} records in {args.db}; {covered}/{len(images)} images under assets/ have provenance")
+    db.close()
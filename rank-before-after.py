@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Rank any number of before/after pairs with a pairwise Gemini tournament.
+
+analyze-before-after.py sends every image in one request, which stops working
+once there are more than a handful of candidates. Here each model call only
+compares TWO pairs. Matches are scheduled in Swiss-style rounds (neighbours in
+the current standings play each other), every round runs in parallel, and the
+results are aggregated with a Bradley-Terry model. The tournament stops as soon
+as the top candidates are separated with confidence, so N pairs are ranked in
+roughly N/2 · log2(N) calls instead of N².
+
+Usage:
+    python3 rank-before-after.py                      # pairs in assets/images/lead-magnet
+    python3 rank-before-after.py --dir out/candidates --top 3 --workers 8
+    python3 rank-before-after.py --dir out/candidates --prefilter   # drop obvious rejects locally first
+"""
+import os, re, json, math, time, base64, random, argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+
+MODEL = "gemini-2.5-flash"
+IMG_DIR = "assets/images/lead-magnet"
+RANKING_FILE = "ranking.json"
+
+# Strength prior: every candidate gets this many virtual half-wins against an
+# average opponent so a single early result can't send a score to ±infinity.
+PRIOR_GAMES = 1.0
+Z_CONFIDENT = 1.64  # one-sided 95%
+
+
+def load_gemini_key():
+    key = os.environ.get("GEMINI_API_KEY", "")
+    env_path = os.path.expanduser("~/.openclaw/.env")
+    if not key and os.path.exists(env_path):
+        with open(env_path) as f:
+            for line in f:
+                if line.startswith(("GEMINI_API_KEY=", "GOOGLE_AI_API_KEY=", "GOOGLE_API_KEY=")):
+                    key = line.strip().split("=", 1)[1].strip('"').strip("'")
+                    break
+    assert key, "Gemini API key not found"
+    return key
+
+
+def discover_pairs(img_dir):
+    """Match before-<name>.<ext> with after-<name>.<ext> in img_dir."""
+    files = os.listdir(img_dir)
+    befores = {}
+    afters = {}
+    for fn in files:
+        m = re.match(r"^(before|after)-(.+)\.(jpe?g|png|webp)$", fn, re.I)
+        if not m:
+            continue
+        (befores if m.group(1).lower() == "before" else afters)[m.group(2)] = os.path.join(img_dir, fn)
+    names = sorted(set(befores) & set(afters))
+    return [{"name": n, "before": befores[n], "after": afters[n]} for n in names]
+
+
+_b64_cache = {}
+
+def load_image_b64(path):
+    # Every candidate plays several matches — encode each file once
+    if path not in _b64_cache:
+        with open(path, "rb") as f:
+            _b64_cache[path] = base64.b64encode(f.read()).decode()
+    return _b64_cache[path]
+
+
+def _mime(path):
+    ext = path.rsplit(".", 1)[-1].lower()
+    return {"png": "image/png", "webp": "image/webp"}.get(ext, "image/jpeg")
+
+
+MATCH_PROMPT = """You are a professional visual design critic and marketing conversion expert.
+
+Below are TWO before/after image pairs (A and B). In each pair, both images were generated by the
+SAME AI model with the SAME settings — the ONLY difference is the prompt quality:
+- BEFORE = generic, lazy prompt
+- AFTER = skill-optimized prompt (cinematic direction, lighting, composition, mood)
+
+Which pair makes the stronger before/after showcase on a website selling a prompt engineering
+toolkit to creative agencies? Weigh: size of the visual quality gap, how fast a non-expert sees the
+difference, emotional impact of the AFTER image, and commercial relevance.
+
+Reply with JSON only: {"winner": "A" or "B", "confidence": 0.5-1.0, "reason": "<one sentence>"}
+"""
+
+
+def compare(api_url, a, b):
+    """One model call: which of two pairs is the better showcase. Returns (winner_name, payload)."""
+    parts = [{"text": MATCH_PROMPT}]
+    for label, pair in (("A", a), ("B", b)):
+        parts.append({"text": f"PAIR {label} BEFORE:"})
+        parts.append({"inline_data": {"mime_type": _mime(pair["before"]), "data": load_image_b64(pair["before"])}})
+        parts.append({"text": f"PAIR {label} AFTER:"})
+        parts.append({"inline_data": {"mime_type": _mime(pair["after"]), "data": load_image_b64(pair["after"])}})
+
+    payload = {
+        "contents": [{"parts": parts}],
+        "generationConfig": {
+            "temperature": 0.2,
+            "maxOutputTokens": 300,
+            "responseMimeType": "application/json",
+        },
+    }
+    for attempt in range(3):
+        try:
+            r = requests.post(api_url, json=payload, timeout=120)
+            r.raise_for_status()
+            text = r.json()["candidates"][0]["content"]["parts"][0]["text"]
+            verdict = json.loads(text)
+            winner = str(verdict.get("winner", "")).strip().upper()
+            if winner in ("A", "B"):
+                return (a["name"] if winner == "A" else b["name"]), verdict
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f"   ⚠️ {a['name']} vs {b['name']} attempt {attempt + 1}: {e}")
+            time.sleep(2 ** attempt)
+    return None, None
+
+
+def bradley_terry(names, results, iters=200):
+    """Fit Bradley-Terry log-strengths with Hunter's MM algorithm.
+
+    results: list of (winner, loser). Returns {name: (theta, stderr)} where
+    theta is the log-strength (0 = average) and stderr comes from the
+    observed Fisher information.
+    """
+    wins = {n: PRIOR_GAMES / 2 for n in names}
+    games = {n: {} for n in names}
+    for w, l in results:
+        wins[w] += 1
+        games[w][l] = games[w].get(l, 0) + 1
+        games[l][w] = games[l].get(w, 0) + 1
+
+    # The prior is modelled as games against a virtual opponent of strength 1
+    p = {n: 1.0 for n in names}
+    for _ in range(iters):
+        new = {}
+        for i in names:
+            denom = PRIOR_GAMES / (p[i] + 1.0)
+            for j, n_ij in games[i].items():
+                denom += n_ij / (p[i] + p[j])
+            new[i] = wins[i] / denom
+        # Normalise to geometric mean 1
+        g = math.exp(sum(math.log(v) for v in new.values()) / len(new))
+        delta = max(abs(new[n] / g - p[n]) for n in names)
+        p = {n: new[n] / g for n in names}
+        if delta < 1e-9:
+            break
+
+    out = {}
+    for i in names:
+        info = PRIOR_GAMES * p[i] / (p[i] + 1.0) ** 2
+        for j, n_ij in games[i].items():
+            info += n_ij * p[i] * p[j] / (p[i] + p[j]) ** 2
+        out[i] = (math.log(p[i]), 1.0 / math.sqrt(info))
+    return out
+
+
+def top_is_settled(scores, top):
+    """True when the k-th ranked candidate is confidently above the (k+1)-th."""
+    ranked = sorted(scores.items(), key=lambda kv: -kv[1][0])
+    if len(ranked) <= top:
+        return True
+    (_, (t_in, se_in)), (_, (t_out, se_out)) = ranked[top - 1], ranked[top]
+    return t_in - t_out > Z_CONFIDENT * math.hypot(se_in, se_out)
+
+
+def schedule_round(names, scores, played):
+    """Swiss pairing: walk the standings and pair each candidate with the
+    nearest-ranked opponent it has not met yet."""
+    order = sorted(names, key=lambda n: -scores[n][0])
+    free = list(order)
+    matches = []
+    while len(free) > 1:
+        a = free.pop(0)
+        for idx, b in enumerate(free):
+            if frozenset((a, b)) not in played:
+                matches.append((a, b))
+                free.pop(idx)
+                break
+    return matches
+
+
+def run_tournament(pairs, api_url, top=3, workers=6, max_rounds=None, seed=None):
+    rng = random.Random(seed)
+    names = [p["name"] for p in pairs]
+    by_name = {p["name"]: p for p in pairs}
+    if max_rounds is None:
+        max_rounds = max(3, math.ceil(math.log2(max(len(pairs), 2))) + 2)
+
+    results, log, played = [], [], set()
+    scores = bradley_terry(names, results)
+    calls = 0
+    for rnd in range(1, max_rounds + 1):
+        matches = schedule_round(names, scores, played)
+        if not matches:
+            break
+        # schedule_round puts the higher seed first; random A/B sides keep the model's
+        # position bias from lining up with the standings
+        matches = [m if rng.random() < 0.5 else m[::-1] for m in matches]
+        print(f"\n⏳ Round {rnd}: {len(matches)} matches ({workers} in parallel)")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(compare, api_url, by_name[a], by_name[b]): (a, b) for a, b in matches}
+            for fut in as_completed(futures):
+                a, b = futures[fut]
+                calls += 1
+                winner, verdict = fut.result()
+                if winner is None:
+                    # not marked played, so a later round schedules it again
+                    print(f"   ❌ {a} vs {b}: no verdict")
+                    continue
+                played.add(frozenset((a, b)))
+                loser = b if winner == a else a
+                results.append((winner, loser))
+                log.append({"round": rnd, "a": a, "b": b, "winner": winner, **verdict})
+                print(f"   ✅ {winner} beats {loser} ({verdict.get('confidence', '?')})")
+
+        scores = bradley_terry(names, results)
+        if rnd >= 2 and top_is_settled(scores, top):
+            print(f"\n🏁 Top {top} settled after {rnd} rounds")
+            break
+
+    return scores, log, calls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pairwise tournament ranking of before/after pairs")
+    parser.add_argument("--dir", default=IMG_DIR, help="Directory with before-*/after-* images")
+    parser.add_argument("--top", type=int, default=3, help="Stop once this many leaders are separated")
+    parser.add_argument("--workers", type=int, default=6, help="Parallel Gemini calls")
+    parser.add_argument("--max-rounds", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the A/B side draw (reproducible runs)")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="Drop pairs whose AFTER image fails the local image_metrics checks")
+    args = parser.parse_args()
+
+    pairs = discover_pairs(args.dir)
+    if args.prefilter:
+        from image_metrics import prefilter
+        _, rejected = prefilter([p["after"] for p in pairs])
+        for path, reasons in rejected:
+            print(f"   ❌ {os.path.basename(path)}: {'; '.join(reasons)}")
+        rejected_paths = {path for path, _ in rejected}
+        pairs = [p for p in pairs if p["after"] not in rejected_paths]
+    assert len(pairs) >= 2, f"Need at least 2 before/after pairs in {args.dir}"
+
+    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL}:generateContent?key={load_gemini_key()}"
+
+    print("=" * 60)
+    print(f"BEFORE/AFTER TOURNAMENT — {len(pairs)} pairs, {MODEL}")
+    print("=" * 60)
+
+    start = time.time()
+    scores, log, calls = run_tournament(pairs, api_url, args.top, args.workers, args.max_rounds, args.seed)
+    elapsed = time.time() - start
+    ranked = sorted(scores.items(), key=lambda kv: -kv[1][0])
+
+    print("\n" + "=" * 60)
+    print(f"{'#':>3}  {'pair':<28} {'strength':>9} {'± se':>7}")
+    for i, (name, (theta, se)) in enumerate(ranked, 1):
+        print(f"{i:>3}  {name:<28} {theta:>9.2f} {se:>7.2f}")
+    full = len(pairs) * (len(pairs) - 1) // 2
+    print(f"\n📊 {calls} model calls (round-robin would be {full}) in {elapsed:.0f}s")
+
+    out_path = os.path.join(args.dir, RANKING_FILE)
+    with open(out_path, "w") as f:
+        json.dump({
+            "model": MODEL,
+            "calls": calls,
+            "ranking": [{"name": n, "strength": round(t, 4), "stderr": round(s, 4)} for n, (t, s) in ranked],
+            "matches": log,
+        }, f, indent=2)
+    print(f"✅ Saved to {out_path}")
@@ -8,21 +8,16 @@ cd "$(dirname "$0")"
 MSG="${1:-Update toolkit PDF and rebuild bundle}"
 
 echo "📄 Regenerating PDF..."
-python3 generate-lead-magnet-pdf.py
+python3 generate-lead-magnet-pdf.py --reproducible --linearize
 
 echo "📦 Rebuilding bundle ZIP..."
-BASEDIR="$(cd "$(dirname "$0")" && pwd)"
-rm -f "$BASEDIR/assets/downloads/ai-image-toolkit-2026.zip"
-TMPDIR=$(mktemp -d)
-unzip -q "$BASEDIR/assets/downloads/image-prompt-engineer-skill.zip" -d "$TMPDIR/image-prompt-engineer-skill"
-cp "$BASEDIR/assets/downloads/prompt-engineering-toolkit-2026.pdf" "$TMPDIR/"
-cd "$TMPDIR"
-zip -rq "$BASEDIR/assets/downloads/ai-image-toolkit-2026.zip" prompt-engineering-toolkit-2026.pdf image-prompt-engineer-skill/
-rm -rf "$TMPDIR"
-cd "$BASEDIR"
+python3 build-toolkit-bundle.py --reproducible
 
 echo "📊 Bundle size: $(du -h assets/downloads/ai-image-toolkit-2026.zip | cut -f1)"
 
+echo "🕸  Checking the deploy set..."
+python3 asset_graph.py
+
 echo "🚀 Committing and pushing..."
 git add -A
 git commit -m "$MSG"
@@ -3,18 +3,11 @@
 Regenerate the 'after' food image using the upgraded Image Prompt Engineer skill.
 Uses real photography parameters: film stock, lens, lighting library, anti-AI realism.
 """
-import os, json, requests, base64
+import os
+from fal_jobs import generate
+from provenance import write_image
 
-FAL_KEY = ""
-with open(os.path.expanduser("~/.openclaw/.env")) as f:
-    for line in f:
-        if line.startswith("FAL_KEY="):
-            FAL_KEY = line.strip().split("=", 1)[1].strip('"').strip("'")
-
-assert FAL_KEY, "FAL_KEY not found"
-
-API_URL = "https://fal.run/fal-ai/nano-banana-pro"
-HEADERS = {"Authorization": f"Key {FAL_KEY}", "Content-Type": "application/json"}
+ENDPOINT = "fal-ai/nano-banana-pro"
 OUT_DIR = "assets/images/lead-magnet"
 
 # Upgraded prompt using the skill's photography intelligence:
@@ -48,15 +41,9 @@ payload = {
 
 print(f"Generating upgraded 'after' food image...")
 print(f"Prompt length: {len(PROMPT)} chars")
-resp = requests.post(API_URL, headers=HEADERS, json=payload)
-resp.raise_for_status()
-data = resp.json()
-
-img_url = data["images"][0]["url"]
-img_data = requests.get(img_url).content
+img_data, result = generate(ENDPOINT, payload)
 out_path = os.path.join(OUT_DIR, "after-food.jpg")
-with open(out_path, "wb") as f:
-    f.write(img_data)
+img_data = write_image(out_path, img_data, ENDPOINT, payload, result)
 
 print(f"✅ Saved: {out_path} ({len(img_data) // 1024}KB)")
 print(f"Seed: 42 | Aspect: 16:9 | Model: Nano Banana Pro")
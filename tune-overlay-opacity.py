@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Pick the lowest overlay opacity that keeps the light text readable on each
+full-bleed photo page of the lead magnet PDF.
+
+Only the text region of each page is rasterized: the background photo is
+fill-and-cropped exactly like `_draw_bg_image` does, the black overlay is
+applied for every candidate opacity at once, and the semi-transparent white
+text styles are composited on top. WCAG contrast is computed for every pixel ×
+opacity in one NumPy pass, so the whole search takes about a second
+instead of a build + Gemini audit per guess.
+
+Usage:
+    python3 tune-overlay-opacity.py              # report only
+    python3 tune-overlay-opacity.py --write      # save picks for generate-lead-magnet-pdf.py
+"""
+import os, json, argparse
+import numpy as np
+from PIL import Image
+from image_metrics import srgb_to_linear, contrast_ratio, WCAG_AA, WCAG_AA_LARGE
+
+OUTPUT_PATH = "assets/images/pdf/overlay-opacity.json"
+
+# Must match generate-lead-magnet-pdf.py
+PAGE_W, PAGE_H = 612.0, 792.0  # letter, points
+MARGIN_L = MARGIN_R = 0.9 * 72
+CONTENT_W = PAGE_W - MARGIN_L - MARGIN_R
+
+# Text styles that sit on the photo: (name, white alpha, large text?)
+# Large = 18pt+ (or 14pt+ bold) and only needs 3:1. Red labels/links are left
+# out — ICG red can't reach 4.5:1 even on pure black, so it's decorative here.
+DISPLAY = ("display", 1.0, True)
+BODY = ("body", 0.85, False)
+BODY_BOLD = ("body bold", 1.0, False)
+SMALL = ("small", 0.65, False)
+URL = ("url", 0.6, False)
+
+# Text block of each photo page, in points from the top-left of the page.
+# Derived from the spacer/leading stack of each opener in the story.
+PHOTO_PAGES = {
+    "cover": {
+        "image": "assets/images/pdf/cover-1920s-factory-v2.jpg",
+        "current": 0.65,
+        "box": (MARGIN_L, 183, MARGIN_L + CONTENT_W, 400),
+        "styles": [DISPLAY, BODY, SMALL],
+    },
+    "photo_section": {
+        "image": "assets/images/pdf/camera-1910s-boxcamera.jpg",
+        "current": 0.55,
+        "box": (MARGIN_L, 234, MARGIN_L + CONTENT_W, 490),
+        "styles": [DISPLAY, BODY, SMALL],
+    },
+    "techniques": {
+        "image": "assets/images/pdf/techniques-1960s-darkroom-v2.jpg",
+        "current": 0.55,
+        "box": (MARGIN_L, 234, MARGIN_L + CONTENT_W, 380),
+        "styles": [DISPLAY, SMALL],
+    },
+    "cta": {
+        "image": "assets/images/pdf/cta-1940s-lighttable-v2.jpg",
+        "current": 0.65,
+        "box": (MARGIN_L, 198, MARGIN_L + CONTENT_W, 470),
+        "styles": [DISPLAY, BODY, BODY_BOLD, URL],
+    },
+}
+
+# Previously saved picks are the "current" values the generator will use
+if os.path.exists(OUTPUT_PATH):
+    with open(OUTPUT_PATH) as f:
+        for _name, _opacity in json.load(f).items():
+            if _name in PHOTO_PAGES:
+                PHOTO_PAGES[_name]["current"] = _opacity
+
+CANDIDATES = np.round(np.arange(0.20, 0.905, 0.01), 2)
+
+
+def rasterize_text_region(img_path, box, dpi=36):
+    """Render just `box` of the page background, using the same fill & crop
+    geometry as _draw_bg_image. Returns a uint8 RGB array."""
+    x0, top, x1, bottom = box
+    out_w = max(1, round((x1 - x0) * dpi / 72))
+    out_h = max(1, round((bottom - top) * dpi / 72))
+    with Image.open(img_path) as im:
+        iw, ih = im.size
+        scale = max(PAGE_W / iw, PAGE_H / ih)
+        off_x = (PAGE_W - iw * scale) / 2
+        off_y = (PAGE_H - ih * scale) / 2  # top offset == bottom offset when centred
+        src = (
+            (x0 - off_x) / scale, (top - off_y) / scale,
+            (x1 - off_x) / scale, (bottom - off_y) / scale,
+        )
+        im.draft("RGB", (round(iw * out_w / (src[2] - src[0])), round(ih * out_h / (src[3] - src[1]))))
+        # draft may have shrunk the decode — rescale the source box to match
+        k = im.size[0] / iw
+        src = tuple(v * k for v in src)
+        region = im.convert("RGB").resize((out_w, out_h), Image.BILINEAR, box=src)
+        return np.asarray(region, dtype=np.uint8)
+
+
+def contrast_by_opacity(bg, opacities, alphas, percentile):
+    """Contrast of white text at each alpha over bg darkened by each opacity.
+
+    bg: (P, 3) uint8 pixels. Returns (A, K) — the given percentile of the
+    per-pixel WCAG ratio for each of the A text alphas × K opacities. Overlay
+    and text are composited per channel in gamma space (as the PDF renderer
+    does), so the sRGB → linear step runs on 256-entry tables per opacity and
+    the pixels are just gathered through them.
+    """
+    weights = (0.2126, 0.7152, 0.0722)
+    levels = np.arange(256, dtype=np.float32) / 255.0
+    darkened = (1.0 - opacities.astype(np.float32))[:, None] * levels[None, :]   # (K, 256)
+
+    lin_bg = srgb_to_linear(darkened)
+    lum_bg = sum(w * lin_bg[:, bg[:, c]] for c, w in enumerate(weights))          # (K, P)
+    out = []
+    for alpha in alphas:
+        lin_text = srgb_to_linear(alpha + (1.0 - alpha) * darkened)
+        lum_text = sum(w * lin_text[:, bg[:, c]] for c, w in enumerate(weights))
+        out.append(np.percentile(contrast_ratio(lum_text, lum_bg), percentile, axis=1))
+    return np.stack(out)
+
+
+def tune_page(cfg, percentile=5, dpi=36, target=WCAG_AA, target_large=WCAG_AA_LARGE):
+    """Returns (lowest passing opacity or None, {style: (target, ratios per candidate)})."""
+    bg = rasterize_text_region(cfg["image"], cfg["box"], dpi).reshape(-1, 3)
+    ratios = contrast_by_opacity(bg, CANDIDATES, [alpha for _, alpha, _ in cfg["styles"]], percentile)
+    ok = np.ones(len(CANDIDATES), dtype=bool)
+    per_style = {}
+    for (style, _, large), r in zip(cfg["styles"], ratios):
+        need = target_large if large else target
+        per_style[style] = (need, r)
+        ok &= r >= need
+    pick = float(CANDIDATES[np.argmax(ok)]) if ok.any() else None
+    return pick, per_style
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune photo-page overlay opacity for WCAG text contrast")
+    parser.add_argument("--target", type=float, default=WCAG_AA, help="Contrast target for body text")
+    parser.add_argument("--target-large", type=float, default=WCAG_AA_LARGE, help="Contrast target for display text")
+    parser.add_argument("--percentile", type=float, default=5,
+                        help="Percentile of text-region pixels that must meet the target (5 = 95%% of the area)")
+    parser.add_argument("--dpi", type=int, default=36, help="Raster resolution of the text region")
+    parser.add_argument("--write", action="store_true", help=f"Save picks to {OUTPUT_PATH}")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"OVERLAY TUNER — target {args.target}:1 body / {args.target_large}:1 display, p{args.percentile:g}")
+    print("=" * 60)
+
+    picks = {}
+    for name, cfg in PHOTO_PAGES.items():
+        if not os.path.exists(cfg["image"]):
+            print(f"\n⚠️ {name}: image not found ({cfg['image']})")
+            continue
+        pick, per_style = tune_page(cfg, args.percentile, args.dpi, args.target, args.target_large)
+        print(f"\n📄 {name}  ({os.path.basename(cfg['image'])})")
+        cur_idx = int(np.argmin(np.abs(CANDIDATES - cfg["current"])))
+        pick_idx = int(np.argmin(np.abs(CANDIDATES - pick))) if pick is not None else None
+        for style, (need, ratios) in per_style.items():
+            at_pick = f"{ratios[pick_idx]:5.2f}" if pick_idx is not None else "  n/a"
+            print(f"   {style:<10} needs {need:.1f}  current {ratios[cur_idx]:5.2f}  at pick {at_pick}")
+        if pick is None:
+            print(f"   ❌ no opacity up to {CANDIDATES[-1]:.2f} meets the target — keeping {cfg['current']}")
+            picks[name] = cfg["current"]
+        else:
+            arrow = "↓" if pick < cfg["current"] else ("↑" if pick > cfg["current"] else "=")
+            print(f"   ✅ {cfg['current']:.2f} {arrow} {pick:.2f}")
+            picks[name] = pick
+
+    if args.write:
+        with open(OUTPUT_PATH, "w") as f:
+            json.dump(picks, f, indent=2)
+            f.write("\n")
+        print(f"\n✅ Saved to {OUTPUT_PATH} — picked up by generate-lead-magnet-pdf.py on the next build")